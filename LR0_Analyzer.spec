@@ -6,11 +6,11 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('templates', 'templates'), ('static', 'static'), ('src', 'src')],
-    hiddenimports=['flask', 'flask.cli', 'graphviz', 'pandas', 'waitress', 'src.engine', 'src.grammar', 'src.parser', 'src.utils', 'src.visualizer'],
+    hiddenimports=['flask', 'flask.cli', 'graphviz', 'waitress', 'src.engine', 'src.grammar', 'src.parser', 'src.utils', 'src.visualizer', 'src.compress', 'src.codegen', 'src.tree', 'src.glr', 'src.metrics', 'src.log', 'src.profiling', 'src.analysis', 'src.pool', 'src.limits', 'src.jobs', 'src.cli', 'src.lr1', 'src.loader', 'src.conflicts', 'src.live', 'src.httpcache', 'src.registry'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=['matplotlib', 'numpy', 'scipy', 'tkinter'],
+    excludes=['matplotlib', 'numpy', 'pandas', 'scipy', 'tkinter'],
     noarchive=False,
     optimize=0,
 )
@@ -0,0 +1,405 @@
+# src/analysis.py
+import base64
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+from src.grammar import Grammar
+from src.lr1 import PARSERS
+from src.engine import AnalysisEngine, ParseCheckpoints
+from src.compress import CompressedTable
+from src.conflicts import ConflictExplainer
+from src.glr import GLREngine
+from src.metrics import Metrics
+from src.profiling import CountingHook, profile_call
+from src.limits import LimitExceeded
+
+
+# /analyze 结果中给出解释（最短活前缀和示例输入）的冲突数上限
+CONFLICT_DETAIL_LIMIT = 50
+
+# 每个进程最近使用的分析器：(文法文本, 是否化简, 算法) -> {"parser", "table", "checkpoints"}，
+# 供分批分析输入时复用；checkpoints 保存最近分析过的输入串的检查点，修改后重新提交的输入从检查点继续
+PARSER_CACHE_SIZE = 32
+_parser_cache = OrderedDict()
+
+
+def _remember_parser(grammar_text, reduce_grammar, parser, table=None):
+    key = (grammar_text, bool(reduce_grammar), parser.algorithm)
+    entry = _parser_cache.get(key)
+    if entry is None:
+        entry = {"parser": parser, "table": table, "checkpoints": ParseCheckpoints()}
+        _parser_cache[key] = entry
+        while len(_parser_cache) > PARSER_CACHE_SIZE:
+            _parser_cache.popitem(last=False)
+    elif table is not None:
+        entry["table"] = table
+    _parser_cache.move_to_end(key)
+    return entry
+
+
+def get_parser(grammar_text, reduce_grammar=False, compress_table=False, limits=None, algorithm="lr0"):
+    """
+    取得已构造好分析表的分析器（带 LRU 缓存），compress_table 时同时返回压缩表。
+    :param algorithm: "lr0" 或 "lr1"（见 src.lr1.PARSERS）
+    :return: (parser, table)，未要求压缩表时 table 为 None
+    """
+    key = (grammar_text, bool(reduce_grammar), algorithm)
+    entry = _parser_cache.get(key)
+    if entry is None:
+        g = Grammar(grammar_text)
+        if g.errors:
+            raise ValueError("; ".join(g.errors))
+        if reduce_grammar:
+            g.reduce()
+        if limits is not None:
+            limits.check("max_productions", len(g.productions))
+        parser = PARSERS[algorithm](g, limits)
+        parser.build_canonical_collection()
+        parser.build_parsing_table()
+        entry = _remember_parser(grammar_text, reduce_grammar, parser)
+    else:
+        _parser_cache.move_to_end(key)
+        parser = entry["parser"]
+        # 缓存中的分析器可能是在更宽松的限制下构造的
+        if limits is not None:
+            limits.check("max_states", len(parser.states))
+            limits.check("max_items", sum(len(items) for items in parser.states))
+    if compress_table and entry["table"] is None:
+        entry["table"] = CompressedTable(parser)
+    return parser, entry["table"] if compress_table else None
+
+
+TRACE_FORMATS = ("full", "compact")
+
+
+def build_table(grammar_text, reduce_grammar=False, algorithm="lr0", limits=None):
+    """构造（或取缓存的）分析表，返回 LR0Parser.to_dict() 的结果，供 /live 会话在 Web 进程中直接使用"""
+    parser, _table = get_parser(grammar_text, reduce_grammar, False, limits, algorithm)
+    return parser.to_dict()
+
+
+def _test_inputs(parser, table, input_strings, metrics, build_tree=False, recover_errors=False,
+                 hooks=None, limits=None, trace_format="full", checkpoints=None):
+    """
+    逐个分析输入串，返回 test_results 列表；存在冲突时改用 GLR。
+    trace_format 为 "compact" 时 trace 为 AnalysisEngine.parse_compact 的增量记录。
+    checkpoints: 可选的 ParseCheckpoints，与之前分析过的输入有公共前缀时从检查点继续。
+    """
+    test_results = []
+    if parser.is_lr0 and input_strings:
+        engine = AnalysisEngine(parser, table, limits, checkpoints)
+        for hook in hooks or []:
+            engine.add_hook(hook)
+        for inp in input_strings:
+            inp = inp.strip()
+            if not inp:
+                continue
+
+            parse_start = time.perf_counter()
+            if trace_format == "compact":
+                success, trace_log = engine.parse_compact(inp)
+            else:
+                success, trace_log = engine.parse(inp)
+            metrics.add_input(inp, time.perf_counter() - parse_start, len(trace_log), success)
+            metrics.incr("parse_steps", len(trace_log))
+
+            # engine.parse 的每一步已是 step/state_stack/symbol_stack/input/action/goto 字典，直接返回
+            test_result = {
+                "input": inp,
+                "success": success,
+                "trace": trace_log
+            }
+            if build_tree and success:
+                test_result["tree"] = engine.parse_tree(inp)[1].to_dict()
+            if recover_errors and not success:
+                test_result["errors"] = engine.parse_with_recovery(inp)[1]
+            test_results.append(test_result)
+        if checkpoints is not None:
+            metrics.incr("reused_steps", engine.reused_steps)
+    elif input_strings:
+        # 存在冲突时改用 GLR 分析：直接沿带冲突的分析表并行尝试所有动作
+        glr = GLREngine(parser, limits)
+        for inp in input_strings:
+            inp = inp.strip()
+            if not inp:
+                continue
+
+            parse_start = time.perf_counter()
+            success, forest = glr.parse(inp)
+            metrics.add_input(inp, time.perf_counter() - parse_start, glr.stats["gss_nodes"], success)
+            tree_count = forest.count_trees() if success else 0
+            test_results.append({
+                "input": inp,
+                "success": success,
+                "trace": [],
+                "glr": {
+                    "tree_count": tree_count if tree_count != float('inf') else "inf",
+                    "ambiguous": forest.is_ambiguous(),
+                    "gss_nodes": glr.stats["gss_nodes"],
+                    "sppf_nodes": glr.stats["sppf_nodes"],
+                    "error_position": glr.stats["error_position"]
+                }
+            })
+    return test_results
+
+
+def analyze_grammar(grammar_text, input_strings=None, reduce_grammar=False, compress_table=False,
+                    build_tree=False, recover_errors=False, collect_metrics=False,
+                    hooks=None, profile=None, limits=None, algorithm="lr0", trace_format="full"):
+    """
+    核心分析函数，返回分析结果字典
+    :param reduce_grammar: 为 True 时先删除不可达/不可产生的符号再构造 DFA
+    :param compress_table: 为 True 时用压缩分析表驱动测试，并返回压缩规模报告
+    :param build_tree: 为 True 时为每个被接受的输入串附带平行数组形式的语法树
+    :param recover_errors: 为 True 时对被拒绝的输入串做错误恢复，报告全部语法错误
+    :param collect_metrics: 为 True 时在 results["metrics"] 中返回各阶段耗时与计数
+    :param hooks: 可选的 ParserHook 列表，同时注册到 LR0Parser 和 AnalysisEngine
+    :param profile: "cprofile" 或 "sample" 时在分析器下运行，结果放在 results["profile"]
+    :param limits: 可选的 src.limits.Limits，超限时抛出 LimitExceeded（不转换为错误字符串）
+    :param algorithm: "lr0"（默认）或 "lr1"（Pager 合并的 LR(1)），分析表格式相同
+    :param trace_format: "full"（默认，每步完整的栈字符串）或 "compact"（增量记录，见 AnalysisEngine.parse_compact）
+    """
+    if profile:
+        counter = CountingHook()
+        (results, error), report = profile_call(
+            lambda: analyze_grammar(grammar_text, input_strings,
+                                    reduce_grammar=reduce_grammar,
+                                    compress_table=compress_table,
+                                    build_tree=build_tree,
+                                    recover_errors=recover_errors,
+                                    collect_metrics=collect_metrics,
+                                    hooks=list(hooks or []) + [counter],
+                                    limits=limits,
+                                    algorithm=algorithm,
+                                    trace_format=trace_format),
+            mode=profile)
+        if results is not None:
+            report["hooks"] = counter.summary()
+            results["profile"] = report
+        return results, error
+
+    if input_strings is None:
+        input_strings = []
+    if limits is not None:
+        limits.check("max_inputs", len(input_strings))
+        for inp in input_strings:
+            limits.check("max_input_length", len(inp))
+    metrics = Metrics()
+    total_start = time.perf_counter()
+
+    results = {
+        "grammar_info": {},
+        "dfa_info": {},
+        "table_data": {},
+        "test_results": [],
+        "trace_format": trace_format,
+        "is_lr0": False,
+        "conflicts": [],
+        "conflict_state_ids": []
+    }
+
+    try:
+        # 1. 构建文法
+        with metrics.timer("grammar_parse"):
+            g = Grammar(grammar_text)
+            if reduce_grammar:
+                results["grammar_info"]["reduction"] = g.reduce()
+        if limits is not None:
+            limits.check("max_productions", len(g.productions))
+        metrics.set("productions", len(g.productions))
+        results["grammar_info"]["productions"] = []
+        for i, p in enumerate(g.productions):
+            rhs = " ".join(p['right'])
+            if not rhs or rhs == "@":
+                rhs = "ε"
+            results["grammar_info"]["productions"].append({
+                "index": i,
+                "left": p['left'],
+                "right": rhs
+            })
+
+        results["grammar_info"]["terminals"] = sorted(list(g.terminals))
+        results["grammar_info"]["non_terminals"] = sorted(list(g.non_terminals))
+
+        # 2. 构建解析器
+        parser = PARSERS[algorithm](g, limits)
+        for hook in hooks or []:
+            parser.add_hook(hook)
+        with metrics.timer("canonical_collection"):
+            parser.build_canonical_collection()
+        with metrics.timer("parsing_table"):
+            parser.build_parsing_table()
+        metrics.set("closure_calls", parser.closure_calls)
+        metrics.set("states", len(parser.states))
+        metrics.set("items", sum(len(items) for items in parser.states))
+        metrics.set("transitions", len(parser.transitions))
+        metrics.set("conflicts", len(parser.conflicts))
+
+        results["is_lr0"] = parser.is_lr0
+        results["algorithm"] = parser.algorithm
+        results["conflicts"] = parser.conflicts
+        results["conflict_state_ids"] = list(parser.conflict_state_ids)
+        if parser.conflicts:
+            with metrics.timer("explain_conflicts"):
+                results["conflict_details"] = ConflictExplainer(parser).explain_all(CONFLICT_DETAIL_LIMIT)
+
+        # 3. DFA信息
+        results["dfa_info"]["states"] = []
+        for i, items in enumerate(parser.states):
+            state_items = []
+            for item in items:
+                rhs = item['right'][:]
+                rhs.insert(item['dot'], '•')
+                if 'lookaheads' in item:
+                    lookaheads = "/".join(item['lookaheads']).replace('$', '#')
+                    state_items.append(f"{item['left']} → {''.join(rhs)}, {lookaheads}")
+                else:
+                    state_items.append(f"{item['left']} → {''.join(rhs)}")
+            results["dfa_info"]["states"].append({
+                "id": i,
+                "items": state_items,
+                "is_conflict": i in parser.conflict_state_ids
+            })
+
+        results["dfa_info"]["transitions"] = []
+        for (start, sym), end in parser.transitions.items():
+            results["dfa_info"]["transitions"].append({
+                "from": start,
+                "to": end,
+                "symbol": sym
+            })
+
+        # 4. 分析表数据 - 确保列顺序一致
+        terminals = sorted(list(g.terminals))
+        non_terminals = sorted(list(g.non_terminals))
+        if g.start_symbol in non_terminals:
+            non_terminals.remove(g.start_symbol)
+
+        # 调整终结符显示顺序：将 $ 替换为 #，并确保 # 在最后
+        display_terminals = []
+        original_terminals_order = []  # 保存原始的终结符顺序，用于获取动作
+
+        # 先处理小写字母
+        lowercase_terms = sorted([t for t in terminals if t.islower() and t != '$'])
+        for term in lowercase_terms:
+            display_terminals.append(term)
+            original_terminals_order.append(term)
+
+        # 处理其他非小写字母终结符（除了 $）
+        other_terms = sorted([t for t in terminals if not t.islower() and t != '$'])
+        for term in other_terms:
+            display_terminals.append(term)
+            original_terminals_order.append(term)
+
+        # 最后处理 $，显示为 #
+        if '$' in terminals:
+            display_terminals.append('#')
+            original_terminals_order.append('$')
+
+        # 构建表头
+        headers = ["State"] + display_terminals + non_terminals
+
+        # 构建表格数据 - 按照 original_terminals_order 顺序获取动作
+        table_data = []
+        for i in range(len(parser.states)):
+            row = [str(i)]
+
+            # ACTION部分 - 按照 original_terminals_order 顺序获取动作
+            for t in original_terminals_order:
+                action = parser.action_table[i].get(t, "")
+
+                # 将动作中的 $ 替换为 #（如果存在）
+                if isinstance(action, str):
+                    action = action.replace('$', '#')
+                row.append(action)
+
+            # GOTO部分
+            for nt in non_terminals:
+                goto = parser.goto_table[i].get(nt, "")
+                row.append(str(goto) if goto != "" else "")
+
+            table_data.append(row)
+
+        results["table_data"] = {
+            "headers": headers,
+            "rows": table_data
+        }
+
+        table = None
+        if compress_table:
+            table = CompressedTable(parser)
+            results["table_compression"] = table.size_report()
+        entry = None
+        if not hooks:
+            entry = _remember_parser(grammar_text, reduce_grammar, parser, table)
+
+        # 5. 测试输入串 - 只执行一次
+        results["test_results"] = _test_inputs(parser, table, input_strings, metrics,
+                                               build_tree=build_tree,
+                                               recover_errors=recover_errors,
+                                               hooks=hooks, limits=limits,
+                                               trace_format=trace_format,
+                                               checkpoints=entry["checkpoints"] if entry else None)
+
+        # 6. 生成DFA图像（状态过多时跳过，避免 Graphviz 长时间占用进程）
+        n_states = len(parser.states)
+        if limits is not None and limits.exceeds("max_render_states", n_states):
+            results["dfa_image_skipped"] = (
+                f"状态数 {n_states} 超过渲染上限 {limits.max_render_states}，未生成 DFA 图")
+        else:
+            from src.visualizer import Visualizer
+
+            # 创建临时目录存储图像
+            with tempfile.TemporaryDirectory() as temp_dir:
+                viz = Visualizer(temp_dir)
+                with metrics.timer("render_dfa"):
+                    viz.render_dfa(
+                        parser.states,
+                        parser.transitions,
+                        terminals,
+                        parser.conflict_state_ids,
+                        dpi=limits.render_dpi if limits is not None else 300
+                    )
+
+                # 读取生成的图像并转换为base64
+                img_path = os.path.join(temp_dir, "dfa_graph.png")
+                if os.path.exists(img_path):
+                    with open(img_path, "rb") as img_file:
+                        img_bytes = img_file.read()
+                        img_data = base64.b64encode(img_bytes).decode('utf-8')
+                        results["dfa_image"] = f"data:image/png;base64,{img_data}"
+                    metrics.set("image_bytes", len(img_bytes))
+                    metrics.set("image_payload_bytes", len(results["dfa_image"]))
+
+        metrics.timings["total"] = time.perf_counter() - total_start
+        if collect_metrics:
+            results["metrics"] = metrics.to_dict()
+        return results, None
+
+    except LimitExceeded:
+        raise
+    except Exception as e:
+        return None, str(e)
+
+
+def analyze_inputs(grammar_text, input_strings, reduce_grammar=False, compress_table=False,
+                   build_tree=False, recover_errors=False, limits=None, algorithm="lr0",
+                   trace_format="full"):
+    """
+    只分析输入串（分析器取自缓存），返回 (test_results, metrics 字典)。
+    用于分批处理大量输入：文法结构由 analyze_grammar 给出，这里只补充 test_results。
+    """
+    if limits is not None:
+        limits.check("max_inputs", len(input_strings))
+        for inp in input_strings:
+            limits.check("max_input_length", len(inp))
+    metrics = Metrics()
+    parser, table = get_parser(grammar_text, reduce_grammar, compress_table, limits, algorithm)
+    checkpoints = _parser_cache[(grammar_text, bool(reduce_grammar), algorithm)]["checkpoints"]
+    with metrics.timer("test_inputs"):
+        test_results = _test_inputs(parser, table, input_strings, metrics,
+                                    build_tree=build_tree, recover_errors=recover_errors,
+                                    limits=limits, trace_format=trace_format, checkpoints=checkpoints)
+    return test_results, metrics.to_dict()
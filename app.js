@@ -11,6 +11,8 @@ document.addEventListener('DOMContentLoaded', function() {
     const grammarResult = document.getElementById('grammarResult');
     const resultsContainer = document.getElementById('resultsContainer');
     const downloadImageBtn = document.getElementById('downloadImageBtn');
+    // 上一次分析结果及其 ETag：文法和输入未变时服务器返回 304，直接复用
+    let lastAnalysis = { etag: null, data: null };
 
     // 更新测试用例计数
     function updateTestCount() {
@@ -61,16 +63,24 @@ document.addEventListener('DOMContentLoaded', function() {
         try {
             const response = await fetch('/analyze', {
                 method: 'POST',
-                headers: {
+                headers: Object.assign({
                     'Content-Type': 'application/json',
-                },
+                }, lastAnalysis.etag ? { 'If-None-Match': lastAnalysis.etag } : {}),
                 body: JSON.stringify({
                     grammar: grammarText,
-                    inputs: inputs
+                    inputs: inputs,
+                    trace_format: 'compact'
                 })
             });
 
+            if (response.status === 304 && lastAnalysis.data) {
+                displayResults(lastAnalysis.data);
+                return;
+            }
             const data = await response.json();
+            if (response.ok && response.headers.get('ETag')) {
+                lastAnalysis = { etag: response.headers.get('ETag'), data: data };
+            }
 
             if (response.ok) {
                 // 检查是否有文法错误
@@ -323,7 +333,99 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     // 渲染测试结果 - 不循环，只显示给出的测试串
-    function renderTestResults(testResults) {
+    // 每次展开/加载更多时生成的 trace 行数
+    const TRACE_PAGE_SIZE = 200;
+
+    // 由增量 trace（每步 [action, offset, pop, push_state, push_symbol]）依次还原每一步的栈和剩余输入
+    function* expandCompactTrace(input, ops) {
+        const states = [0];
+        const symbols = ['#'];
+        for (let i = 0; i < ops.length; i++) {
+            const [action, offset, pop, pushState, pushSymbol] = ops[i];
+            const row = {
+                step: i + 1,
+                state_stack: states.join(' '),
+                symbol_stack: symbols.join(''),
+                input: input.slice(offset) + '#',
+                action: action,
+                goto: action.startsWith('r') && pushState !== null ? String(pushState) : ''
+            };
+            if (pop > 0) {
+                states.length -= pop;
+                symbols.length -= pop;
+            }
+            if (pushState !== null) {
+                states.push(pushState);
+                symbols.push(pushSymbol);
+            }
+            yield row;
+        }
+    }
+
+    function traceRowHtml(step) {
+        // 确定动作徽章样式
+        let actionBadge = 'action-shift';
+        let actionText = step.action || '';
+
+        if (actionText.startsWith('s') && actionText !== 'acc') {
+            actionBadge = 'action-shift';
+        } else if (actionText.startsWith('r')) {
+            actionBadge = 'action-reduce';
+        } else if (actionText === 'acc') {
+            actionBadge = 'action-accept';
+        } else if (actionText.includes('ERROR')) {
+            actionBadge = 'action-error';
+            actionText = 'ERROR';
+        }
+
+        return `
+                    <tr>
+                        <td class="text-center">${step.step || ''}</td>
+                        <td class="font-monospace">${step.state_stack || ''}</td>
+                        <td class="font-monospace">${step.symbol_stack || ''}</td>
+                        <td class="font-monospace text-end">${step.input || ''}</td>
+                        <td class="text-center"><span class="table-action ${actionBadge}">${actionText}</span></td>
+                        <td class="text-center font-monospace">${step.goto || ''}</td>
+                    </tr>`;
+    }
+
+    // trace 行在展开时才生成，每次 TRACE_PAGE_SIZE 行
+    function attachLazyTrace(testCard, result, index, traceFormat) {
+        const total = result.trace ? result.trace.length : 0;
+        if (total === 0) {
+            return;
+        }
+        const rows = traceFormat === 'compact'
+            ? expandCompactTrace(result.input, result.trace)
+            : result.trace.values();
+        const tbody = testCard.querySelector('tbody');
+        const moreBtn = testCard.querySelector('.trace-more');
+        let shown = 0;
+
+        function showMore() {
+            let html = '';
+            for (let i = 0; i < TRACE_PAGE_SIZE; i++) {
+                const next = rows.next();
+                if (next.done) {
+                    break;
+                }
+                html += traceRowHtml(next.value);
+                shown++;
+            }
+            tbody.insertAdjacentHTML('beforeend', html);
+            moreBtn.style.display = shown < total ? 'inline-block' : 'none';
+            moreBtn.textContent = `显示更多（已显示 ${shown} / ${total} 步）`;
+        }
+
+        moreBtn.addEventListener('click', showMore);
+        document.getElementById(`trace${index}`).addEventListener('show.bs.collapse', () => {
+            if (shown === 0) {
+                showMore();
+            }
+        });
+    }
+
+    function renderTestResults(testResults, traceFormat = 'full') {
         const container = document.getElementById('testResults');
         container.innerHTML = '';
 
@@ -331,7 +433,7 @@ document.addEventListener('DOMContentLoaded', function() {
             container.innerHTML = `
                 <div class="alert alert-info">
                     <i class="fas fa-info-circle me-2"></i>
-                    没有测试输入或文法存在冲突，无法进行测试
+                    没有测试输入
                 </div>
             `;
             return;
@@ -343,35 +445,21 @@ document.addEventListener('DOMContentLoaded', function() {
             const statusIcon = result.success ? '✅' : '❌';
             const statusText = result.success ? '接受' : '拒绝';
 
-            // 构建Trace表格行
-            let traceRows = '';
-            if (result.trace && result.trace.length > 0) {
-                result.trace.forEach(step => {
-                    // 确定动作徽章样式
-                    let actionBadge = 'action-shift';
-                    let actionText = step.action || '';
-
-                    if (actionText.startsWith('s') && actionText !== 'acc') {
-                        actionBadge = 'action-shift';
-                    } else if (actionText.startsWith('r')) {
-                        actionBadge = 'action-reduce';
-                    } else if (actionText === 'acc') {
-                        actionBadge = 'action-accept';
-                    } else if (actionText.includes('ERROR')) {
-                        actionBadge = 'action-error';
-                        actionText = 'ERROR';
-                    }
-
-                    traceRows += `
-                    <tr>
-                        <td class="text-center">${step.step || ''}</td>
-                        <td class="font-monospace">${step.state_stack || ''}</td>
-                        <td class="font-monospace">${step.symbol_stack || ''}</td>
-                        <td class="font-monospace text-end">${step.input || ''}</td>
-                        <td class="text-center"><span class="table-action ${actionBadge}">${actionText}</span></td>
-                        <td class="text-center font-monospace">${step.goto || ''}</td>
-                    </tr>`;
+            // 错误恢复模式下报告的全部语法错误
+            let errorsHtml = '';
+            if (result.errors && result.errors.length > 0) {
+                errorsHtml = '<ul class="mb-0 mt-2">';
+                result.errors.forEach(err => {
+                    errorsHtml += `<li>位置 ${err.position}：遇到 <code>${err.token}</code>，期望 <code>${err.expected.join(' ')}</code></li>`;
                 });
+                errorsHtml += '</ul>';
+            }
+
+            // GLR 分析结果（文法存在冲突时）
+            let glrHtml = '';
+            if (result.glr) {
+                glrHtml = `<div class="mt-2 small">GLR 分析：语法树 ${result.glr.tree_count} 棵${result.glr.ambiguous ? '（存在歧义）' : ''}，
+                    GSS 结点 ${result.glr.gss_nodes}，森林结点 ${result.glr.sppf_nodes}</div>`;
             }
 
             const testCard = document.createElement('div');
@@ -403,13 +491,16 @@ document.addEventListener('DOMContentLoaded', function() {
                                         <th style="width: 80px;">GOTO</th>
                                     </tr>
                                 </thead>
-                                <tbody>${traceRows}</tbody>
+                                <tbody></tbody>
                             </table>
+                            <button type="button" class="btn btn-sm btn-outline-secondary m-2 trace-more" style="display: none;"></button>
                         </div>
                         <div class="p-3">
                             <div class="alert ${result.success ? 'alert-success' : 'alert-danger'} mb-0" role="alert">
                                 <strong>分析结果:</strong> 输入串 <code>${result.input}</code>
                                 ${result.success ? '是该文法的句子' : '不是该文法的句子'}。
+                                ${errorsHtml}
+                                ${glrHtml}
                             </div>
                         </div>
                     </div>
@@ -417,7 +508,40 @@ document.addEventListener('DOMContentLoaded', function() {
             `;
 
             container.appendChild(testCard);
+            attachLazyTrace(testCard, result, index, traceFormat);
+        });
+    }
+
+    // 冲突解释：到达冲突状态的最短活前缀，以及每个候选动作的示例输入
+    function renderConflictDetails(details) {
+        if (details.length === 0) {
+            return '';
+        }
+        const join = symbols => symbols.length > 0 ? symbols.join(' ') : 'ε';
+        let html = `<div class="mt-3">
+            <h6 class="mb-2">冲突原因:</h6>
+            <ul class="list-group list-group-flush small">`;
+        details.forEach(detail => {
+            const prefix = detail.prefix ? `活前缀 <code>${join(detail.prefix)}</code>` : '状态不可达';
+            const ambiguous = detail.ambiguous
+                ? '<span class="badge bg-danger ms-2">二义：同一输入有两种分析</span>' : '';
+            html += `<li class="list-group-item border-0 py-1">
+                状态 ${detail.state}，向前看 <code>${detail.symbol}</code>：${prefix}${ambiguous}
+                <ul class="mb-0">`;
+            detail.actions.forEach(entry => {
+                const name = entry.production ? `${entry.action}（${entry.production}）` : entry.action;
+                let text = '搜索范围内未找到被接受的示例';
+                if (entry.status === 'example' && entry.example) {
+                    text = `示例输入 <code>${join(entry.example)}</code>`;
+                } else if (entry.status === 'dead') {
+                    text = '在搜索到的所有活前缀下执行后都立即出错：该向前看符号不能出现在此处（如 LR(0) 在所有终结符上规约造成的冲突）';
+                }
+                html += `<li>${name}：${text}</li>`;
+            });
+            html += '</ul></li>';
         });
+        html += '</ul></div>';
+        return html;
     }
 
     // 显示分析结果
@@ -429,12 +553,13 @@ document.addEventListener('DOMContentLoaded', function() {
         grammarResult.style.display = 'block';
         resultsContainer.style.display = 'block';
 
-        // 文法判定结果
+        // 文法判定结果（algorithm 为 lr1 时按 LR(1) 分析表判定）
+        const kind = data.algorithm === 'lr1' ? 'LR(1)' : 'LR(0)';
         if (data.is_lr0) {
             grammarResult.innerHTML = `
                 <div class="result-indicator result-success">
                     <i class="fas fa-check-circle me-2"></i>
-                    <strong>✅ 是 LR(0) 文法</strong> - 文法适合使用LR(0)分析器
+                    <strong>✅ 是 ${kind} 文法</strong> - 文法适合使用${kind}分析器
                 </div>
             `;
         } else {
@@ -448,11 +573,12 @@ document.addEventListener('DOMContentLoaded', function() {
                 });
                 conflictsHtml += `</ul></div>`;
             }
+            conflictsHtml += renderConflictDetails(data.conflict_details || []);
 
             grammarResult.innerHTML = `
                 <div class="result-indicator result-warning">
                     <i class="fas fa-exclamation-triangle me-2"></i>
-                    <strong>❌ 不是 LR(0) 文法</strong>
+                    <strong>❌ 不是 ${kind} 文法</strong>
                     ${conflictsHtml}
                 </div>
             `;
@@ -505,12 +631,12 @@ document.addEventListener('DOMContentLoaded', function() {
 
         // 测试结果 - 只显示给出的测试串
         if (data.test_results && data.test_results.length > 0) {
-            renderTestResults(data.test_results);
+            renderTestResults(data.test_results, data.trace_format);
         } else {
             document.getElementById('testResults').innerHTML = `
                 <div class="alert alert-info">
                     <i class="fas fa-info-circle me-2"></i>
-                    没有测试输入或文法存在冲突，无法进行测试
+                    没有测试输入
                 </div>
             `;
         }
@@ -1,17 +1,23 @@
 # app.py
-from flask import Flask, render_template, request, jsonify, send_file
-import json
-import tempfile
-
-from io import BytesIO
-import base64
+from flask import Flask, Response, render_template, request, jsonify
+import gzip
+import multiprocessing
 
 import sys
 import os
+import threading
 
 from src.grammar import Grammar
-from src.parser import LR0Parser
-from src.engine import AnalysisEngine
+from src import analysis
+from src.metrics import REGISTRY
+from src.log import configure_logging
+from src.pool import get_pool, PoolBusy, TaskTimeout, WorkerCrashed
+from src.limits import Limits, LimitExceeded
+from src.jobs import JobStore, JobRunner, JobStoreFull
+from src.live import LiveSessionManager, LiveSessionFull, sse_stream
+from src.httpcache import ResultCache, make_etag, gzip_bytes, accepts_gzip, compress_response
+from src.registry import GrammarRegistry
+from src.lr1 import PARSERS
 
 
 # 处理PyInstaller打包后的路径问题
@@ -42,187 +48,126 @@ app = Flask(
 
 app = Flask(__name__)
 
+# 日志级别由环境变量 LR0_LOG_LEVEL 控制，生产环境默认 WARNING，不输出逐次请求的调试信息
+configure_logging()
+
+# 资源限制由环境变量 LR0_MAX_* 配置，请求体过大时 Flask 直接返回 413
+LIMITS = Limits.from_env()
+app.config['MAX_CONTENT_LENGTH'] = LIMITS.max_request_bytes or None
+
+# waitress 的服务线程数；/live 的 Server-Sent Events 连接各占一个线程
+SERVER_THREADS = int(os.environ.get("LR0_SERVER_THREADS", 8))
+
+
+# /analyze 的结果按 ETag 缓存（gzip 后的响应体），LR0_RESULT_CACHE_BYTES 为缓存总字节数上限
+RESULT_CACHE = ResultCache(max_bytes=int(os.environ.get("LR0_RESULT_CACHE_BYTES", 64 * 1024 * 1024)))
+# 结果格式或限制变化时 ETag 随之变化
+ETAG_SALT = {"format": 1, "limits": LIMITS.to_dict()}
+
+
+@app.after_request
+def compress(response):
+    return compress_response(response, request)
+
+
+def _analysis_response(body, etag):
+    """由 gzip 后的结果构造响应：客户端不接受 gzip 时解压"""
+    if accepts_gzip(request):
+        response = app.response_class(body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = app.response_class(gzip.decompress(body), mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({"error": "请求体过大", "limit": "max_request_bytes",
+                    "max": LIMITS.max_request_bytes}), 413
+
+
+def run_analysis(name, *args, **kwargs):
+    """执行 src.analysis 中的函数：有进程池时交给工作进程，LR0_POOL_WORKERS=0 时在当前线程执行"""
+    pool = get_pool()
+    if pool is not None:
+        return pool.submit(name, *args, **kwargs)
+    return getattr(analysis, name)(*args, **kwargs)
+
+
+_job_runner = None
 
-def analyze_grammar(grammar_text, input_strings=None):
+
+def get_job_runner():
     """
-    核心分析函数，返回分析结果字典
+    首次使用时创建任务存储和后台线程：
+    LR0_JOB_DB SQLite 文件路径（默认内存库），LR0_MAX_JOBS 保留的任务数，
+    LR0_JOB_THREADS 同时执行的任务数。
     """
-    if input_strings is None:
-        input_strings = []
-
-    results = {
-        "grammar_info": {},
-        "dfa_info": {},
-        "table_data": {},
-        "test_results": [],
-        "is_lr0": False,
-        "conflicts": [],
-        "conflict_state_ids": []
-    }
+    global _job_runner
+    if _job_runner is None:
+        store = JobStore(os.environ.get("LR0_JOB_DB", ":memory:"),
+                         max_jobs=int(os.environ.get("LR0_MAX_JOBS", 1000)))
+        _job_runner = JobRunner(store, run_analysis, limits=LIMITS,
+                                threads=int(os.environ.get("LR0_JOB_THREADS", 2)))
+    return _job_runner
 
-    try:
-        # 1. 构建文法
-        g = Grammar(grammar_text)
-        results["grammar_info"]["productions"] = []
-        for i, p in enumerate(g.productions):
-            rhs = " ".join(p['right'])
-            if not rhs or rhs == "@":
-                rhs = "ε"
-            results["grammar_info"]["productions"].append({
-                "index": i,
-                "left": p['left'],
-                "right": rhs
-            })
-
-        results["grammar_info"]["terminals"] = sorted(list(g.terminals))
-        results["grammar_info"]["non_terminals"] = sorted(list(g.non_terminals))
-
-        # 2. 构建解析器
-        parser = LR0Parser(g)
-        parser.build_canonical_collection()
-        parser.build_parsing_table()
-
-        results["is_lr0"] = parser.is_lr0
-        results["conflicts"] = parser.conflicts
-        results["conflict_state_ids"] = list(parser.conflict_state_ids)
-
-        # 3. DFA信息
-        results["dfa_info"]["states"] = []
-        for i, items in enumerate(parser.states):
-            state_items = []
-            for item in items:
-                rhs = item['right'][:]
-                rhs.insert(item['dot'], '•')
-                state_items.append(f"{item['left']} → {''.join(rhs)}")
-            results["dfa_info"]["states"].append({
-                "id": i,
-                "items": state_items,
-                "is_conflict": i in parser.conflict_state_ids
-            })
-
-        results["dfa_info"]["transitions"] = []
-        for (start, sym), end in parser.transitions.items():
-            results["dfa_info"]["transitions"].append({
-                "from": start,
-                "to": end,
-                "symbol": sym
-            })
-
-        # 4. 分析表数据 - 确保列顺序一致
-        terminals = sorted(list(g.terminals))
-        non_terminals = sorted(list(g.non_terminals))
-        if g.start_symbol in non_terminals:
-            non_terminals.remove(g.start_symbol)
-
-        # 调整终结符显示顺序：将 $ 替换为 #，并确保 # 在最后
-        display_terminals = []
-        original_terminals_order = []  # 保存原始的终结符顺序，用于获取动作
-
-        # 先处理小写字母
-        lowercase_terms = sorted([t for t in terminals if t.islower() and t != '$'])
-        for term in lowercase_terms:
-            display_terminals.append(term)
-            original_terminals_order.append(term)
-
-        # 处理其他非小写字母终结符（除了 $）
-        other_terms = sorted([t for t in terminals if not t.islower() and t != '$'])
-        for term in other_terms:
-            display_terminals.append(term)
-            original_terminals_order.append(term)
-
-        # 最后处理 $，显示为 #
-        if '$' in terminals:
-            display_terminals.append('#')
-            original_terminals_order.append('$')
-
-        # 构建表头
-        headers = ["State"] + display_terminals + non_terminals
-
-        # 构建表格数据 - 按照 original_terminals_order 顺序获取动作
-        table_data = []
-        for i in range(len(parser.states)):
-            row = [str(i)]
-
-            # ACTION部分 - 按照 original_terminals_order 顺序获取动作
-            for t in original_terminals_order:
-                action = parser.action_table[i].get(t, "")
-
-                # 将动作中的 $ 替换为 #（如果存在）
-                if isinstance(action, str):
-                    action = action.replace('$', '#')
-                row.append(action)
-
-            # GOTO部分
-            for nt in non_terminals:
-                goto = parser.goto_table[i].get(nt, "")
-                row.append(str(goto) if goto != "" else "")
-
-            table_data.append(row)
-
-        results["table_data"] = {
-            "headers": headers,
-            "rows": table_data
-        }
-
-        # 5. 测试输入串 - 只执行一次
-        if parser.is_lr0 and input_strings:
-            engine = AnalysisEngine(parser)
-            for inp in input_strings:
-                inp = inp.strip()
-                if not inp:
-                    continue
-
-                success, trace_log = engine.parse(inp)
-
-                # 确保有trace_log
-                if not trace_log:
-                    trace_log = []
-
-                # 格式化trace - 确保格式统一
-                formatted_trace = []
-                for step in trace_log:
-                    formatted_trace.append({
-                        "step": step.get("step", ""),
-                        "state_stack": step.get("state_stack", ""),
-                        "symbol_stack": step.get("symbol_stack", ""),
-                        "input": step.get("input", ""),
-                        "action": step.get("action", ""),
-                        "goto": step.get("goto", "")
-                    })
-
-                results["test_results"].append({
-                    "input": inp,
-                    "success": success,
-                    "trace": formatted_trace
-                })
-        else:
-            # 即使不能测试，也记录空的测试结果
-            results["test_results"] = []
-
-        # 6. 生成DFA图像
-        from src.visualizer import Visualizer
-
-        # 创建临时目录存储图像
-        with tempfile.TemporaryDirectory() as temp_dir:
-            viz = Visualizer(temp_dir)
-            viz.render_dfa(
-                parser.states,
-                parser.transitions,
-                terminals,
-                parser.conflict_state_ids
-            )
-
-            # 读取生成的图像并转换为base64
-            img_path = os.path.join(temp_dir, "dfa_graph.png")
-            if os.path.exists(img_path):
-                with open(img_path, "rb") as img_file:
-                    img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                    results["dfa_image"] = f"data:image/png;base64,{img_data}"
-
-        return results, None
 
-    except Exception as e:
-        return None, str(e)
+_live_sessions = None
+
+
+def get_live_sessions():
+    """
+    首次使用时创建边输入边分析的会话管理器：
+    LR0_MAX_LIVE_SESSIONS 活动会话数上限，LR0_LIVE_TTL 会话空闲过期秒数，
+    LR0_MAX_LIVE_STREAMS 事件流连接数上限（默认为服务线程数的一半，其余线程留给普通请求）。
+    分析表在进程池中构造，之后每次修改只在 Web 进程中做不记录 trace 的识别。
+    """
+    global _live_sessions
+    if _live_sessions is None:
+        _live_sessions = LiveSessionManager(
+            lambda grammar_text, reduce_grammar, algorithm: run_analysis(
+                "build_table", grammar_text, reduce_grammar, algorithm, limits=LIMITS),
+            limits=LIMITS,
+            max_sessions=int(os.environ.get("LR0_MAX_LIVE_SESSIONS", 1000)),
+            ttl=float(os.environ.get("LR0_LIVE_TTL", 600)),
+            max_streams=int(os.environ.get("LR0_MAX_LIVE_STREAMS", max(1, SERVER_THREADS // 2))))
+    return _live_sessions
+
+
+_grammar_registry = None
+_grammar_registry_lock = threading.Lock()
+
+
+def get_grammar_registry():
+    """
+    预载文法注册表，未设置 LR0_GRAMMAR_DIR 时为 None：
+    LR0_GRAMMAR_ALGORITHM 构造分析表的算法，LR0_GRAMMAR_WATCH 检查文件修改的间隔秒数（0 为不检查）。
+    导入本模块时即载入（见下方），首次请求不必等待构造分析表。
+    """
+    global _grammar_registry
+    directory = os.environ.get("LR0_GRAMMAR_DIR")
+    if not directory:
+        return None
+    with _grammar_registry_lock:
+        if _grammar_registry is None:
+            registry = GrammarRegistry(directory,
+                                       algorithm=os.environ.get("LR0_GRAMMAR_ALGORITHM", "lr0"),
+                                       limits=LIMITS)
+            registry.reload()
+            interval = float(os.environ.get("LR0_GRAMMAR_WATCH", 2))
+            if interval > 0:
+                registry.watch(interval)
+            _grammar_registry = registry
+    return _grammar_registry
+
+
+# 无论以 __main__ 还是其他 WSGI 入口启动，都在导入时预载文法；
+# 进程池的子进程（spawn 方式会重新导入主模块）不载入
+if multiprocessing.parent_process() is None:
+    get_grammar_registry()
 
 
 @app.route('/')
@@ -239,6 +184,23 @@ def analyze():
 
     grammar_text = data['grammar']
     input_strings = data.get('inputs', [])
+    reduce_grammar = bool(data.get('reduce_grammar', False))
+    compress_table = bool(data.get('compress_table', False))
+    build_tree = bool(data.get('build_tree', False))
+    recover_errors = bool(data.get('recover_errors', False))
+    algorithm = data.get('algorithm', 'lr0')
+    if algorithm not in PARSERS:
+        return jsonify({"error": f"未知的算法: {algorithm}，可选: {', '.join(PARSERS)}"}), 400
+    trace_format = data.get('trace_format', 'full')
+    if trace_format not in analysis.TRACE_FORMATS:
+        return jsonify({"error": f"未知的 trace 格式: {trace_format}，可选: {', '.join(analysis.TRACE_FORMATS)}"}), 400
+    want_metrics = bool(data.get('metrics', False)) or request.args.get('metrics') == '1'
+    # ?profile=1 使用 cProfile，?profile=sample 使用采样分析
+    profile = request.args.get('profile') or data.get('profile')
+    if profile in (True, 1, '1', 'cprofile'):
+        profile = 'cprofile'
+    elif profile != 'sample':
+        profile = None
 
     # 清理输入：移除空行和注释
     grammar_lines = []
@@ -255,6 +217,23 @@ def analyze():
         if inp:
             clean_inputs.append(inp)
 
+    # 相同的文法、输入串和选项得到相同的结果：If-None-Match 命中时返回 304，缓存命中时不重新分析。
+    # 性能分析和指标中的耗时每次不同，不参与缓存
+    etag = None
+    if not profile and not want_metrics:
+        etag = make_etag({"grammar": grammar_text, "inputs": clean_inputs, "salt": ETAG_SALT,
+                          "options": [reduce_grammar, compress_table, build_tree, recover_errors,
+                                      algorithm, trace_format]})
+        if request.if_none_match.contains(etag):
+            REGISTRY.inc("analyze_not_modified")
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        cached = RESULT_CACHE.get(etag)
+        if cached is not None:
+            REGISTRY.inc("analyze_cache_hits")
+            return _analysis_response(cached, etag)
+
     try:
         # 1. 构建文法，检查是否有解析错误
         g = Grammar(grammar_text)
@@ -268,18 +247,256 @@ def analyze():
             }), 400
 
         # 2. 继续执行后续分析...
-        results, error = analyze_grammar(grammar_text, clean_inputs)
+        # CPU 密集的分析放到进程池中执行
+        options = dict(reduce_grammar=reduce_grammar,
+                       compress_table=compress_table,
+                       build_tree=build_tree,
+                       recover_errors=recover_errors,
+                       collect_metrics=True,
+                       profile=profile,
+                       limits=LIMITS,
+                       algorithm=algorithm,
+                       trace_format=trace_format)
+        REGISTRY.inc("analyze_requests")
+        try:
+            # 明显超限的请求不占用工作进程
+            LIMITS.check("max_productions", len(g.productions))
+            results, error = run_analysis("analyze_grammar", grammar_text, clean_inputs, **options)
+        except PoolBusy as e:
+            REGISTRY.inc("analyze_rejected")
+            return jsonify({"error": str(e)}), 503
+        except TaskTimeout as e:
+            REGISTRY.inc("analyze_timeouts")
+            return jsonify({"error": str(e)}), 504
+        except WorkerCrashed as e:
+            REGISTRY.inc("analyze_worker_crashes")
+            return jsonify({"error": str(e)}), 500
+        except LimitExceeded as e:
+            REGISTRY.inc("analyze_limit_exceeded")
+            return jsonify(e.to_dict()), e.status
 
         if error:
+            REGISTRY.inc("analyze_errors")
             return jsonify({"error": error}), 500
 
-        return jsonify(results)
+        # 累计指标始终记录，响应中的 metrics 仅在请求时返回
+        metrics = results.pop("metrics")
+        REGISTRY.record(metrics)
+        if want_metrics:
+            results["metrics"] = metrics
+
+        response = jsonify(results)
+        REGISTRY.inc("response_bytes", len(response.get_data()))
+        if etag is None:
+            return response
+        body = gzip_bytes(response.get_data())
+        REGISTRY.inc("response_gzip_bytes", len(body))
+        RESULT_CACHE.put(etag, body)
+        return _analysis_response(body, etag)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    异步分析：立即返回任务 id（202），由后台线程执行。
+    适合大文法或大批输入，输入串个数上限为 LR0_MAX_JOB_INPUTS（默认 10000）。
+    """
+    data = request.get_json(silent=True)
+    if not data or 'grammar' not in data:
+        return jsonify({"error": "请输入文法"}), 400
+
+    grammar_lines = [line.strip() for line in data['grammar'].strip().split('\n')]
+    grammar_text = '\n'.join(line for line in grammar_lines if line and not line.startswith('#'))
+    clean_inputs = [inp.strip() for inp in data.get('inputs', []) if inp.strip()]
+
+    g = Grammar(grammar_text)
+    if g.errors:
+        return jsonify({"grammar_errors": g.errors, "has_grammar_errors": True}), 400
+    try:
+        LIMITS.check("max_productions", len(g.productions))
+        for inp in clean_inputs:
+            LIMITS.check("max_input_length", len(inp))
+    except LimitExceeded as e:
+        return jsonify(e.to_dict()), e.status
+    max_job_inputs = int(os.environ.get("LR0_MAX_JOB_INPUTS", 10000))
+    if len(clean_inputs) > max_job_inputs:
+        return jsonify({"error": f"输入串过多: {len(clean_inputs)} > {max_job_inputs}",
+                        "limit": "max_job_inputs"}), 413
+
+    options = {key: bool(data.get(key, False))
+               for key in ("reduce_grammar", "compress_table", "build_tree", "recover_errors")}
+    options["algorithm"] = data.get('algorithm', 'lr0')
+    if options["algorithm"] not in PARSERS:
+        return jsonify({"error": f"未知的算法: {options['algorithm']}"}), 400
+    options["trace_format"] = data.get('trace_format', 'full')
+    if options["trace_format"] not in analysis.TRACE_FORMATS:
+        return jsonify({"error": f"未知的 trace 格式: {options['trace_format']}"}), 400
+    try:
+        job_id = get_job_runner().submit({"grammar": grammar_text, "inputs": clean_inputs, "options": options})
+    except JobStoreFull as e:
+        return jsonify({"error": str(e)}), 503
+    REGISTRY.inc("jobs_created")
+
+    response = jsonify({"id": job_id, "status": "queued", "url": f"/jobs/{job_id}"})
+    response.status_code = 202
+    response.headers['Location'] = f"/jobs/{job_id}"
+    return response
+
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """任务状态与部分结果；?offset=N 只返回第 N 个之后的 test_results"""
+    offset = request.args.get('offset', 0, type=int)
+    job = get_job_runner().store.get(job_id, offset=max(offset, 0))
+    if job is None:
+        return jsonify({"error": "任务不存在或已过期"}), 404
+    return jsonify(job)
+
+
+@app.route('/live', methods=['POST'])
+def create_live_session():
+    """
+    创建边输入边分析的会话：{"grammar", "reduce_grammar", "algorithm", "input"}。
+    之后用 POST /live/<id> 提交修改，GET /live/<id>/events 以 Server-Sent Events 接收结果。
+    """
+    data = request.get_json(silent=True)
+    if not data or 'grammar' not in data:
+        return jsonify({"error": "请输入文法"}), 400
+    grammar_text = '\n'.join(line.strip() for line in data['grammar'].strip().split('\n')
+                             if line.strip() and not line.strip().startswith('#'))
+    algorithm = data.get('algorithm', 'lr0')
+    if algorithm not in PARSERS:
+        return jsonify({"error": f"未知的算法: {algorithm}，可选: {', '.join(PARSERS)}"}), 400
+
+    try:
+        session = get_live_sessions().create(grammar_text, bool(data.get('reduce_grammar', False)), algorithm)
+        result = session.update(text=str(data['input'])) if 'input' in data else None
+    except LiveSessionFull as e:
+        return jsonify({"error": str(e)}), 503
+    except PoolBusy as e:
+        return jsonify({"error": str(e)}), 503
+    except TaskTimeout as e:
+        return jsonify({"error": str(e)}), 504
+    except WorkerCrashed as e:
+        return jsonify({"error": str(e)}), 500
+    except LimitExceeded as e:
+        return jsonify(e.to_dict()), e.status
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    REGISTRY.inc("live_sessions_created")
+
+    response = jsonify({"id": session.id, "is_lr0": session.parser.is_lr0, "algorithm": algorithm,
+                        "url": f"/live/{session.id}", "events": f"/live/{session.id}/events",
+                        "result": result})
+    response.status_code = 201
+    response.headers['Location'] = f"/live/{session.id}"
+    return response
+
+
+@app.route('/live/<session_id>', methods=['POST'])
+def update_live_session(session_id):
+    """提交修改：{"input": 完整输入串} 或 {"edits": [{"start", "end", "text"}]}，直接返回识别结果"""
+    session = get_live_sessions().get(session_id)
+    if session is None:
+        return jsonify({"error": "会话不存在或已过期"}), 404
+    data = request.get_json(silent=True) or {}
+    if 'input' not in data and 'edits' not in data:
+        return jsonify({"error": "需要 input 或 edits"}), 400
+    try:
+        text = str(data['input']) if 'input' in data else None
+        result = session.update(text=text, edits=data.get('edits'))
+    except LimitExceeded as e:
+        return jsonify(e.to_dict()), e.status
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    REGISTRY.inc("live_updates")
+    return jsonify(result)
+
+
+@app.route('/live/<session_id>', methods=['DELETE'])
+def close_live_session(session_id):
+    if not get_live_sessions().close(session_id):
+        return jsonify({"error": "会话不存在或已过期"}), 404
+    return '', 204
+
+
+@app.route('/live/<session_id>/events')
+def live_session_events(session_id):
+    """Server-Sent Events：先推送当前结果，之后每次修改推送一条 result 事件"""
+    manager = get_live_sessions()
+    session = manager.get(session_id)
+    if session is None:
+        return jsonify({"error": "会话不存在或已过期"}), 404
+    try:
+        q = manager.open_stream(session)
+    except LiveSessionFull as e:
+        return jsonify({"error": str(e)}), 503
+    response = Response(sse_stream(manager, session, q), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # 流尚未开始迭代就被关闭时生成器的 finally 不会执行，在响应关闭时也释放连接
+    response.call_on_close(lambda: manager.close_stream(session, q))
+    return response
+
+
+@app.route('/grammars')
+def list_grammars():
+    """预载文法列表及其载入状态"""
+    registry = get_grammar_registry()
+    if registry is None:
+        return jsonify({"error": "未配置文法目录（LR0_GRAMMAR_DIR）"}), 404
+    return jsonify({"grammars": registry.describe()})
+
+
+@app.route('/parse/<name>', methods=['POST'])
+def parse_with_grammar(name):
+    """
+    用预载文法分析输入串：{"input": 输入串} 或 {"inputs": [...]}，"tree": true 时附带语法树。
+    只做不记录 trace 的识别，不构造分析表、不生成 DFA 图。
+    """
+    registry = get_grammar_registry()
+    if registry is None:
+        return jsonify({"error": "未配置文法目录（LR0_GRAMMAR_DIR）"}), 404
+    data = request.get_json(silent=True) or {}
+    if 'input' in data:
+        inputs = [data['input']]
+    elif isinstance(data.get('inputs'), list):
+        inputs = data['inputs']
+    else:
+        return jsonify({"error": "需要 input 或 inputs"}), 400
+    build_tree = bool(data.get('tree', False))
+
+    try:
+        LIMITS.check("max_inputs", len(inputs))
+        results = [registry.parse(name, str(text), tree=build_tree) for text in inputs]
+    except KeyError:
+        entry = registry.get(name)
+        if entry is not None:
+            return jsonify({"error": f"文法 {name} 载入失败: {entry['error']}"}), 503
+        return jsonify({"error": f"文法 {name} 不存在"}), 404
+    except LimitExceeded as e:
+        return jsonify(e.to_dict()), e.status
+    REGISTRY.inc("registry_parse_requests")
+    REGISTRY.inc("registry_parse_inputs", len(results))
+
+    if 'input' in data:
+        return jsonify(dict(results[0], grammar=name))
+    return jsonify({"grammar": name, "results": results})
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus 文本格式的累计指标"""
+    return app.response_class(REGISTRY.render_prometheus(),
+                              mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 if __name__ == '__main__':
+    # PyInstaller 打包后的进程池子进程需要
+    multiprocessing.freeze_support()
+
     # 生产环境使用waitress服务器
     from waitress import serve
     import webbrowser
@@ -287,6 +504,11 @@ if __name__ == '__main__':
 
     port = 5000
 
+    # LR0_GRAMMAR_DIR 中的文法已在导入时预载
+    registry = get_grammar_registry()
+    if registry is not None:
+        print(f"已载入文法: {', '.join(registry.names()) or '（无）'}")
+
 
     # 自动打开浏览器
     def open_browser():
@@ -309,6 +531,6 @@ if __name__ == '__main__':
     """)
 
     try:
-        serve(app, host='0.0.0.0', port=port)
+        serve(app, host='0.0.0.0', port=port, threads=SERVER_THREADS)
     except KeyboardInterrupt:
         print("\n程序已停止")
\ No newline at end of file
@@ -0,0 +1,161 @@
+# bench/generators.py
+"""
+基准测试用的文法与输入串生成器。
+
+文法以文本形式返回（与 Web 页面输入格式相同），符号之间用空格分隔；
+引擎按字符切分输入串，所以终结符都是单个字符。
+"""
+import random
+
+# 可用作终结符的单字符（排除 -> = | @ $ # 等格式保留字符）
+TERMINAL_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789+*/%^&!~?:;,.()[]{}<>"
+
+
+def _render(rules):
+    """rules: [(左部, [候选式, ...])]，候选式为符号列表"""
+    lines = []
+    for lhs, alternatives in rules:
+        alts = [" ".join(alt) if alt else "@" for alt in alternatives]
+        lines.append(f"{lhs} -> {' | '.join(alts)}")
+    return "\n".join(lines)
+
+
+def expression_ladder(levels):
+    """
+    表达式优先级阶梯：每一层一个运算符，最内层为括号和原子。
+    E0 -> E0 o0 E1 | E1, ..., Ek -> ( E0 ) | n
+    """
+    operators = "+*/%^&!~?:;,.<>"
+    levels = max(1, min(levels, len(operators)))
+    rules = []
+    for i in range(levels):
+        rules.append((f"E{i}", [[f"E{i}", operators[i], f"E{i + 1}"], [f"E{i + 1}"]]))
+    rules.append((f"E{levels}", [["(", "E0", ")"], ["n"]]))
+    return _render(rules)
+
+
+def right_recursion(depth):
+    """长右递归链：S -> a N1，Ni -> a Ni | b N(i+1)，末端 -> c"""
+    rules = [("S", [["a", "N1"]])]
+    for i in range(1, depth + 1):
+        nxt = [f"N{i + 1}"] if i < depth else ["c"]
+        rules.append((f"N{i}", [["a", f"N{i}"], ["b"] + nxt]))
+    return _render(rules)
+
+
+def left_recursion(depth):
+    """长左递归链：S -> S a | N1，Ni -> Ni a | b N(i+1)，末端 -> c"""
+    rules = [("S", [["S", "a"], ["N1"]])]
+    for i in range(1, depth + 1):
+        nxt = [f"N{i + 1}"] if i < depth else ["c"]
+        rules.append((f"N{i}", [[f"N{i}", "a"], ["b"] + nxt]))
+    return _render(rules)
+
+
+def wide_alternation(width):
+    """
+    宽候选式：S -> N0 | N1 | ... ，Ni 展开为 i 的定长二进制编码（a/b）加结束符 c。
+    编码互不为前缀，因此文法是 LR(0) 的。
+    """
+    bits = max(1, (width - 1).bit_length())
+    rules = [("S", [[f"N{i}"] for i in range(width)])]
+    for i in range(width):
+        code = ["b" if (i >> k) & 1 else "a" for k in range(bits - 1, -1, -1)]
+        rules.append((f"N{i}", [code + ["c"]]))
+    return _render(rules)
+
+
+def random_cfg(n_productions, seed=0, n_terminals=8, max_rhs=4):
+    """
+    随机上下文无关文法，共 n_productions 条产生式。
+    每个非终结符至少有一条全终结符候选式，保证可产生终结符串。
+    """
+    rng = random.Random(seed)
+    n_nts = max(1, n_productions // 3)
+    nts = [f"X{i}" for i in range(n_nts)]
+    terminals = list(TERMINAL_ALPHABET[:n_terminals])
+
+    alternatives = {nt: [[rng.choice(terminals) for _ in range(rng.randint(1, 2))]] for nt in nts}
+    for _ in range(n_productions - n_nts):
+        lhs = rng.choice(nts)
+        length = rng.randint(1, max_rhs)
+        rhs = [rng.choice(nts) if rng.random() < 0.4 else rng.choice(terminals) for _ in range(length)]
+        if rhs not in alternatives[lhs]:
+            alternatives[lhs].append(rhs)
+    # 保证 X0 能到达其余非终结符
+    for i in range(1, n_nts):
+        alternatives[nts[i - 1]].append([rng.choice(terminals), nts[i]])
+    return _render([(nt, alternatives[nt]) for nt in nts])
+
+
+GENERATORS = {
+    "expression_ladder": expression_ladder,
+    "right_recursion": right_recursion,
+    "left_recursion": left_recursion,
+    "wide_alternation": wide_alternation,
+    "random_cfg": random_cfg,
+}
+
+
+def _min_heights(grammar):
+    """每个非终结符推导出终结符串所需的最小推导树高度"""
+    heights = {}
+    changed = True
+    while changed:
+        changed = False
+        for p in grammar.productions:
+            h = 0
+            for sym in p['right']:
+                if sym in grammar.non_terminals:
+                    if sym not in heights:
+                        h = None
+                        break
+                    h = max(h, heights[sym])
+            if h is None:
+                continue
+            if heights.get(p['left'], float('inf')) > h + 1:
+                heights[p['left']] = h + 1
+                changed = True
+    return heights
+
+
+def random_sentences(grammar, count, max_depth=12, max_length=2000, seed=0):
+    """
+    按文法随机推导出 count 个句子（字符串）。
+    深度超过 max_depth 后只选最小高度的候选式，使推导尽快结束。
+    """
+    rng = random.Random(seed)
+    heights = _min_heights(grammar)
+    by_left = {}
+    for p in grammar.productions:
+        by_left.setdefault(p['left'], []).append(p['right'])
+
+    def height_of(rhs):
+        return max([heights.get(s, 0) for s in rhs if s in grammar.non_terminals] or [0])
+
+    sentences = []
+    start = grammar.productions[0]['right'][0]
+    if start not in heights:
+        return sentences
+
+    for _ in range(count):
+        out = []
+        stack = [(start, 0)]
+        while stack and len(out) < max_length:
+            sym, depth = stack.pop()
+            if sym == '@':
+                continue
+            if sym not in grammar.non_terminals:
+                out.append(sym)
+                continue
+            candidates = [rhs for rhs in by_left[sym]
+                          if all(s in heights or s not in grammar.non_terminals for s in rhs)]
+            if depth >= max_depth:
+                best = min(height_of(rhs) for rhs in candidates)
+                candidates = [rhs for rhs in candidates if height_of(rhs) == best]
+            rhs = rng.choice(candidates)
+            for s in reversed(rhs):
+                stack.append((s, depth + 1))
+        if not stack:
+            sentences.append("".join(out))
+    return sentences
@@ -0,0 +1,170 @@
+# bench/run_bench.py
+"""
+分阶段基准测试：对每个生成的文法分别计时
+Grammar 解析、build_canonical_collection、build_parsing_table、AnalysisEngine.parse、
+analyze_grammar 和 Visualizer.render_dfa，结果以 JSON Lines 输出，便于对比各阶段的回归。
+
+用法（在项目根目录下运行）:
+    python -m bench.run_bench
+    python -m bench.run_bench --generators left_recursion,random_cfg --sizes 16,64 --output bench.jsonl
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from src.grammar import Grammar
+from src.parser import LR0Parser
+from src.engine import AnalysisEngine
+from src.glr import GLREngine
+from bench.generators import GENERATORS, random_sentences
+
+
+def _timed(func, repeat):
+    """执行 repeat 次，返回 (最短耗时秒数, 最后一次的返回值)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_case(name, size, args):
+    gen = GENERATORS[name]
+    text = gen(size, seed=args.seed) if name == "random_cfg" else gen(size)
+    record = {
+        "generator": name,
+        "size": size,
+        "stages": {},
+        "errors": {}
+    }
+    stages = record["stages"]
+
+    # 库函数中的调试输出不应混入结果
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    with quiet:
+        stages["grammar_parse"], grammar = _timed(lambda: Grammar(text), args.repeat)
+        record["productions"] = len(grammar.productions)
+
+        # 项目集构造会修改 parser 状态，每次计时都重新创建 parser，但只计构造本身
+        best = None
+        for _ in range(args.repeat):
+            parser = LR0Parser(Grammar(text))
+            start = time.perf_counter()
+            parser.build_canonical_collection()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        stages["canonical_collection"] = best
+
+        start = time.perf_counter()
+        parser.build_parsing_table()
+        stages["parsing_table"] = time.perf_counter() - start
+
+    record["states"] = len(parser.states)
+    record["items"] = sum(len(s) for s in parser.states)
+    record["is_lr0"] = parser.is_lr0
+    record["conflicts"] = len(parser.conflicts)
+
+    sentences = random_sentences(parser.grammar, args.sentences, max_depth=args.depth, seed=args.seed)
+    record["sentences"] = len(sentences)
+    record["input_symbols"] = sum(len(s) for s in sentences)
+
+    if parser.is_lr0:
+        engine = AnalysisEngine(parser)
+
+        def parse_all():
+            return sum(1 for s in sentences if engine.parse(s)[0])
+
+        stages["engine_parse"], accepted = _timed(parse_all, args.repeat)
+    else:
+        glr = GLREngine(parser)
+
+        def glr_all():
+            return sum(1 for s in sentences if glr.parse(s)[0])
+
+        stages["engine_parse"] = None
+        stages["glr_parse"], accepted = _timed(glr_all, args.repeat)
+    record["accepted"] = accepted
+
+    if not args.skip_analyze:
+        try:
+            from src.analysis import analyze_grammar
+            with quiet:
+                stages["analyze_grammar"], (_, error) = _timed(
+                    lambda: analyze_grammar(text, sentences[:args.analyze_inputs]), 1)
+            if error:
+                record["errors"]["analyze_grammar"] = error
+        except Exception as e:
+            stages["analyze_grammar"] = None
+            record["errors"]["analyze_grammar"] = str(e)
+
+    if not args.skip_render:
+        try:
+            from src.visualizer import Visualizer
+            with tempfile.TemporaryDirectory() as temp_dir, quiet:
+                viz = Visualizer(temp_dir)
+                terminals = sorted(parser.grammar.terminals)
+                stages["render_dfa"], _ = _timed(
+                    lambda: viz.render_dfa(parser.states, parser.transitions, terminals,
+                                           parser.conflict_state_ids), 1)
+                png = os.path.join(temp_dir, "dfa_graph.png")
+                record["render_bytes"] = os.path.getsize(png) if os.path.exists(png) else None
+        except Exception as e:
+            stages["render_dfa"] = None
+            record["errors"]["render_dfa"] = str(e)
+
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LR(0) 分析器分阶段基准测试")
+    parser.add_argument("--generators", default=",".join(GENERATORS),
+                        help="逗号分隔的生成器名称，可选: " + ", ".join(GENERATORS))
+    parser.add_argument("--sizes", default="8,16,32,64", help="逗号分隔的文法规模")
+    parser.add_argument("--sentences", type=int, default=20, help="每个文法随机生成的输入串数")
+    parser.add_argument("--depth", type=int, default=12, help="随机推导的深度预算")
+    parser.add_argument("--repeat", type=int, default=3, help="每个阶段重复次数，取最短时间")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--analyze-inputs", type=int, default=5,
+                        help="传给 analyze_grammar 的输入串数（含 trace，较慢）")
+    parser.add_argument("--skip-analyze", action="store_true", help="跳过 analyze_grammar 阶段")
+    parser.add_argument("--skip-render", action="store_true", help="跳过 Graphviz 渲染阶段")
+    parser.add_argument("--output", help="结果文件（JSON Lines），默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.generators.split(",") if n.strip()]
+    unknown = [n for n in names if n not in GENERATORS]
+    if unknown:
+        parser.error("未知的生成器: " + ", ".join(unknown))
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": args.repeat
+    }
+    try:
+        for name in names:
+            for size in sizes:
+                record = run_case(name, size, args)
+                record["meta"] = meta
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# bench/startup.py
+"""
+启动耗时基准：在全新的解释器进程中分别测量各入口的导入耗时，以及加载了哪些重量级依赖。
+- library: 只导入分析器核心（grammar / parser / engine）
+- analysis: 导入 src.analysis（Web 服务和进程池工作进程使用）
+- cli: 导入 src.cli
+- server: 导入 app.py（创建 Flask 应用，但不启动 waitress）
+结果以 JSON Lines 输出，每个入口一行。
+
+用法（在项目根目录下运行）:
+    python -m bench.startup
+    python -m bench.startup --repeat 10 --entries library,cli
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRIES = {
+    "library": "import src.grammar, src.parser, src.engine",
+    "analysis": "import src.analysis",
+    "cli": "import src.cli",
+    "server": "import app",
+}
+
+# 关注是否被加载的重量级依赖
+HEAVY_MODULES = ["flask", "werkzeug", "graphviz", "pandas", "numpy", "waitress"]
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_seconds": elapsed,
+                   "modules": len(sys.modules),
+                   "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement, repeat, cwd):
+    """返回 (各次进程总耗时, 各次导入耗时, 最后一次的探测结果)"""
+    code = _PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    process_times = []
+    import_times = []
+    probe = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True)
+        process_times.append(time.perf_counter() - start)
+        if out.returncode != 0:
+            raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "导入失败")
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        import_times.append(probe["import_seconds"])
+    return process_times, import_times, probe
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="各入口的启动耗时")
+    parser.add_argument("--entries", default=",".join(ENTRIES),
+                        help="逗号分隔的入口名称，可选: " + ", ".join(ENTRIES))
+    parser.add_argument("--repeat", type=int, default=5, help="每个入口启动的进程数")
+    parser.add_argument("--output", help="结果文件（JSON Lines），默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.entries.split(",") if n.strip()]
+    unknown = [n for n in names if n not in ENTRIES]
+    if unknown:
+        parser.error("未知的入口: " + ", ".join(unknown))
+
+    # 同时测一个空解释器，作为进程启动本身的基线
+    baseline, _, _ = measure("pass", args.repeat, os.getcwd())
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": args.repeat,
+        "interpreter_seconds": round(min(baseline), 6)
+    }
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for name in names:
+            record = {"entry": name, "statement": ENTRIES[name]}
+            try:
+                process_times, import_times, probe = measure(ENTRIES[name], args.repeat, os.getcwd())
+                record.update({
+                    "import_min": round(min(import_times), 6),
+                    "import_median": round(statistics.median(import_times), 6),
+                    "process_min": round(min(process_times), 6),
+                    "modules": probe["modules"],
+                    "heavy_modules": probe["heavy"]
+                })
+            except RuntimeError as e:
+                record["error"] = str(e)
+            record["meta"] = meta
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
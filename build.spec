@@ -15,11 +15,6 @@ hiddenimports = [
     'flask.cli',
     'werkzeug.middleware.proxy_fix',
     'graphviz',
-    'pandas',
-    'pandas._libs.tslibs.base',
-    'pandas._libs.tslibs.np_datetime',
-    'pandas._libs.tslibs.nattype',
-    'pandas._libs.skiplist',
     'waitress',
     'waitress.server',
     'src.engine',
@@ -27,12 +22,31 @@ hiddenimports = [
     'src.parser',
     'src.utils',
     'src.visualizer',
+    'src.compress',
+    'src.codegen',
+    'src.tree',
+    'src.glr',
+    'src.metrics',
+    'src.log',
+    'src.profiling',
+    'src.analysis',
+    'src.pool',
+    'src.limits',
+    'src.jobs',
+    'src.cli',
+    'src.lr1',
+    'src.loader',
+    'src.conflicts',
+    'src.live',
+    'src.httpcache',
+    'src.registry',
 ]
 
 # 排除不需要的模块（减小体积）
 excludes = [
     'matplotlib',
     'numpy',
+    'pandas',
     'scipy',
     'tensorflow',
     'keras',
@@ -0,0 +1,255 @@
+# src/cli.py
+"""
+命令行批处理：读入文法（或已保存的分析表），对语料中的每个输入串做分析，结果以 JSON Lines 或 CSV 输出。
+不导入 Flask 和 graphviz，启动开销只有分析器本身。
+
+用法（在项目根目录下运行）:
+    python -m src.cli grammar.txt --corpus inputs.txt
+    python -m src.cli grammar.txt --corpus samples/ --jobs 4 --format csv --output result.csv
+    python -m src.cli grammar.txt --save-table table.json --print-table < /dev/null
+    python -m src.cli calc.y --corpus exprs.txt      # yacc / EBNF 文法文件按扩展名识别（见 src/loader.py）
+    cat inputs.txt | python -m src.cli --load-table table.json
+
+语料：文件或标准输入中每个非空行是一个输入串；目录中每个文件（按文件名排序）是一个输入串。
+文法中有多字符终结符（如 yacc 的 NUM、'if'）时，输入串按空白分隔为记号，否则按字符。
+"""
+import argparse
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from src.loader import FORMATS, load_grammar
+from src.parser import LR0Parser
+from src.lr1 import PARSERS
+from src.engine import AnalysisEngine
+
+CSV_FIELDS = ["source", "input", "success", "steps", "error_position", "errors"]
+
+
+def read_corpus(path):
+    """逐个产生 (来源, 输入串)；path 为 None 或 "-" 时读标准输入"""
+    if path is None or path == "-":
+        for lineno, line in enumerate(sys.stdin, 1):
+            line = line.strip()
+            if line:
+                yield f"<stdin>:{lineno}", line
+    elif os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            full = os.path.join(path, name)
+            if os.path.isfile(full):
+                with open(full, encoding="utf-8") as f:
+                    yield name, f.read().strip()
+    else:
+        with open(path, encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.strip()
+                if line:
+                    yield f"{os.path.basename(path)}:{lineno}", line
+
+
+def build_parser(args):
+    """按参数构造分析器或载入已保存的分析表"""
+    if args.load_table:
+        with open(args.load_table, encoding="utf-8") as f:
+            return LR0Parser.from_dict(json.load(f))
+
+    grammar = load_grammar(args.grammar, args.grammar_format)
+    if grammar.errors:
+        raise ValueError("文法错误: " + "; ".join(grammar.errors))
+    if args.reduce:
+        grammar.reduce()
+    parser = PARSERS[args.algorithm](grammar)
+    parser.build_canonical_collection(workers=args.build_workers)
+    parser.build_parsing_table()
+    return parser
+
+
+class _Analyzer:
+    """在每个工作进程中构造一次，对单个输入串给出结果记录"""
+
+    def __init__(self, parser, options):
+        self.parser = parser
+        self.options = options
+        # 多字符终结符时输入串按空白切分为记号
+        self.split = any(len(t) > 1 for t in parser.grammar.terminals)
+        if parser.is_lr0:
+            self.engine = AnalysisEngine(parser)
+            self.glr = None
+        else:
+            from src.glr import GLREngine
+            self.engine = None
+            self.glr = GLREngine(parser)
+
+    def batch_capable(self):
+        """整批识别只输出 success/steps/error_position，要求确定的 LR 分析且不需要 trace、语法树和错误恢复"""
+        return self.engine is not None and not any(self.options.get(k) for k in ("trace", "tree", "errors"))
+
+    def analyze_batch(self, items, stats):
+        """items: [(来源, 输入串)]；用 AnalysisEngine.parse_batch 去重并共享公共前缀，统计写入 stats"""
+        texts = [text.split() if self.split else text for _, text in items]
+        results, batch_stats = self.engine.parse_batch(texts)
+        stats.update(batch_stats)
+        for (source, text), (success, steps, error_position) in zip(items, results):
+            yield {"source": source, "input": text, "success": success, "steps": steps,
+                   "error_position": error_position}
+
+    def analyze(self, source, text):
+        record = {"source": source, "input": text}
+        if self.split:
+            text = text.split()
+        if self.glr is not None:
+            success, forest = self.glr.parse(text)
+            trees = forest.count_trees() if success else 0
+            record.update(success=success, steps=self.glr.stats["gss_nodes"],
+                          error_position=self.glr.stats["error_position"],
+                          ambiguous=forest.is_ambiguous(),
+                          tree_count=trees if trees != float("inf") else "inf")
+            return record
+
+        if self.options.get("trace"):
+            success, trace = self.engine.parse(text)
+            # 出错位置为已移进的记号数（与 recognize() 一致；多字符记号时不能按剩余输入的字符数计算）
+            record.update(success=success, steps=len(trace),
+                          error_position=None if success else sum(row["action"].startswith('s') for row in trace),
+                          trace=trace)
+        else:
+            success, steps, error_position = self.engine.recognize(text)
+            record.update(success=success, steps=steps, error_position=error_position)
+        if self.options.get("tree") and success:
+            record["tree"] = self.engine.parse_tree(text)[1].to_dict()
+        if self.options.get("errors") and not success:
+            record["errors"] = self.engine.parse_with_recovery(text)[1]
+        return record
+
+
+_worker = None
+
+
+def _init_worker(table, options):
+    global _worker
+    _worker = _Analyzer(LR0Parser.from_dict(table), options)
+
+
+def _analyze_in_worker(item):
+    return _worker.analyze(*item)
+
+
+def analyze_corpus(parser, corpus, options, jobs=1, chunksize=64, stats=None):
+    """
+    按语料顺序产生结果记录；jobs > 1 时用多进程并行分析。
+    options["batch"] 为真且分析器支持时整批读入语料做前缀共享识别（忽略 jobs），统计写入 stats。
+    """
+    if options.get("batch"):
+        analyzer = _Analyzer(parser, options)
+        if analyzer.batch_capable():
+            yield from analyzer.analyze_batch(list(corpus), stats if stats is not None else {})
+            return
+
+    if jobs <= 1:
+        analyzer = _Analyzer(parser, options)
+        for source, text in corpus:
+            yield analyzer.analyze(source, text)
+        return
+
+    # 工作进程只接收一次序列化的分析表，不重新构造项目集
+    with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(parser.to_dict(), options)) as pool:
+        yield from pool.imap(_analyze_in_worker, corpus, chunksize)
+
+
+class _Writer:
+    def __init__(self, out, fmt):
+        self.out = out
+        self.fmt = fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            self.csv.writeheader()
+
+    def write(self, record):
+        if self.fmt == "csv":
+            row = dict(record)
+            if "errors" in row:
+                row["errors"] = json.dumps(row["errors"], ensure_ascii=False)
+            self.csv.writerow(row)
+        else:
+            self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m src.cli", description="LR(0) 分析器命令行批处理")
+    ap.add_argument("grammar", nargs="?", help="文法文件（与 Web 页面输入格式相同）")
+    ap.add_argument("--corpus", help="输入串语料：文件、目录，或 - 表示标准输入（默认）")
+    ap.add_argument("--load-table", help="载入 --save-table 保存的分析表，代替文法文件")
+    ap.add_argument("--save-table", help="把构造好的分析表保存为 JSON")
+    ap.add_argument("--grammar-format", choices=FORMATS,
+                    help="文法文件格式，默认按扩展名：.y 为 yacc，.ebnf/.bnf 为 ebnf，其余为 text")
+    ap.add_argument("--reduce", action="store_true", help="构造前先化简文法")
+    ap.add_argument("--algorithm", choices=sorted(PARSERS), default="lr0",
+                    help="lr0，或 lr1（Pager 合并的 LR(1)，分析表规模接近 LALR）")
+    ap.add_argument("--batch", action="store_true",
+                    help="整批读入语料，重复输入只分析一次、公共前缀共享（不能与 --trace/--tree/--errors 同用，忽略 --jobs）")
+    ap.add_argument("--jobs", type=int, default=1, help="并行进程数，0 表示 CPU 核数")
+    ap.add_argument("--build-workers", type=int, default=1, help="并行构造项目集规范族的进程数（大文法时有效）")
+    ap.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    ap.add_argument("--output", help="结果文件，默认标准输出")
+    ap.add_argument("--trace", action="store_true", help="结果中包含完整 trace（仅 jsonl）")
+    ap.add_argument("--tree", action="store_true", help="被接受的输入附带语法树（仅 jsonl）")
+    ap.add_argument("--errors", action="store_true", help="被拒绝的输入做错误恢复，报告全部语法错误")
+    ap.add_argument("--print-dfa", action="store_true", help="在标准错误输出 DFA 状态集")
+    ap.add_argument("--print-table", action="store_true", help="在标准错误输出分析表")
+    args = ap.parse_args(argv)
+
+    if not args.grammar and not args.load_table:
+        ap.error("需要文法文件或 --load-table")
+
+    start = time.perf_counter()
+    try:
+        parser = build_parser(args)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 2
+    build_seconds = time.perf_counter() - start
+
+    if args.save_table:
+        with open(args.save_table, "w", encoding="utf-8") as f:
+            json.dump(parser.to_dict(), f, ensure_ascii=False)
+
+    # 控制台打印只走标准错误，避免混入结果
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.print_dfa:
+            parser.print_dfa()
+        if args.print_table:
+            parser.print_table()
+
+    if args.save_table and args.corpus is None and sys.stdin.isatty():
+        return 0
+
+    options = {"trace": args.trace, "tree": args.tree, "errors": args.errors, "batch": args.batch}
+    batch_stats = {}
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    total = accepted = 0
+    try:
+        writer = _Writer(out, args.format)
+        for record in analyze_corpus(parser, read_corpus(args.corpus), options, jobs, stats=batch_stats):
+            writer.write(record)
+            total += 1
+            accepted += bool(record["success"])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"{total} 个输入串，接受 {accepted} 个；构造 {build_seconds * 1000:.1f} ms，"
+          f"总耗时 {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+    if batch_stats:
+        print(f"去重后 {batch_stats['unique']} 个；分析 {batch_stats['steps']} 步，"
+              f"逐个分析需 {batch_stats['naive_steps']} 步，节省 {batch_stats['steps_saved']} 步", file=sys.stderr)
+    return 0 if accepted == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
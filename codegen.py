@@ -0,0 +1,172 @@
+# src/codegen.py
+from src.compress import CompressedTable
+
+
+_TEMPLATE = '''# -*- coding: utf-8 -*-
+# 由 LR(0) 文法分析器自动生成，请勿手工修改
+"""
+独立的 LR 语法分析模块（分析表已固化为常量，运行时无需构造 Grammar/LR0Parser）
+
+文法:
+{grammar_doc}
+用法:
+    success, error_pos = parse("bccd")          # 按字符切分
+    success, error_pos = parse(["id", "+", "id"])  # 或传入记号列表
+"""
+
+# 产生式: (左部, 右部)
+PRODUCTIONS = {productions}
+
+# 终结符 -> 列号
+TERMINALS = {terminals}
+
+# 非终结符 -> 列号
+NON_TERMINALS = {non_terminals}
+
+# ACTION 编码: 0 出错, 1..N 移进到状态 v-1, ACCEPT 接受, 负数 -v-1 为规约所用产生式
+ACCEPT = {accept}
+
+ACTION_ROW = {action_row}
+ACTION_BASE = {action_base}
+ACTION_DEFAULT = {action_default}
+ACTION_CHECK = {action_check}
+ACTION_VALUE = {action_value}
+
+GOTO_ROW = {goto_row}
+GOTO_BASE = {goto_base}
+GOTO_CHECK = {goto_check}
+GOTO_VALUE = {goto_value}
+
+# 规约时弹出的符号数（空产生式为 0）和左部非终结符列号
+PROD_LEN = {prod_len}
+PROD_LHS = {prod_lhs}
+
+
+def parse(tokens):
+    """
+    分析输入串，返回 (是否接受, 出错位置)；接受时出错位置为 None
+    """
+    toks = list(tokens)
+    toks.append('$')
+    terminals = TERMINALS
+    a_row, a_base, a_default, a_check, a_value = ACTION_ROW, ACTION_BASE, ACTION_DEFAULT, ACTION_CHECK, ACTION_VALUE
+    g_row, g_base, g_check, g_value = GOTO_ROW, GOTO_BASE, GOTO_CHECK, GOTO_VALUE
+    prod_len, prod_lhs, accept = PROD_LEN, PROD_LHS, ACCEPT
+
+    stack = [0]
+    state = 0
+    pos = 0
+    col = terminals.get(toks[0], -1)
+    while True:
+        if col < 0:
+            v = a_default[state]
+        else:
+            i = a_base[state] + col
+            v = a_value[i] if a_check[i] == a_row[state] else a_default[state]
+
+        if v > 0:
+            if v == accept:
+                return True, None
+            state = v - 1
+            stack.append(state)
+            pos += 1
+            col = terminals.get(toks[pos], -1)
+        elif v < 0:
+            p = -v - 1
+            n = prod_len[p]
+            if n:
+                del stack[-n:]
+            top = stack[-1]
+            i = g_base[top] + prod_lhs[p]
+            if g_check[i] != g_row[top]:
+                return False, pos
+            state = g_value[i]
+            stack.append(state)
+        else:
+            return False, pos
+'''
+
+
+def _format_tuple(values, per_line=20):
+    """把整数序列格式化为分行的元组字面量"""
+    values = list(values)
+    if not values:
+        return "()"
+    if len(values) <= per_line:
+        return "(" + ", ".join(str(v) for v in values) + ",)"
+    lines = []
+    for i in range(0, len(values), per_line):
+        lines.append("    " + ", ".join(str(v) for v in values[i:i + per_line]) + ",")
+    return "(\n" + "\n".join(lines) + "\n)"
+
+
+def _encode_action(action, accept):
+    if action is None:
+        return 0
+    if action == 'acc':
+        return accept
+    if action.startswith('s'):
+        return int(action[1:]) + 1
+    return -int(action[1:]) - 1
+
+
+def generate_parser_module(parser):
+    """
+    根据已构建好分析表的 parser 生成独立的 Python 模块源码。
+    分析表沿用 CompressedTable 的梳状向量，按状态展开行号/偏移，并补齐尾部，运行时无需越界判断。
+    """
+    if not parser.is_lr0:
+        raise ValueError("分析表存在冲突，无法生成确定性分析器: " + "; ".join(parser.conflicts))
+
+    grammar = parser.grammar
+    table = CompressedTable(parser)
+    n_states = len(parser.states)
+    accept = n_states + 1
+
+    values = [_encode_action(v, accept) for v in table.values]
+
+    action_row = list(table.action_row)
+    action_base = [table.action_base[r] for r in action_row]
+    action_default = [values[table.default_action[r]] if table.default_action[r] != -1 else 0
+                      for r in action_row]
+    pad = len(table.terminal_index)
+    action_check = list(table.action_check) + [-1] * pad
+    action_value = [values[v] for v in table.action_value] + [0] * pad
+
+    goto_row = list(table.goto_row)
+    goto_base = [table.goto_base[r] for r in goto_row]
+    pad = len(table.non_terminal_index)
+    goto_check = list(table.goto_check) + [-1] * pad
+    goto_value = list(table.goto_value) + [0] * pad
+
+    prod_len = []
+    prod_lhs = []
+    for p in grammar.productions:
+        rhs = p['right']
+        prod_len.append(0 if rhs == ['@'] else len(rhs))
+        # 拓广产生式不会被规约，列号取 0 占位
+        prod_lhs.append(table.non_terminal_index.get(p['left'], 0))
+
+    productions = tuple((p['left'], tuple(p['right'])) for p in grammar.productions)
+    grammar_doc = "\n".join(f"    {i}. {grammar.get_production_str(i)}"
+                            for i in range(len(grammar.productions)))
+    grammar_doc = grammar_doc.replace('\\', '\\\\').replace('"""', '\\"\\"\\"')
+
+    return _TEMPLATE.format(
+        grammar_doc=grammar_doc,
+        productions=repr(productions),
+        terminals=repr(dict(sorted(table.terminal_index.items(), key=lambda kv: kv[1]))),
+        non_terminals=repr(dict(sorted(table.non_terminal_index.items(), key=lambda kv: kv[1]))),
+        accept=accept,
+        action_row=_format_tuple(action_row),
+        action_base=_format_tuple(action_base),
+        action_default=_format_tuple(action_default),
+        action_check=_format_tuple(action_check),
+        action_value=_format_tuple(action_value),
+        goto_row=_format_tuple(goto_row),
+        goto_base=_format_tuple(goto_base),
+        goto_check=_format_tuple(goto_check),
+        goto_value=_format_tuple(goto_value),
+        prod_len=_format_tuple(prod_len),
+        prod_lhs=_format_tuple(prod_lhs),
+    )
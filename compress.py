@@ -0,0 +1,202 @@
+# src/compress.py
+import sys
+from array import array
+
+
+class CompressedTable:
+    """
+    压缩后的 LR 分析表，可替代 LR0Parser 中 dict 套 dict 形式的 ACTION/GOTO 表。
+
+    压缩步骤：
+    1. 动作字符串（s3、r2、acc……）统一放入值池，表格中只存整数下标；
+    2. 每个状态选出出现次数最多的规约动作作为默认规约，从行中删去；
+    3. 完全相同的行合并为一行；
+    4. 剩余的稀疏项用梳状向量（双偏移 base/check）打包成一维数组。
+    """
+
+    def __init__(self, parser):
+        grammar = parser.grammar
+        self.n_states = len(parser.states)
+
+        terminals = sorted(grammar.terminals)
+        non_terminals = sorted(nt for nt in grammar.non_terminals if nt != grammar.start_symbol)
+        self.terminal_index = {t: i for i, t in enumerate(terminals)}
+        self.non_terminal_index = {nt: i for i, nt in enumerate(non_terminals)}
+
+        # 动作字符串池
+        self.values = []
+        self._value_index = {}
+
+        # === ACTION 表 ===
+        action_rows = []
+        defaults = []
+        for i in range(self.n_states):
+            row = parser.action_table.get(i, {})
+            default = self._pick_default(row)
+            entries = []
+            for sym, act in row.items():
+                if act == default or sym not in self.terminal_index:
+                    continue
+                entries.append((self.terminal_index[sym], self._intern(act)))
+            entries.sort()
+            action_rows.append(entries)
+            defaults.append(self._intern(default) if default else -1)
+
+        self.action_row, unique_rows, unique_defaults = self._merge_rows(action_rows, defaults)
+        self.default_action = array('i', unique_defaults)
+        self.action_base, self.action_check, self.action_value = self._pack(unique_rows)
+
+        # === GOTO 表 ===
+        goto_rows = []
+        for i in range(self.n_states):
+            row = parser.goto_table.get(i, {})
+            entries = sorted((self.non_terminal_index[nt], dest)
+                             for nt, dest in row.items() if nt in self.non_terminal_index)
+            goto_rows.append(entries)
+
+        self.goto_row, unique_goto_rows, _ = self._merge_rows(goto_rows, [-1] * self.n_states)
+        self.goto_base, self.goto_check, self.goto_value = self._pack(unique_goto_rows)
+
+        self._report = self._build_report(parser, len(unique_rows), len(unique_goto_rows),
+                                          sum(1 for d in defaults if d != -1))
+
+    def _intern(self, action):
+        idx = self._value_index.get(action)
+        if idx is None:
+            idx = len(self.values)
+            self.values.append(action)
+            self._value_index[action] = idx
+        return idx
+
+    @staticmethod
+    def _pick_default(row):
+        """选出行内出现次数最多的规约动作（冲突项不参与）"""
+        counts = {}
+        for act in row.values():
+            if act.startswith('r') and '/' not in act:
+                counts[act] = counts.get(act, 0) + 1
+        if not counts:
+            return None
+        # 次数相同时取编号最小的产生式，保证结果稳定
+        return max(sorted(counts), key=lambda a: counts[a])
+
+    @staticmethod
+    def _merge_rows(rows, defaults):
+        """合并相同的行，返回 (状态->行号, 唯一行列表, 唯一行的默认动作)"""
+        row_map = array('i')
+        unique_rows = []
+        unique_defaults = []
+        seen = {}
+        for entries, default in zip(rows, defaults):
+            key = (default, tuple(entries))
+            row_id = seen.get(key)
+            if row_id is None:
+                row_id = len(unique_rows)
+                seen[key] = row_id
+                unique_rows.append(entries)
+                unique_defaults.append(default)
+            row_map.append(row_id)
+        return row_map, unique_rows, unique_defaults
+
+    @staticmethod
+    def _pack(rows):
+        """
+        梳状向量打包（first-fit）：为每行找一个偏移 base，使该行各项落在空槽位上。
+        查表时 check[base + col] == 行号 才算命中。
+        """
+        base = array('i', [0] * len(rows))
+        check = array('i')
+        value = array('i')
+
+        # 先放项多的行，空位更容易被后面的稀疏行填上
+        order = sorted(range(len(rows)), key=lambda r: (-len(rows[r]), r))
+        first_free = 0  # 第一个空槽位，之前的位置都已占满
+        for row_id in order:
+            entries = rows[row_id]
+            if not entries:
+                continue
+            offset = max(0, first_free - entries[0][0])
+            while True:
+                fits = True
+                for col, _ in entries:
+                    pos = offset + col
+                    if pos < len(check) and check[pos] != -1:
+                        fits = False
+                        break
+                if fits:
+                    break
+                offset += 1
+
+            need = offset + entries[-1][0] + 1
+            if need > len(check):
+                grow = need - len(check)
+                check.extend([-1] * grow)
+                value.extend([0] * grow)
+            for col, val in entries:
+                check[offset + col] = row_id
+                value[offset + col] = val
+            base[row_id] = offset
+            while first_free < len(check) and check[first_free] != -1:
+                first_free += 1
+        return base, check, value
+
+    def action(self, state, symbol):
+        """查 ACTION 表，返回动作字符串；出错时返回 None"""
+        row = self.action_row[state]
+        col = self.terminal_index.get(symbol)
+        if col is not None:
+            pos = self.action_base[row] + col
+            if pos < len(self.action_check) and self.action_check[pos] == row:
+                return self.values[self.action_value[pos]]
+        default = self.default_action[row]
+        return self.values[default] if default != -1 else None
+
+    def goto(self, state, symbol):
+        """查 GOTO 表，返回目标状态；不存在时返回 None"""
+        col = self.non_terminal_index.get(symbol)
+        if col is None:
+            return None
+        row = self.goto_row[state]
+        pos = self.goto_base[row] + col
+        if pos < len(self.goto_check) and self.goto_check[pos] == row:
+            return self.goto_value[pos]
+        return None
+
+    def _build_report(self, parser, unique_action_rows, unique_goto_rows, default_reductions):
+        n_t = len(self.terminal_index)
+        n_nt = len(self.non_terminal_index)
+        original_entries = (sum(len(r) for r in parser.action_table.values())
+                            + sum(len(r) for r in parser.goto_table.values()))
+
+        # 原表大小：外层和内层 dict 本身占用的字节（动作字符串与新表共享，不计入）
+        original_bytes = sys.getsizeof(parser.action_table) + sys.getsizeof(parser.goto_table)
+        for row in parser.action_table.values():
+            original_bytes += sys.getsizeof(row)
+        for row in parser.goto_table.values():
+            original_bytes += sys.getsizeof(row)
+
+        arrays = [self.action_row, self.default_action, self.action_base, self.action_check,
+                  self.action_value, self.goto_row, self.goto_base, self.goto_check, self.goto_value]
+        compressed_bytes = sum(a.itemsize * len(a) for a in arrays)
+        compressed_bytes += sys.getsizeof(self.values) + sys.getsizeof(self.terminal_index) \
+            + sys.getsizeof(self.non_terminal_index)
+
+        return {
+            "states": self.n_states,
+            "terminals": n_t,
+            "non_terminals": n_nt,
+            "dense_cells": self.n_states * (n_t + n_nt),
+            "original_entries": original_entries,
+            "default_reductions": default_reductions,
+            "unique_action_rows": unique_action_rows,
+            "unique_goto_rows": unique_goto_rows,
+            "action_vector_length": len(self.action_check),
+            "goto_vector_length": len(self.goto_check),
+            "original_bytes": original_bytes,
+            "compressed_bytes": compressed_bytes,
+            "ratio": round(compressed_bytes / original_bytes, 4) if original_bytes else 0.0
+        }
+
+    def size_report(self):
+        """返回压缩前后的规模统计"""
+        return dict(self._report)
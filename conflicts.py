@@ -0,0 +1,359 @@
+# src/conflicts.py
+"""
+冲突解释：对分析表中的每个冲突给出到达冲突状态的最短活前缀，以及每个候选动作各自能被接受的示例输入。
+
+- 活前缀：从状态 0 沿 DFA 转移做一次 BFS，得到所有状态的最短符号前缀（与状态数、转移数成线性关系），
+  所有冲突共用同一次遍历。动作是否可行取决于栈中更深的状态（规约后转移到哪里），
+  因此再沿反向转移索引从冲突状态向前扩展（有界 BFS，由短到长），
+  优先选取所有动作在向前看符号下都可行的活前缀，找不到时每个动作各自选取可行的活前缀。
+- 示例输入：活前缀中的非终结符替换为其最短终结符串；在冲突点强制执行某个动作后，
+  沿状态的核心项目逐层补全到接受（不搜索），补全失败时在分析器格局（状态栈）上做有界 BFS。
+  若两个动作得到同一个示例输入，该输入有两种不同的分析，文法是二义的。
+- 每个动作的 status: "example"（找到示例）、"dead"（搜索范围内的任何活前缀下执行后向前看符号都立即出错，
+  如 LR(0) 在所有终结符上规约造成、SLR/LR(1) 下不存在的冲突）、"not_found"（搜索上限内未找到）。
+"""
+from collections import deque
+from itertools import islice
+
+# 每个动作的后续串搜索最多展开的格局数，以及单个向前看符号连续规约的步数上限
+MAX_SEARCH_NODES = 200
+MAX_REDUCE_STEPS = 100
+# 每个冲突沿反向转移最多尝试的活前缀数
+MAX_PREFIXES = 64
+# 后续串搜索中每个格局平均可执行的查表步数，总步数上限为 max_nodes 倍
+SEARCH_STEPS_PER_NODE = 10
+
+
+class ConflictExplainer:
+    def __init__(self, parser, max_nodes=MAX_SEARCH_NODES, max_prefixes=MAX_PREFIXES):
+        self.parser = parser
+        self.max_nodes = max_nodes
+        self.max_prefixes = max_prefixes
+        self.productions = parser.grammar.productions
+        self._paths = None
+        self._reverse = None
+        self._yields = None
+        self._items_cache = {}
+        self._index_of = None
+        self._feed_steps = 0  # _feed 累计的查表步数，用于限制后续串搜索的总工作量
+
+    # ---- 预处理 ----
+    def shortest_paths(self):
+        """从状态 0 出发的 BFS：{状态: (前驱状态, 符号)}，状态 0 为 None"""
+        if self._paths is None:
+            out_edges = {}
+            for (src, sym), dest in self.parser.transitions.items():
+                out_edges.setdefault(src, []).append((sym, dest))
+            paths = {0: None}
+            queue = deque([0])
+            while queue:
+                state = queue.popleft()
+                for sym, dest in out_edges.get(state, ()):
+                    if dest not in paths:
+                        paths[dest] = (state, sym)
+                        queue.append(dest)
+            self._paths = paths
+        return self._paths
+
+    def reverse_index(self):
+        """反向转移索引：{目标状态: [(源状态, 符号)]}"""
+        if self._reverse is None:
+            reverse = {}
+            for (src, sym), dest in self.parser.transitions.items():
+                reverse.setdefault(dest, []).append((src, sym))
+            self._reverse = reverse
+        return self._reverse
+
+    def shortest_yields(self):
+        """每个非终结符推导出的最短终结符串（不可产生终结符串的非终结符不在结果中）"""
+        if self._yields is None:
+            yields = {}
+            changed = True
+            while changed:
+                changed = False
+                for p in self.productions:
+                    candidate = []
+                    for sym in p['right']:
+                        if sym == '@':
+                            continue
+                        if sym in self.parser.grammar.non_terminals:
+                            if sym not in yields:
+                                break
+                            candidate.extend(yields[sym])
+                        else:
+                            candidate.append(sym)
+                    else:
+                        current = yields.get(p['left'])
+                        if current is None or len(candidate) < len(current):
+                            yields[p['left']] = candidate
+                            changed = True
+            self._yields = yields
+        return self._yields
+
+    def path_to(self, state):
+        """到达 state 的 (状态栈, 符号前缀)；不可达时返回 (None, None)"""
+        paths = self.shortest_paths()
+        if state not in paths:
+            return None, None
+        stack = [state]
+        symbols = []
+        while paths[stack[-1]] is not None:
+            prev, sym = paths[stack[-1]]
+            stack.append(prev)
+            symbols.append(sym)
+        stack.reverse()
+        symbols.reverse()
+        return stack, symbols
+
+    def candidate_stacks(self, state):
+        """
+        逐个产生到达 state 的 (状态栈, 符号前缀)，第一个即最短活前缀。
+        沿反向转移从 state 向前扩展出路径后缀 s → … → state，再接上到达 s 的最短路径；
+        按后缀长度由短到长，最多扩展 max_prefixes 个后缀，相同的状态栈只产生一次。
+        """
+        if state not in self.shortest_paths():
+            return
+        reverse = self.reverse_index()
+        seen = set()
+        queue = deque([([state], [])])
+        expanded = 0
+        while queue and expanded < self.max_prefixes:
+            states, symbols = queue.popleft()
+            expanded += 1
+            head_stack, head_prefix = self.path_to(states[0])
+            if head_stack is None:
+                continue
+            stack = head_stack[:-1] + states
+            key = tuple(stack)
+            if key not in seen:
+                seen.add(key)
+                yield stack, head_prefix + symbols
+            for src, sym in reverse.get(states[0], ()):
+                queue.append(([src] + states, [sym] + symbols))
+
+    def _prefix_input(self, prefix):
+        """活前缀对应的终结符串；含不可产生终结符串的非终结符时为 None"""
+        yields = self.shortest_yields()
+        non_terminals = self.parser.grammar.non_terminals
+        tokens = []
+        for sym in prefix:
+            if sym in non_terminals:
+                if sym not in yields:
+                    return None
+                tokens.extend(yields[sym])
+            else:
+                tokens.append(sym)
+        return tokens
+
+    # ---- 分析器格局上的模拟 ----
+    def _feed(self, stack, token, forced=None):
+        """
+        以 token 为向前看执行规约直到移进或接受；forced 为第一次查表时强制使用的动作，
+        其余冲突取第一个候选动作。返回移进后的新栈、"acc" 或 None（出错）。
+        """
+        stack = list(stack)
+        action_table = self.parser.action_table
+        goto_table = self.parser.goto_table
+        for _ in range(MAX_REDUCE_STEPS):
+            self._feed_steps += 1
+            if forced is not None:
+                action, forced = forced, None
+            else:
+                action = action_table[stack[-1]].get(token)
+                if action is None:
+                    return None
+                action = action.split('/')[0]
+            if action == 'acc':
+                return "acc"
+            if action.startswith('s'):
+                stack.append(int(action[1:]))
+                return stack
+            prod = self.productions[int(action[1:])]
+            if prod['right'] != ['@']:
+                del stack[-len(prod['right']):]
+            goto_state = goto_table[stack[-1]].get(prod['left'])
+            if goto_state is None:
+                return None
+            stack.append(goto_state)
+        return None
+
+    def _completion_items(self, state):
+        """
+        state 中可用于补全的核心项目 [(len(γ 的最短串), -|β|, 产生式编号, |β|, γ 的最短串)]，按串长排序。
+        A → β•γ 为状态的核心项目时，栈顶 |β| 个状态之下的状态必含 A → •βγ，
+        因此补全 γ 的最短终结符串后可以弹出 |β| 个状态并转移到 GOTO(·, A)。
+        """
+        cached = self._items_cache.get(state)
+        if cached is None:
+            yields = self.shortest_yields()
+            non_terminals = self.parser.grammar.non_terminals
+            cached = []
+            for item in self.parser.states[state]:
+                dot = item['dot']
+                if dot == 0 or item['right'] == ['@']:
+                    continue
+                rest = []
+                for sym in item['right'][dot:]:
+                    if sym in non_terminals:
+                        if sym not in yields:
+                            break
+                        rest.extend(yields[sym])
+                    else:
+                        rest.append(sym)
+                else:
+                    prod_idx = self._production_index(item)
+                    cached.append((len(rest), -dot, prod_idx, dot, rest))
+            cached.sort()
+            self._items_cache[state] = cached
+        return cached
+
+    def _production_index(self, item):
+        if self._index_of is None:
+            self._index_of = {}
+            for i, p in enumerate(self.productions):
+                self._index_of.setdefault((p['left'], tuple(p['right'])), i)
+        return self._index_of[(item['left'], tuple(item['right']))]
+
+    def _complete(self, stack):
+        """
+        从格局 stack 出发使输入被接受的后续终结符串。
+        先沿核心项目逐层补全（每层弹出 |β| 个状态，栈不会变深，线性时间）；
+        失败时在 max_nodes 个格局内做 BFS。都找不到时返回 None。
+        """
+        rest = self._complete_by_items(stack)
+        if rest is not None:
+            return rest
+        return self._complete_by_search(stack)
+
+    def _complete_by_items(self, stack):
+        stack = list(stack)
+        suffix = []
+        goto_table = self.parser.goto_table
+        for _ in range(4 * len(stack) + 100):
+            depth = len(stack) - 1
+            for _len, _neg, prod_idx, dot, rest in self._completion_items(stack[-1]):
+                if dot <= depth:
+                    break
+            else:
+                return None
+            suffix.extend(rest)
+            if prod_idx == 0:
+                return suffix
+            del stack[len(stack) - dot:]
+            goto_state = goto_table[stack[-1]].get(self.productions[prod_idx]['left'])
+            if goto_state is None:
+                return None
+            stack.append(goto_state)
+        return None
+
+    def _complete_by_search(self, stack):
+        if self._feed(stack, '$') == "acc":
+            return []
+        seen = {tuple(stack)}
+        queue = deque([(stack, [])])
+        expanded = 0
+        # 带环的规约链会让单次 _feed 执行到 MAX_REDUCE_STEPS，因此同时限制总查表步数
+        max_steps = self._feed_steps + self.max_nodes * SEARCH_STEPS_PER_NODE
+        while queue and expanded < self.max_nodes and self._feed_steps < max_steps:
+            stack, suffix = queue.popleft()
+            expanded += 1
+            for token in sorted(self.parser.action_table[stack[-1]]):
+                if token == '$':
+                    continue
+                after = self._feed(stack, token)
+                if not isinstance(after, list):
+                    continue
+                key = tuple(after)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if self._feed(after, '$') == "acc":
+                    return suffix + [token]
+                queue.append((after, suffix + [token]))
+        return None
+
+    # ---- 解释 ----
+    def conflicts(self):
+        """逐个产生分析表中的冲突 (状态, 符号, [动作...])，按状态和符号排序；只扫描冲突状态的行"""
+        for state in sorted(self.parser.conflict_state_ids):
+            for symbol, action in sorted(self.parser.action_table[state].items()):
+                if '/' in action:
+                    yield state, symbol, action.split('/')
+
+    def _choose_stacks(self, state, symbol, actions):
+        """
+        为每个动作选取活前缀：{动作: (状态栈, 符号前缀, 强制执行该动作后的结果)}。
+        优先选所有动作执行后都不立即出错的同一个活前缀（同一前缀下才能判断二义）；
+        否则每个动作取第一个可行的活前缀，都不可行的动作取最短活前缀（结果为 None）。
+        """
+        chosen = {}
+        shortest = None
+        for stack, prefix in self.candidate_stacks(state):
+            # 强制执行该动作；规约后 symbol 仍是向前看，_feed 继续规约直到移进它
+            afters = [self._feed(stack, symbol, forced=action) for action in actions]
+            if shortest is None:
+                shortest = (stack, prefix, afters)
+            if all(after is not None for after in afters):
+                return {action: (stack, prefix, after) for action, after in zip(actions, afters)}
+            for action, after in zip(actions, afters):
+                if after is not None and action not in chosen:
+                    chosen[action] = (stack, prefix, after)
+        if shortest is None:
+            return None
+        for action, after in zip(actions, shortest[2]):
+            chosen.setdefault(action, (shortest[0], shortest[1], after))
+        return chosen
+
+    def explain(self, state, symbol, actions):
+        detail = {
+            "state": state,
+            "symbol": symbol.replace('$', '#'),
+            "actions": [],
+            "prefix": None,
+            "prefix_input": None,
+            "ambiguous": False
+        }
+        chosen = self._choose_stacks(state, symbol, actions)
+        if chosen is None:
+            return detail
+        # 各动作共用的活前缀；不共用时给出第一个动作的活前缀
+        detail["prefix"] = chosen[actions[0]][1]
+        detail["prefix_input"] = self._prefix_input(detail["prefix"])
+
+        examples = []
+        for action in actions:
+            entry = {"action": action, "production": None, "status": "example"}
+            if action.startswith('r'):
+                p = self.productions[int(action[1:])]
+                entry["production"] = f"{p['left']} → {' '.join(p['right'])}"
+
+            _stack, prefix, after = chosen[action]
+            entry["prefix"] = prefix
+            if after == "acc":
+                continuation = []
+            elif after is None:
+                # 任何候选活前缀下执行该动作后 symbol 都立即出错
+                continuation = None
+                entry["status"] = "dead"
+            else:
+                rest = self._complete(after)
+                continuation = None if rest is None else [symbol] + rest
+                if rest is None:
+                    entry["status"] = "not_found"
+            entry["continuation"] = continuation
+            prefix_input = self._prefix_input(prefix)
+            if continuation is not None and prefix_input is not None:
+                entry["example"] = prefix_input + continuation
+            else:
+                entry["example"] = None
+            examples.append(entry)
+        detail["actions"] = examples
+
+        found = [e["example"] for e in examples if e["example"] is not None]
+        detail["ambiguous"] = len(found) != len(set(tuple(e) for e in found))
+        return detail
+
+    def explain_all(self, limit=50):
+        """解释前 limit 个冲突，返回可 JSON 化的列表"""
+        return [self.explain(state, symbol, actions)
+                for state, symbol, actions in islice(self.conflicts(), limit)]
@@ -1,15 +1,133 @@
 # src/engine.py
+import threading
+from collections import OrderedDict
+
 from src.utils import TableRenderer
+from src.tree import ParseTree, normalize_actions
+
+
+def _common_prefix_len(a, b):
+    """二分查找公共前缀长度，比较由切片在 C 层完成"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class ParseCheckpoints:
+    """
+    最近分析过的输入串及其检查点，供修改后的输入从检查点继续分析（AnalysisEngine.parse / parse_compact）。
+    每移进 interval 个记号保存一次 (偏移, 状态栈, 符号栈, trace 步数)。检查点在移进第 k 个记号之后、
+    以下一个记号为向前看做规约之前保存，只依赖输入的前 k 个记号，因此对前 k 个记号相同的任何输入都有效。
+    完整格式的 trace 每步都含整个栈和剩余输入，大小与输入长度的平方成正比，
+    因此除条目数外还按估计的总字节数 max_bytes 淘汰，超过 max_bytes 的单个条目不保存。
+    """
+
+    # 估计内存占用：完整格式每步的 dict 与其中字符串的固定开销，紧凑格式每步的 list
+    ROW_BYTES = 450
+    OP_BYTES = 120
+
+    def __init__(self, interval=32, max_inputs=64, max_bytes=4 * 1024 * 1024):
+        self.interval = interval
+        self.max_inputs = max_inputs
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (类别, 输入串) -> (检查点列表, trace, success, 估计字节数)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def find(self, kind, input_string):
+        """
+        在同一类别（trace 格式与分析表，见 AnalysisEngine._checkpoint_kind）的已保存输入中找与 input_string 公共前缀最长的一个。
+        :return: None（没有可用的检查点），或 (旧输入串, 检查点列表, 旧 trace, 旧结果)；
+                 检查点列表截止到公共前缀内最后一个检查点，输入完全相同时为 None
+        """
+        with self._lock:
+            best = None
+            best_len = 0
+            for key, entry in self._entries.items():
+                if key[0] != kind:
+                    continue
+                if key[1] == input_string:
+                    self._entries.move_to_end(key)
+                    return input_string, None, entry[1], entry[2]
+                n = _common_prefix_len(key[1], input_string)
+                if n > best_len:
+                    best, best_len = key, n
+            if best is None:
+                return None
+            marks, trace, success, _size = self._entries[best]
+            usable = min(best_len // self.interval, len(marks))
+            if usable == 0:
+                return None
+            self._entries.move_to_end(best)
+            return best[1], marks[:usable], trace, success
+
+    def _estimate_bytes(self, input_string, marks, trace):
+        size = 2 * len(input_string)
+        for mark in marks:
+            size += 64 + 16 * len(mark[1])
+        for row in trace:
+            if isinstance(row, dict):
+                size += self.ROW_BYTES + len(row["state_stack"]) + len(row["symbol_stack"]) + len(row["input"])
+            else:
+                size += self.OP_BYTES
+        return size
+
+    def save(self, kind, input_string, marks, trace, success):
+        key = (kind, input_string)
+        size = self._estimate_bytes(input_string, marks, trace)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[3]
+            if self.max_bytes and size > self.max_bytes:
+                return
+            self._entries[key] = (list(marks), list(trace), success, size)
+            self._bytes += size
+            while len(self._entries) > self.max_inputs or (self.max_bytes and self._bytes > self.max_bytes):
+                _key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[3]
 
 
 class AnalysisEngine:
-    def __init__(self, parser):
+    def __init__(self, parser, table=None, limits=None, checkpoints=None):
         self.parser = parser
+        self.table = table  # 可选：CompressedTable，代替 parser 中的 dict 分析表
+        self.limits = limits  # 可选：src.limits.Limits，限制输入长度和分析步数
+        self.hooks = []  # 性能分析钩子（src.profiling.ParserHook）
+        self.checkpoints = checkpoints  # 可选：ParseCheckpoints，parse/parse_compact 从相似输入的检查点继续
+        self.reused_steps = 0  # 从检查点复用的 trace 步数
+        self._sync_cache = {}  # 错误恢复：状态 -> 可转移到的同步状态（见 _sync_gotos）
+
+    def add_hook(self, hook):
+        """注册钩子，parse() 中回调 hook.on_step / hook.on_reduce"""
+        self.hooks.append(hook)
+        return hook
+
+    def _lookups(self):
+        """返回 (查 ACTION 函数, 查 GOTO 函数)，屏蔽 dict 表与压缩表的差异"""
+        if self.table is not None:
+            return self.table.action, self.table.goto
+        action_table = self.parser.action_table
+        goto_table = self.parser.goto_table
+        return (lambda state, sym: action_table[state].get(sym),
+                lambda state, sym: goto_table[state].get(sym))
 
     def parse(self, input_string: str):
         if not self.parser.is_lr0:
             return False, []
 
+        lookup_action, lookup_goto = self._lookups()
+        hooks = self.hooks
+        max_steps = 0
+        if self.limits is not None:
+            self.limits.check("max_input_length", len(input_string))
+            max_steps = self.limits.max_trace_steps
+
         stack = [0]
         symbol_stack = ['$']  # 内部保持 $
 
@@ -19,10 +137,29 @@ class AnalysisEngine:
         ptr = 0
         step = 1
 
+        # 从最近分析过的相似输入的检查点继续
+        checkpoints = self._checkpoints_for(input_string)
+        marks = []
+        if checkpoints is not None:
+            resume = checkpoints.find(self._checkpoint_kind("full"), input_string)
+            if resume is not None:
+                old_input, marks, old_trace, old_success = resume
+                if marks is None:
+                    self.reused_steps += len(old_trace)
+                    return old_success, list(old_trace)
+                ptr, saved_stack, saved_symbols, trace_len = marks[-1]
+                stack = list(saved_stack)
+                symbol_stack = list(saved_symbols)
+                trace_log = self._rebase_trace(old_trace[:trace_len], len(old_input), input_string)
+                step = trace_len + 1
+                self.reused_steps += trace_len
+
         while True:
+            if max_steps and step > max_steps:
+                self.limits.check("max_trace_steps", step)
             top_state = stack[-1]
             current_char = input_tokens[ptr]
-            action = self.parser.action_table[top_state].get(current_char)
+            action = lookup_action(top_state, current_char)
 
             # === 关键修改：将 $ 替换为 # 进行显示 ===
             state_stack_str = " ".join(map(str, stack))
@@ -41,9 +178,13 @@ class AnalysisEngine:
                 "goto": goto_value
             }
             trace_log.append(step_info)
+            if hooks:
+                for hook in hooks:
+                    hook.on_step(step_info)
 
             if action is None:
-                return False, trace_log
+                success = False
+                break
 
             # === SHIFT ===
             if action.startswith('s'):
@@ -51,6 +192,8 @@ class AnalysisEngine:
                 stack.append(next_state)
                 symbol_stack.append(current_char)
                 ptr += 1
+                if checkpoints is not None and ptr % checkpoints.interval == 0:
+                    marks.append((ptr, tuple(stack), tuple(symbol_stack), len(trace_log)))
 
             # === REDUCE ===
             elif action.startswith('r'):
@@ -68,9 +211,12 @@ class AnalysisEngine:
                     stack = stack[:-pop_len]
                     symbol_stack = symbol_stack[:-pop_len]
 
-                current_top = stack[-1]
-                if lhs in self.parser.goto_table[current_top]:
-                    goto_state = self.parser.goto_table[current_top][lhs]
+                if hooks:
+                    for hook in hooks:
+                        hook.on_reduce(prod_idx, stack[-1])
+
+                goto_state = lookup_goto(stack[-1], lhs)
+                if goto_state is not None:
                     stack.append(goto_state)
                     symbol_stack.append(lhs)
 
@@ -78,11 +224,456 @@ class AnalysisEngine:
                     # === 更新GOTO列 ===
                     trace_log[-1]['goto'] = str(goto_state)  # 英文小写
                 else:
-                    return False, trace_log
+                    success = False
+                    break
 
             # === ACCEPT ===
             elif action == 'acc':
+                success = True
+                break
+
+            step += 1
+
+        if checkpoints is not None:
+            checkpoints.save(self._checkpoint_kind("full"), input_string, marks, trace_log, success)
+        return success, trace_log
+
+    def _checkpoints_for(self, input_string):
+        """注册了钩子时不复用检查点（钩子需要看到每一步）；只对字符串输入保存"""
+        if self.checkpoints is None or self.hooks or not isinstance(input_string, str):
+            return None
+        return self.checkpoints
+
+    def _checkpoint_kind(self, trace_format):
+        """检查点按 trace 格式和分析表区分：压缩表使用默认规约，出错前的 trace 与 dict 表不同"""
+        return trace_format, "compressed" if self.table is not None else "dict"
+
+    @staticmethod
+    def _rebase_trace(prefix, old_length, input_string):
+        """复用旧输入的 trace 前缀：栈的字段不变，剩余输入按新的输入串重新生成"""
+        rebased = []
+        for step in prefix:
+            ptr = old_length + 1 - len(step["input"])
+            step = dict(step)
+            step["input"] = (input_string[ptr:] + '$').replace('$', '#')
+            rebased.append(step)
+        return rebased
+
+    def parse_compact(self, input_string):
+        """
+        与 parse() 相同的分析过程，但 trace 以增量形式记录，不在每一步拼接栈和剩余输入的字符串。
+        每一步为 [action, offset, pop, push_state, push_symbol]：
+        - action: "sN" / "rN" / "acc" / "ERROR"；offset: 该步之前已读入的输入长度
+        - pop: 规约弹出的符号数；push_state / push_symbol: 该步压栈的状态和符号（没有压栈时为 None）
+        从 [0] / ['#'] 出发依次应用即可还原 parse() 中每一步的状态栈、符号栈和剩余输入，
+        规约步的 push_state 即 parse() 中的 GOTO 列。整个 trace 的规模与步数成正比。
+        设置了 checkpoints 时与 parse() 一样从相似输入的检查点继续，复用的前缀不需要改写。
+        """
+        if not self.parser.is_lr0:
+            return False, []
+
+        lookup_action, lookup_goto = self._lookups()
+        productions = self.parser.grammar.productions
+        hooks = self.hooks
+        max_steps = 0
+        if self.limits is not None:
+            self.limits.check("max_input_length", len(input_string))
+            max_steps = self.limits.max_trace_steps
+
+        stack = [0]
+        ops = []
+        input_tokens = list(input_string) + ['$']
+        ptr = 0
+
+        checkpoints = self._checkpoints_for(input_string)
+        marks = []
+        if checkpoints is not None:
+            resume = checkpoints.find(self._checkpoint_kind("compact"), input_string)
+            if resume is not None:
+                _old_input, marks, old_ops, old_success = resume
+                if marks is None:
+                    self.reused_steps += len(old_ops)
+                    return old_success, list(old_ops)
+                ptr, saved_stack, _symbols, trace_len = marks[-1]
+                stack = list(saved_stack)
+                ops = old_ops[:trace_len]
+                self.reused_steps += trace_len
+
+        while True:
+            if max_steps and len(ops) >= max_steps:
+                self.limits.check("max_trace_steps", len(ops) + 1)
+            current = input_tokens[ptr]
+            action = lookup_action(stack[-1], current)
+            if action is not None and action.startswith('s'):
+                op = [action, ptr, 0, int(action[1:]), current]
+            else:
+                op = [action or "ERROR", ptr, 0, None, None]
+            ops.append(op)
+            if hooks:
+                for hook in hooks:
+                    hook.on_step(op)
+
+            if action is None:
+                success = False
+                break
+            if action.startswith('s'):
+                stack.append(op[3])
+                ptr += 1
+                if checkpoints is not None and ptr % checkpoints.interval == 0:
+                    marks.append((ptr, tuple(stack), None, len(ops)))
+            elif action.startswith('r'):
+                prod_idx = int(action[1:])
+                lhs = productions[prod_idx]['left']
+                rhs = productions[prod_idx]['right']
+                pop_len = 0 if rhs == ['@'] else len(rhs)
+                if pop_len:
+                    del stack[-pop_len:]
+                op[2] = pop_len
+                if hooks:
+                    for hook in hooks:
+                        hook.on_reduce(prod_idx, stack[-1])
+                goto_state = lookup_goto(stack[-1], lhs)
+                if goto_state is None:
+                    success = False
+                    break
+                stack.append(goto_state)
+                op[3] = goto_state
+                op[4] = lhs
+            else:
+                success = True
+                break
+
+        if checkpoints is not None:
+            checkpoints.save(self._checkpoint_kind("compact"), input_string, marks, ops, success)
+        return success, ops
+
+    def recognize(self, input_string):
+        """
+        只判断输入串是否被接受，不记录 trace，也不构造语法树。
+        :return: (success, steps, error_position)，error_position 为出错的记号下标，成功时为 None
+        """
+        if not self.parser.is_lr0:
+            return False, 0, None
+        if self.limits is not None:
+            self.limits.check("max_input_length", len(input_string))
+
+        lookup_action, lookup_goto = self._lookups()
+        productions = self.parser.grammar.productions
+        input_tokens = list(input_string) + ['$']
+        stack = [0]
+        ptr = 0
+        steps = 0
+
+        while True:
+            steps += 1
+            action = lookup_action(stack[-1], input_tokens[ptr])
+            if action is None:
+                return False, steps, ptr
+            if action.startswith('s'):
+                stack.append(int(action[1:]))
+                ptr += 1
+            elif action.startswith('r'):
+                prod_idx = int(action[1:])
+                rhs = productions[prod_idx]['right']
+                if rhs != ['@']:
+                    del stack[-len(rhs):]
+                goto_state = lookup_goto(stack[-1], productions[prod_idx]['left'])
+                if goto_state is None:
+                    return False, steps, ptr
+                stack.append(goto_state)
+            elif action == 'acc':
+                return True, steps, None
+            else:
+                return False, steps, ptr
+
+    def parse_batch(self, input_strings):
+        """
+        批量识别：相同的输入只分析一次，其余插入前缀树，公共前缀只分析一遍。
+        前缀树上有多个分支的结点处复制 LR 栈作为快照，各分支从快照继续分析；单分支的路径直接在原栈上前进。
+        :return: (results, stats)
+                 results 与 input_strings 一一对应，每项与 recognize() 相同: (success, steps, error_position)
+                 stats: inputs / unique / steps（实际执行的步数）/ naive_steps（逐个 recognize 的步数之和）/ steps_saved
+        """
+        if self.limits is not None:
+            for inp in input_strings:
+                self.limits.check("max_input_length", len(inp))
+
+        # 1. 去重并建前缀树：结点为 [子结点 dict, 在此结束的输入编号或 None]
+        seen = {}
+        order = []
+        root = [{}, None]
+        n_unique = 0
+        for inp in input_strings:
+            key = inp if isinstance(inp, str) else tuple(inp)
+            idx = seen.get(key)
+            if idx is None:
+                node = root
+                for token in key:
+                    child = node[0].get(token)
+                    if child is None:
+                        child = node[0][token] = [{}, None]
+                    node = child
+                if node[1] is None:  # 字符串与记号列表形式的同一输入共用一个结点
+                    node[1] = n_unique
+                    n_unique += 1
+                idx = seen[key] = node[1]
+            order.append(idx)
+
+        stats = {"inputs": len(order), "unique": n_unique, "steps": 0, "naive_steps": 0, "steps_saved": 0}
+        if not self.parser.is_lr0:
+            return [(False, 0, None)] * len(order), stats
+
+        lookup_action, lookup_goto = self._lookups()
+        productions = self.parser.grammar.productions
+
+        def advance(stack, token):
+            """以 token 为向前看执行规约直到移进、接受或出错，返回 (结果, 步数)"""
+            steps = 0
+            while True:
+                steps += 1
+                action = lookup_action(stack[-1], token)
+                if action is None:
+                    return "error", steps
+                if action.startswith('s'):
+                    stack.append(int(action[1:]))
+                    return "shift", steps
+                if action.startswith('r'):
+                    prod_idx = int(action[1:])
+                    rhs = productions[prod_idx]['right']
+                    if rhs != ['@']:
+                        del stack[-len(rhs):]
+                    goto_state = lookup_goto(stack[-1], productions[prod_idx]['left'])
+                    if goto_state is None:
+                        return "error", steps
+                    stack.append(goto_state)
+                elif action == 'acc':
+                    return "acc", steps
+                else:
+                    return "error", steps
+
+        # 2. 深度优先遍历前缀树（显式栈，输入可能很长）
+        results = [None] * n_unique
+        executed = 0
+        work = [(root, [0], 0, 0)]  # (结点, LR 栈, 已执行步数, 已读入记号数)
+        while work:
+            node, stack, steps, depth = work.pop()
+            children, end = node
+            branches = list(children.items())
+            if end is not None:
+                branches.append(('$', None))
+            for i, (token, child) in enumerate(branches):
+                branch = stack if i == len(branches) - 1 else stack.copy()
+                outcome, used = advance(branch, token)
+                executed += used
+                total = steps + used
+                if child is None:
+                    results[end] = (True, total, None) if outcome == "acc" else (False, total, depth)
+                elif outcome == "shift":
+                    work.append((child, branch, total, depth + 1))
+                else:
+                    # 公共前缀上出错：子树中所有输入在同一位置、以相同步数失败
+                    pending = [child]
+                    while pending:
+                        sub_children, sub_end = pending.pop()
+                        if sub_end is not None:
+                            results[sub_end] = (False, total, depth)
+                        pending.extend(sub_children.values())
+
+        per_input = [results[idx] for idx in order]
+        stats["steps"] = executed
+        stats["naive_steps"] = sum(r[1] for r in per_input)
+        stats["steps_saved"] = stats["naive_steps"] - executed
+        return per_input, stats
+
+    def parse_tree(self, input_string, actions=None):
+        """
+        分析输入串并在规约时构造语法树（不记录 trace）。
+        :param actions: 可选的语义动作 {产生式编号或 "E->E+T": func(values)}，
+                        values 为各孩子的值（终结符的值为记号本身）；
+                        未指定动作的产生式取第一个孩子的值，空产生式取 None
+        :return: (success, ParseTree)
+        """
+        if self.limits is not None:
+            self.limits.check("max_input_length", len(input_string))
+        tokens = list(input_string)
+        tree = ParseTree(self.parser.grammar, tokens)
+        if not self.parser.is_lr0:
+            return False, tree
+
+        lookup_action, lookup_goto = self._lookups()
+        productions = self.parser.grammar.productions
+        actions = normalize_actions(self.parser.grammar, actions)
+        with_values = bool(actions)
+
+        input_tokens = tokens + ['$']
+        stack = [0]
+        node_stack = []
+        value_stack = []
+        ptr = 0
+
+        while True:
+            action = lookup_action(stack[-1], input_tokens[ptr])
+            if action is None:
+                return False, tree
+
+            if action.startswith('s'):
+                stack.append(int(action[1:]))
+                node_stack.append(tree.add_token(ptr))
+                if with_values:
+                    value_stack.append(input_tokens[ptr])
+                ptr += 1
+
+            elif action.startswith('r'):
+                prod_idx = int(action[1:])
+                rhs = productions[prod_idx]['right']
+                pop_len = 0 if rhs == ['@'] else len(rhs)
+
+                if pop_len > 0:
+                    del stack[-pop_len:]
+                    child_nodes = node_stack[-pop_len:]
+                    del node_stack[-pop_len:]
+                else:
+                    child_nodes = []
+                node_stack.append(tree.add_rule(prod_idx, child_nodes))
+
+                if with_values:
+                    if pop_len > 0:
+                        child_values = value_stack[-pop_len:]
+                        del value_stack[-pop_len:]
+                    else:
+                        child_values = []
+                    func = actions.get(prod_idx)
+                    if func is not None:
+                        value_stack.append(func(child_values))
+                    else:
+                        value_stack.append(child_values[0] if child_values else None)
+
+                goto_state = lookup_goto(stack[-1], productions[prod_idx]['left'])
+                if goto_state is None:
+                    return False, tree
+                stack.append(goto_state)
+
+            elif action == 'acc':
+                tree.root = node_stack[-1] if node_stack else -1
+                if with_values and value_stack:
+                    tree.value = value_stack[-1]
+                return True, tree
+
+            else:
+                return False, tree
+
+    def _expected_terminals(self, state):
+        """ACTION 表中该状态有动作的终结符（$ 显示为 #）"""
+        return sorted(t.replace('$', '#') for t in self.parser.action_table[state])
+
+    def _sync_gotos(self, state):
+        """
+        状态的同步点：[(非终结符, GOTO 目标状态, 目标状态可接受的终结符集合)]。
+        恐慌模式恢复时，若后续输入中出现集合里的终结符，就假装已归约出该非终结符。
+        """
+        cache = self._sync_cache
+        entry = cache.get(state)
+        if entry is None:
+            entry = []
+            for nt, dest in sorted(self.parser.goto_table[state].items()):
+                entry.append((nt, dest, frozenset(self.parser.action_table[dest])))
+            cache[state] = entry
+        return entry
+
+    def parse_with_recovery(self, input_string, max_errors=20):
+        """
+        带错误恢复的分析：遇到错误时记录下来并继续，一次运行报告多个语法错误。
+        恢复策略：
+        1. 错误产生式：若栈中某状态可移进终结符 'error'，弹栈到该状态并移进 error，然后跳过输入直到可继续；
+        2. 恐慌模式：否则在后续输入中寻找同步符号——栈顶状态可直接接受（删除中间记号），
+           或某个栈中状态经 GOTO 后的状态可接受该符号（弹栈并压入对应非终结符）。
+        恢复后成功移进 3 个记号之前出现的错误视为连锁错误，不重复报告。
+        正常路径 parse() 不受影响。
+        :param max_errors: 最多记录的错误数，达到后停止分析
+        :return: (success, errors)，errors 中每项包含 position/token/state/expected
+        """
+        errors = []
+        if not self.parser.is_lr0:
+            return False, errors
+
+        lookup_action, lookup_goto = self._lookups()
+        productions = self.parser.grammar.productions
+        input_tokens = list(input_string) + ['$']
+        end = len(input_tokens) - 1
+        stack = [0]
+        ptr = 0
+        last_error_ptr = -1
+        shifted = 3  # 上次恢复后成功移进的记号数，不足 3 个时视为连锁错误，不重复报告
+
+        while True:
+            current = input_tokens[ptr]
+            action = lookup_action(stack[-1], current)
+
+            if action is None:
+                if shifted >= 3:
+                    if len(errors) >= max_errors:
+                        break
+                    errors.append({
+                        "position": ptr,
+                        "token": current.replace('$', '#'),
+                        "state": stack[-1],
+                        "expected": self._expected_terminals(stack[-1])
+                    })
+                # 同一位置再次出错时至少跳过一个记号，保证前进
+                start = ptr + 1 if ptr == last_error_ptr else ptr
+                last_error_ptr = ptr
+                shifted = 0
+                recovered = self._recover(stack, input_tokens, start, lookup_action)
+                if recovered is None:
+                    break
+                stack, ptr = recovered
+                continue
+
+            if action.startswith('s'):
+                stack.append(int(action[1:]))
+                ptr += 1
+                shifted += 1
+            elif action.startswith('r'):
+                prod_idx = int(action[1:])
+                rhs = productions[prod_idx]['right']
+                pop_len = 0 if rhs == ['@'] else len(rhs)
+                if pop_len > 0:
+                    del stack[-pop_len:]
+                goto_state = lookup_goto(stack[-1], productions[prod_idx]['left'])
+                if goto_state is None:
+                    break
+                stack.append(goto_state)
+            elif action == 'acc':
+                return not errors, errors
+            else:
+                break
+
+            if ptr > end:
+                break
+
+        return False, errors
+
+    def _recover(self, stack, input_tokens, start, lookup_action):
+        """尝试从错误中恢复，返回新的 (stack, ptr)；无法恢复时返回 None"""
+        end = len(input_tokens) - 1
 
-                return True, trace_log
+        # 1. 错误产生式
+        for depth in range(len(stack) - 1, -1, -1):
+            action = lookup_action(stack[depth], 'error')
+            if action and action.startswith('s'):
+                error_state = int(action[1:])
+                for j in range(start, end + 1):
+                    if lookup_action(error_state, input_tokens[j]) is not None:
+                        return stack[:depth + 1] + [error_state], j
+                return None
 
-            step += 1
\ No newline at end of file
+        # 2. 恐慌模式：依次尝试跳过输入，找到最近的同步点；栈顶状态能直接接受时只删除记号
+        for j in range(start, end + 1):
+            token = input_tokens[j]
+            if lookup_action(stack[-1], token) is not None:
+                return stack, j
+            for depth in range(len(stack) - 1, -1, -1):
+                for _nt, dest, follow in self._sync_gotos(stack[depth]):
+                    if token in follow:
+                        return stack[:depth + 1] + [dest], j
+        return None
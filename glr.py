@@ -0,0 +1,312 @@
+# src/glr.py
+class SPPFNode:
+    """共享压缩分析森林（SPPF）的结点：符号 symbol 推导出输入区间 [start, end)"""
+    __slots__ = ('symbol', 'start', 'end', 'families', '_family_keys')
+
+    def __init__(self, symbol, start, end):
+        self.symbol = symbol
+        self.start = start
+        self.end = end
+        self.families = []  # 打包结点：[(产生式编号, (孩子 SPPFNode, ...))]，终结符结点为空
+        self._family_keys = set()
+
+    def add_family(self, prod_idx, children):
+        key = (prod_idx, tuple(id(c) for c in children))
+        if key not in self._family_keys:
+            self._family_keys.add(key)
+            self.families.append((prod_idx, children))
+
+
+class GSSNode:
+    """图结构栈（GSS）的结点：某一输入位置 level 上的 LR 状态"""
+    __slots__ = ('state', 'level', 'links')
+
+    def __init__(self, state, level):
+        self.state = state
+        self.level = level
+        self.links = []  # [GSSLink]，指向栈中的前驱结点
+
+    def find_link(self, target):
+        for link in self.links:
+            if link.target is target:
+                return link
+        return None
+
+
+class GSSLink:
+    """GSS 的边，携带被压入符号对应的 SPPF 结点"""
+    __slots__ = ('target', 'node')
+
+    def __init__(self, target, node):
+        self.target = target
+        self.node = node
+
+
+class ParseForest:
+    """GLR 分析得到的共享压缩分析森林"""
+
+    def __init__(self, root, nodes):
+        self.root = root
+        self.nodes = nodes  # (symbol, start, end) -> SPPFNode
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def is_ambiguous(self):
+        """从根可达的结点中存在多个打包结点即为歧义"""
+        if self.root is None:
+            return False
+        seen = set()
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            if len(node.families) > 1:
+                return True
+            for _prod, children in node.families:
+                stack.extend(children)
+        return False
+
+    def count_trees(self):
+        """
+        森林中语法树的棵数；文法含环（如 A -> A）时为 float('inf')。
+        用显式栈后序遍历，避免长输入触发递归深度限制。
+        """
+        if self.root is None:
+            return 0
+        counts = {}
+        on_path = set()
+        stack = [(self.root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            key = id(node)
+            if expanded:
+                on_path.discard(key)
+                if not node.families:
+                    counts[key] = 1
+                    continue
+                total = 0
+                for _prod, children in node.families:
+                    product = 1
+                    for child in children:
+                        product *= counts[id(child)]
+                    total += product
+                counts[key] = total
+                continue
+            if key in counts:
+                continue
+            if key in on_path:
+                return float('inf')
+            on_path.add(key)
+            stack.append((node, True))
+            for _prod, children in node.families:
+                for child in children:
+                    if id(child) not in counts:
+                        stack.append((child, False))
+        return counts[id(self.root)]
+
+    def to_tuple(self, node=None):
+        """取森林中的一棵树，转为嵌套元组 (符号, 孩子...)；叶子为终结符字符串"""
+        if node is None:
+            node = self.root
+        if node is None:
+            return None
+        built = {}
+        on_path = set()
+        stack = [(node, None)]
+        while stack:
+            current, family = stack.pop()
+            key = id(current)
+            if family is not None:
+                on_path.discard(key)
+                built[key] = (current.symbol,) + tuple(built[id(c)] for c in family[1])
+                continue
+            if key in built:
+                continue
+            if not current.families:
+                built[key] = current.symbol if current.end > current.start else (current.symbol,)
+                continue
+            on_path.add(key)
+            # 优先选不回到当前路径上的打包结点，避免含环文法死循环
+            chosen = current.families[0]
+            for fam in current.families:
+                if all(id(c) not in on_path for c in fam[1]):
+                    chosen = fam
+                    break
+            stack.append((current, chosen))
+            for child in reversed(chosen[1]):
+                if id(child) not in built and id(child) not in on_path:
+                    stack.append((child, None))
+                elif id(child) in on_path:
+                    built.setdefault(id(child), (child.symbol, '...'))
+        return built[id(node)]
+
+
+class GLREngine:
+    """
+    GLR 分析器：直接使用 LR0Parser 中带冲突的 ACTION 表（如 "s3/r2"），
+    用图结构栈共享各分支的栈，用共享压缩分析森林保存全部推导，时间为多项式级。
+    高度二义的文法（如 E → E + E | a）多项式的次数很高，因此按 limits.max_glr_steps
+    限制移进与规约路径的总数，超限时抛出 LimitExceeded。
+    """
+
+    def __init__(self, parser, limits=None):
+        self.parser = parser
+        self.limits = limits  # 可选：src.limits.Limits，限制输入长度和 GLR 步数
+        self._action_cache = {}
+        self._steps = 0
+        self._max_steps = 0
+        self.stats = {}
+
+    def _actions(self, state, symbol):
+        """解析动作单元格，返回 [('s', 目标状态) | ('r', 产生式) | ('acc', 0)]"""
+        cell = self.parser.action_table[state].get(symbol)
+        if cell is None:
+            return ()
+        parsed = self._action_cache.get(cell)
+        if parsed is None:
+            parsed = []
+            for part in cell.split('/'):
+                if part == 'acc':
+                    parsed.append(('acc', 0))
+                elif part.startswith('s'):
+                    parsed.append(('s', int(part[1:])))
+                elif part.startswith('r'):
+                    parsed.append(('r', int(part[1:])))
+            parsed = tuple(parsed)
+            self._action_cache[cell] = parsed
+        return parsed
+
+    def _paths(self, node, length, via):
+        """
+        枚举从 node 出发、长度为 length 的所有路径，返回 [(终点, [孩子 SPPF 结点，从左到右])]。
+        via 不为 None 时只保留经过该边的路径。遍历的每条边计为一步。
+        """
+        results = []
+        stack = [(node, length, [], via is None)]
+        explored = 0
+        while stack:
+            current, remaining, nodes, used = stack.pop()
+            explored += 1
+            if remaining == 0:
+                if used:
+                    results.append((current, nodes[::-1]))
+                continue
+            for link in current.links:
+                stack.append((link.target, remaining - 1, nodes + [link.node], used or link is via))
+        self._count(explored)
+        return results
+
+    def _reduce_all(self, frontier, level, token, sppf):
+        grammar = self.parser.grammar
+        goto_table = self.parser.goto_table
+        queue = [(node, None) for node in frontier.values()]
+
+        while queue:
+            node, via = queue.pop()
+            for kind, prod_idx in self._actions(node.state, token):
+                if kind != 'r':
+                    continue
+                prod = grammar.productions[prod_idx]
+                length = 0 if prod['right'] == ['@'] else len(prod['right'])
+                if via is not None and length == 0:
+                    continue
+
+                for target, children in self._paths(node, length, via):
+                    goto_state = goto_table[target.state].get(prod['left'])
+                    if goto_state is None:
+                        continue
+
+                    key = (prod['left'], target.level, level)
+                    forest_node = sppf.get(key)
+                    if forest_node is None:
+                        forest_node = SPPFNode(prod['left'], target.level, level)
+                        sppf[key] = forest_node
+                    forest_node.add_family(prod_idx, tuple(children))
+
+                    w = frontier.get(goto_state)
+                    if w is None:
+                        w = GSSNode(goto_state, level)
+                        frontier[goto_state] = w
+                        w.links.append(GSSLink(target, forest_node))
+                        queue.append((w, None))
+                    elif w.find_link(target) is None:
+                        link = GSSLink(target, forest_node)
+                        w.links.append(link)
+                        # 新边可能形成新的规约路径，同一层所有结点都要沿该边重做规约
+                        for other in list(frontier.values()):
+                            queue.append((other, link))
+
+    def parse(self, input_string):
+        """
+        :return: (success, ParseForest)，失败时森林的根为 None，
+                 self.stats 中记录 GSS/SPPF 规模和出错位置
+        """
+        if self.limits is not None:
+            self.limits.check("max_input_length", len(input_string))
+            self._max_steps = self.limits.max_glr_steps
+        else:
+            self._max_steps = 0
+        self._steps = 0
+        tokens = list(input_string) + ['$']
+        sppf = {}
+        frontier = {0: GSSNode(0, 0)}
+        gss_nodes = 0
+
+        for level, token in enumerate(tokens):
+            self._reduce_all(frontier, level, token, sppf)
+            gss_nodes += len(frontier)
+
+            if token == '$':
+                for node in frontier.values():
+                    if ('acc', 0) in self._actions(node.state, token):
+                        root = None
+                        for link in node.links:
+                            if link.target.level == 0:
+                                root = link.node
+                                break
+                        self._record_stats(gss_nodes, sppf, None)
+                        return True, ParseForest(root, sppf)
+                break
+
+            term_key = (token, level, level + 1)
+            term_node = sppf.get(term_key)
+            if term_node is None:
+                term_node = SPPFNode(token, level, level + 1)
+                sppf[term_key] = term_node
+
+            self._count(len(frontier))
+            next_frontier = {}
+            for node in frontier.values():
+                for kind, dest in self._actions(node.state, token):
+                    if kind != 's':
+                        continue
+                    w = next_frontier.get(dest)
+                    if w is None:
+                        w = GSSNode(dest, level + 1)
+                        next_frontier[dest] = w
+                    if w.find_link(node) is None:
+                        w.links.append(GSSLink(node, term_node))
+
+            if not next_frontier:
+                self._record_stats(gss_nodes, sppf, level)
+                return False, ParseForest(None, sppf)
+            frontier = next_frontier
+
+        self._record_stats(gss_nodes, sppf, len(tokens) - 1)
+        return False, ParseForest(None, sppf)
+
+    def _count(self, steps):
+        self._steps += steps
+        if self._max_steps and self._steps > self._max_steps:
+            self.limits.check("max_glr_steps", self._steps)
+
+    def _record_stats(self, gss_nodes, sppf, error_position):
+        self.stats = {
+            "gss_nodes": gss_nodes,
+            "sppf_nodes": len(sppf),
+            "steps": self._steps,
+            "error_position": error_position
+        }
@@ -17,6 +17,13 @@ class Grammar:
         """解析用户输入的文法字符串"""
         lines = [line.strip() for line in raw_text.strip().split('\n') if line.strip()]
 
+        # 预先收集所有左部，使只含一个多字符非终结符的候选式（如 "E -> E1"）不被按字符拆开
+        lhs_names = set()
+        for line in lines:
+            sep = '->' if '->' in line else '='
+            if sep in line:
+                lhs_names.add(line.split(sep)[0].strip())
+
         for i, line in enumerate(lines):
             # 兼容 -> 和 = 写法
             if '->' in line:
@@ -41,6 +48,8 @@ class Grammar:
                 alt = alt.strip()
                 if ' ' in alt:
                     rhs = [x for x in alt.split(' ') if x]
+                elif alt in lhs_names:
+                    rhs = [alt]
                 else:
                     rhs = list(alt)
 
@@ -69,7 +78,152 @@ class Grammar:
         self.non_terminals.add(new_start)
         self.terminals.add('$')  # 添加输入结束符
 
+    def reduce(self):
+        """
+        文法化简：删除不可产生终结符串（unproductive）和从开始符号不可达（unreachable）的符号。
+        基于工作表，时间复杂度与文法规模成线性关系。应在构造 LR 项目集之前调用。
+        :return: 化简报告 {'unproductive': [...], 'unreachable': [...], 'removed_productions': [...], 'empty_language': bool}
+        """
+        report = {
+            "unproductive": [],
+            "unreachable": [],
+            "removed_productions": [],
+            "empty_language": False
+        }
+        if self.errors or not self.productions:
+            return report
+
+        augmented = self.start_symbol.endswith("'") and self.productions[0]['left'] == self.start_symbol
+        root = self.start_symbol
+
+        # 1. 可产生性：每个产生式记录右部尚未确认可产生的非终结符出现次数
+        pending = []
+        occurrences = {}  # 非终结符 -> 出现在其右部的产生式下标列表
+        productive = set()
+        worklist = []
+        for idx, p in enumerate(self.productions):
+            count = 0
+            for sym in p['right']:
+                if sym != '@' and sym not in self.terminals:
+                    occurrences.setdefault(sym, []).append(idx)
+                    count += 1
+            pending.append(count)
+            if count == 0 and p['left'] not in productive:
+                productive.add(p['left'])
+                worklist.append(p['left'])
+
+        while worklist:
+            sym = worklist.pop()
+            for idx in occurrences.get(sym, []):
+                pending[idx] -= 1
+                if pending[idx] == 0:
+                    lhs = self.productions[idx]['left']
+                    if lhs not in productive:
+                        productive.add(lhs)
+                        worklist.append(lhs)
+
+        useful = [p for idx, p in enumerate(self.productions) if pending[idx] == 0]
+
+        # 2. 可达性：从开始符号出发，只沿可产生的产生式遍历
+        by_left = {}
+        for p in useful:
+            by_left.setdefault(p['left'], []).append(p)
+
+        reachable = {root}
+        worklist = [root]
+        while worklist:
+            sym = worklist.pop()
+            for p in by_left.get(sym, []):
+                for rhs_sym in p['right']:
+                    if rhs_sym in by_left and rhs_sym not in reachable:
+                        reachable.add(rhs_sym)
+                        worklist.append(rhs_sym)
+
+        kept = [p for p in useful if p['left'] in reachable]
+
+        # 拓广产生式 S' -> S 始终保留，即使语言为空也能构造出初始状态
+        if augmented and (not kept or kept[0] is not self.productions[0]):
+            kept.insert(0, self.productions[0])
+        if root not in productive:
+            report["empty_language"] = True
+
+        # 3. 生成报告并重建符号集合
+        all_symbols = set(self.non_terminals)
+        for p in self.productions:
+            for sym in p['right']:
+                if sym != '@' and sym not in self.terminals:
+                    all_symbols.add(sym)
+        if augmented:
+            all_symbols.discard(root)  # 拓广开始符号是内部构造的，不进入报告
+        report["unproductive"] = sorted(sym for sym in all_symbols if sym not in productive)
+        report["unreachable"] = sorted(sym for sym in all_symbols if sym in productive and sym not in reachable)
+        kept_ids = set(id(p) for p in kept)
+        report["removed_productions"] = [
+            f"{p['left']}->{''.join(p['right'])}" for p in self.productions if id(p) not in kept_ids
+        ]
+
+        used = {root}
+        for p in kept:
+            used.add(p['left'])
+            used.update(p['right'])
+        if augmented:
+            used.add('$')
+        self.productions = kept
+        self.non_terminals = self.non_terminals & used
+        self.terminals = self.terminals & used
+
+        return report
+
     def get_production_str(self, index):
         """根据索引获取产生式的字符串形式 (用于打印)"""
         p = self.productions[index]
-        return f"{p['left']}->{''.join(p['right'])}"
\ No newline at end of file
+        return f"{p['left']}->{''.join(p['right'])}"
+
+    def to_dict(self):
+        """序列化为可 JSON 化的字典（产生式顺序即编号）"""
+        return {
+            "productions": [{'left': p['left'], 'right': list(p['right'])} for p in self.productions],
+            "terminals": sorted(self.terminals),
+            "non_terminals": sorted(self.non_terminals),
+            "start_symbol": self.start_symbol,
+            "errors": list(self.errors)
+        }
+
+    @classmethod
+    def from_rules(cls, rules, start_symbol=None, errors=None):
+        """
+        由已拆分好的规则构造文法（src.loader 使用），不经过逐行文本解析。
+        rules: 可迭代的 (左部, [右部符号])，空串用 ['@']；左部即非终结符，其余符号为终结符。
+        start_symbol 缺省为第一条规则的左部；errors 为载入时已发现的错误。
+        """
+        g = cls.__new__(cls)
+        g.productions = []
+        g.terminals = set()
+        g.non_terminals = set()
+        g.start_symbol = start_symbol or ""
+        g.errors = list(errors or [])
+        for left, right in rules:
+            if not g.start_symbol:
+                g.start_symbol = left
+            g.non_terminals.add(left)
+            g.productions.append({'left': left, 'right': list(right)})
+        for p in g.productions:
+            for sym in p['right']:
+                if sym != '@' and sym not in g.non_terminals:
+                    g.terminals.add(sym)
+        if not g.productions and not g.errors:
+            g.errors.append("文法中没有产生式")
+        if not g.errors:
+            g._augment_grammar()
+        return g
+
+    @classmethod
+    def from_dict(cls, data):
+        """由 to_dict() 的结果还原，不重新解析文法文本"""
+        g = cls.__new__(cls)
+        g.productions = [{'left': p['left'], 'right': list(p['right'])} for p in data["productions"]]
+        g.terminals = set(data["terminals"])
+        g.non_terminals = set(data["non_terminals"])
+        g.start_symbol = data["start_symbol"]
+        g.errors = list(data.get("errors", []))
+        return g
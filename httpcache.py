@@ -0,0 +1,82 @@
+# src/httpcache.py
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# 小于该字节数的响应不压缩
+MIN_COMPRESS_BYTES = 1024
+COMPRESS_LEVEL = 6
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/css",
+                      "text/javascript", "application/javascript")
+
+
+def make_etag(payload):
+    """由请求内容（文法、输入串、选项等可 JSON 化的值）得到确定的强 ETag（不含引号）"""
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def gzip_bytes(data):
+    """gzip 压缩；mtime 固定为 0，相同内容得到相同字节"""
+    return gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+
+def accepts_gzip(request):
+    return request.accept_encodings.quality("gzip") > 0
+
+
+class ResultCache:
+    """按 ETag 缓存 gzip 压缩后的响应体，超过总字节数或条目数时淘汰最久未用的条目"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entries=1000):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, etag):
+        with self._lock:
+            body = self._entries.get(etag)
+            if body is not None:
+                self._entries.move_to_end(etag)
+            return body
+
+    def put(self, etag, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(etag, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[etag] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _key, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+
+def compress_response(response, request):
+    """
+    after_request 钩子：客户端接受 gzip 时压缩较大的文本响应。
+    流式响应（Server-Sent Events）、直接透传的文件和已编码的响应不处理。
+    """
+    if (response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES
+            or not 200 <= response.status_code < 300
+            or not accepts_gzip(request)):
+        return response
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_BYTES:
+        return response
+    response.set_data(gzip_bytes(data))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
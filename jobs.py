@@ -0,0 +1,224 @@
+# src/jobs.py
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from src.pool import PoolBusy
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobStoreFull(Exception):
+    """未完成的任务数已达上限"""
+
+
+class JobStore:
+    """
+    基于 SQLite 的任务存储（默认内存库，也可指定本地文件）。
+    任务总数有上限，超出时删除最早结束的任务；test_results 按输入逐条存放，便于增量读取。
+    """
+
+    def __init__(self, path=":memory:", max_jobs=1000):
+        self.path = path
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created REAL NOT NULL,
+                updated REAL NOT NULL,
+                request TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                done INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS job_results (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            );
+        """)
+        # 上次运行时未完成的任务不会再被执行
+        self._db.execute("UPDATE jobs SET status = ?, error = ? WHERE status IN (?, ?)",
+                         (FAILED, "服务重启，任务已中断", QUEUED, RUNNING))
+        self._db.commit()
+
+    def create(self, request):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._prune()
+            self._db.execute(
+                "INSERT INTO jobs (id, status, created, updated, request, total) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, now, now, json.dumps(request, ensure_ascii=False),
+                 len(request.get("inputs", []))))
+            self._db.commit()
+        return job_id
+
+    def _prune(self):
+        """超出上限时删除最早结束的任务；全部未结束时拒绝新任务"""
+        (count,) = self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()
+        excess = count - self.max_jobs + 1
+        if excess <= 0:
+            return
+        rows = self._db.execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY updated LIMIT ?",
+            (DONE, FAILED, excess)).fetchall()
+        if len(rows) < excess:
+            raise JobStoreFull("未完成的任务过多，请稍后重试")
+        ids = [(r[0],) for r in rows]
+        self._db.executemany("DELETE FROM job_results WHERE job_id = ?", ids)
+        self._db.executemany("DELETE FROM jobs WHERE id = ?", ids)
+
+    def request(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT request FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, job_id, status=None, result=None, error=None):
+        sets, args = ["updated = ?"], [time.time()]
+        if status is not None:
+            sets.append("status = ?")
+            args.append(status)
+        if result is not None:
+            sets.append("result = ?")
+            args.append(json.dumps(result, ensure_ascii=False))
+        if error is not None:
+            sets.append("error = ?")
+            args.append(error)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {', '.join(sets)} WHERE id = ?", args + [job_id])
+            self._db.commit()
+
+    def append_results(self, job_id, start, test_results):
+        """追加一批 test_results，seq 从 start 开始，并更新进度"""
+        rows = [(job_id, start + i, json.dumps(r, ensure_ascii=False)) for i, r in enumerate(test_results)]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO job_results (job_id, seq, data) VALUES (?, ?, ?)", rows)
+            self._db.execute("UPDATE jobs SET done = ?, updated = ? WHERE id = ?",
+                             (start + len(test_results), time.time(), job_id))
+            self._db.commit()
+
+    def get(self, job_id, offset=0):
+        """
+        任务状态与（部分）结果。
+        :param offset: 只返回 seq >= offset 的 test_results，轮询时可增量获取
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, created, updated, result, error, done, total FROM jobs WHERE id = ?",
+                (job_id,)).fetchone()
+            if row is None:
+                return None
+            items = self._db.execute(
+                "SELECT data FROM job_results WHERE job_id = ? AND seq >= ? ORDER BY seq",
+                (job_id, offset)).fetchall()
+        status, created, updated, result, error, done, total = row
+        job = {
+            "id": job_id,
+            "status": status,
+            "created": created,
+            "updated": updated,
+            "progress": {"done": done, "total": total},
+            "offset": offset,
+            "result": json.loads(result) if result else None,
+            "error": error
+        }
+        if job["result"] is not None:
+            job["result"]["test_results"] = [json.loads(r[0]) for r in items]
+        return job
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class JobRunner:
+    """
+    后台线程执行任务：先分析文法结构（不含输入），再按 chunk_size 分批分析输入串，
+    每批完成后写入存储，轮询方可以看到部分结果。HTTP 线程只负责入队。
+    :param execute: execute(函数名, *args, **kwargs)，调用 src.analysis 中的函数（可走进程池）
+    :param limits: 可选的 src.limits.Limits，每批输入分别检查
+    """
+
+    def __init__(self, store, execute, limits=None, chunk_size=50, threads=2, busy_retry=0.5):
+        self.store = store
+        self.execute = execute
+        self.limits = limits
+        self.chunk_size = chunk_size
+        self.busy_retry = busy_retry
+        self._queue = queue.Queue()
+        self._threads = []
+        for i in range(threads):
+            t = threading.Thread(target=self._loop, name=f"lr0-job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, request):
+        job_id = self.store.create(request)
+        self._queue.put(job_id)
+        return job_id
+
+    def _loop(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logger.warning("任务 %s 失败: %s", job_id, e)
+                self.store.update(job_id, status=FAILED, error=str(e))
+
+    def _call(self, name, *args, **kwargs):
+        """进程池繁忙时等待重试，而不是让任务失败"""
+        while True:
+            try:
+                return self.execute(name, *args, **kwargs)
+            except PoolBusy:
+                time.sleep(self.busy_retry)
+
+    def _run(self, job_id):
+        request = self.store.request(job_id)
+        if request is None:
+            return
+        self.store.update(job_id, status=RUNNING)
+        grammar_text = request["grammar"]
+        inputs = request.get("inputs", [])
+        options = request.get("options", {})
+
+        results, error = self._call("analyze_grammar", grammar_text, [], limits=self.limits, **options)
+        if error:
+            self.store.update(job_id, status=FAILED, error=error)
+            return
+        results.pop("metrics", None)
+        self.store.update(job_id, result=results)
+
+        input_options = {k: v for k, v in options.items()
+                         if k in ("reduce_grammar", "compress_table", "build_tree", "recover_errors",
+                                  "algorithm", "trace_format")}
+        for start in range(0, len(inputs), self.chunk_size):
+            chunk = inputs[start:start + self.chunk_size]
+            test_results, _metrics = self._call("analyze_inputs", grammar_text, chunk,
+                                                limits=self.limits, **input_options)
+            self.store.append_results(job_id, start, test_results)
+        self.store.update(job_id, status=DONE)
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(1)
@@ -0,0 +1,81 @@
+# src/limits.py
+import os
+
+
+class LimitExceeded(Exception):
+    """
+    超出资源限制。status 为建议的 HTTP 状态码：
+    请求本身过大（产生式数、输入长度/个数）为 413，构造过程中超限（状态数、项目数、步数）为 422。
+    """
+
+    def __init__(self, limit, value, maximum, status=422):
+        super().__init__(limit, value, maximum, status)
+        self.limit = limit
+        self.value = value
+        self.maximum = maximum
+        self.status = status
+
+    def __str__(self):
+        return f"超出资源限制 {self.limit}: {self.value} > {self.maximum}"
+
+    def to_dict(self):
+        return {"error": str(self), "limit": self.limit, "value": self.value, "max": self.maximum}
+
+
+# 限制名 -> (默认值, 超限时的状态码)；值为 None 或 0 表示不限制
+DEFAULT_LIMITS = {
+    "max_request_bytes": (1024 * 1024, 413),
+    "max_productions": (500, 413),
+    "max_inputs": (100, 413),
+    "max_input_length": (1000, 413),
+    "max_states": (2000, 422),
+    "max_items": (50000, 422),
+    "max_trace_steps": (20000, 422),
+    "max_glr_steps": (1000000, 422),
+    "max_render_states": (200, 422),
+}
+
+
+class Limits:
+    """
+    分析过程的资源上限。由 LR0Parser / AnalysisEngine / GLREngine 在构造和分析过程中检查，
+    一旦超限立即抛出 LimitExceeded，而不是等全部完成后再判断。
+    """
+
+    def __init__(self, **overrides):
+        for name, (default, _status) in DEFAULT_LIMITS.items():
+            setattr(self, name, default)
+        for name, value in overrides.items():
+            if name not in DEFAULT_LIMITS:
+                raise TypeError(f"未知的限制项: {name}")
+            setattr(self, name, value)
+        self.render_dpi = 300
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """读取环境变量 LR0_MAX_STATES、LR0_MAX_ITEMS ... 以及 LR0_RENDER_DPI"""
+        environ = os.environ if environ is None else environ
+        overrides = {}
+        for name in DEFAULT_LIMITS:
+            raw = environ.get("LR0_" + name.upper())
+            if raw is not None and raw.strip():
+                overrides[name] = int(raw)
+        limits = cls(**overrides)
+        if environ.get("LR0_RENDER_DPI"):
+            limits.render_dpi = int(environ["LR0_RENDER_DPI"])
+        return limits
+
+    def check(self, name, value):
+        """value 超过 name 对应的上限时抛出 LimitExceeded"""
+        maximum = getattr(self, name)
+        if maximum and value > maximum:
+            raise LimitExceeded(name, value, maximum, DEFAULT_LIMITS[name][1])
+
+    def exceeds(self, name, value):
+        maximum = getattr(self, name)
+        return bool(maximum) and value > maximum
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in DEFAULT_LIMITS}
+        data["render_dpi"] = self.render_dpi
+        return data
@@ -0,0 +1,229 @@
+# src/live.py
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from src.parser import LR0Parser
+from src.engine import AnalysisEngine
+
+logger = logging.getLogger(__name__)
+
+
+class LiveSessionFull(Exception):
+    """活动会话数已达上限"""
+
+
+class LiveSession:
+    """
+    边输入边分析的会话：绑定一个已构造好的分析表，保存当前输入串，
+    每次修改后用不记录 trace 的 recognize() 判定（分析表有冲突时用 GLR，受 limits.max_glr_steps 限制），
+    结果推送给订阅者。
+    """
+
+    def __init__(self, session_id, parser, limits=None, max_subscribers=4):
+        self.id = session_id
+        self.parser = parser
+        self.limits = limits
+        self.max_subscribers = max_subscribers
+        if parser.is_lr0:
+            self.engine = AnalysisEngine(parser, limits=limits)
+            self.glr = None
+        else:
+            from src.glr import GLREngine
+            self.engine = None
+            self.glr = GLREngine(parser, limits)
+        self.text = ""
+        self.version = 0
+        self.result = None
+        self.last_used = time.monotonic()
+        self.subscribers = []
+        self._lock = threading.Lock()
+
+    def update(self, text=None, edits=None):
+        """
+        text 为新的完整输入串；edits 为 [{"start", "end", "text"}]，依次替换当前输入串的 [start, end)。
+        :return: {"version", "input", "success", "steps", "error_position", "elapsed_ms"}
+        """
+        with self._lock:
+            new_text = self.text if text is None else text
+            for edit in edits or []:
+                start = int(edit.get("start", 0))
+                end = int(edit.get("end", start))
+                if not 0 <= start <= end <= len(new_text):
+                    raise ValueError(f"编辑范围 [{start}, {end}) 超出输入串长度 {len(new_text)}")
+                new_text = new_text[:start] + str(edit.get("text", "")) + new_text[end:]
+            if self.limits is not None:
+                self.limits.check("max_input_length", len(new_text))
+
+            begin = time.perf_counter()
+            if self.engine is not None:
+                success, steps, error_position = self.engine.recognize(new_text)
+            else:
+                success, _forest = self.glr.parse(new_text)
+                steps = self.glr.stats["gss_nodes"]
+                error_position = self.glr.stats["error_position"]
+            elapsed = time.perf_counter() - begin
+
+            self.text = new_text
+            self.version += 1
+            self.last_used = time.monotonic()
+            self.result = {
+                "version": self.version,
+                "input": new_text,
+                "success": success,
+                "steps": steps,
+                "error_position": error_position,
+                "elapsed_ms": round(elapsed * 1000, 3)
+            }
+            for q in self.subscribers:
+                _offer(q, self.result)
+            return self.result
+
+    def subscribe(self):
+        """订阅结果推送，返回 queue.Queue；None 表示会话已关闭"""
+        with self._lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                raise LiveSessionFull(f"会话订阅数已达上限 {self.max_subscribers}")
+            q = queue.Queue(maxsize=16)
+            if self.result is not None:
+                q.put(self.result)
+            self.subscribers.append(q)
+            self.last_used = time.monotonic()
+            return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            if q in self.subscribers:
+                self.subscribers.remove(q)
+
+    def close(self):
+        with self._lock:
+            for q in self.subscribers:
+                _offer(q, None)
+            self.subscribers = []
+
+
+def _offer(q, item):
+    """非阻塞放入；订阅者读得慢时丢弃最旧的结果，只保证最新结果送达"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+class LiveSessionManager:
+    """
+    管理边输入边分析的会话。分析表由 build_table(grammar_text, reduce_grammar, algorithm) 构造
+    （Web 服务中交给进程池，返回 LR0Parser.to_dict() 的结果），同一文法的分析表在会话间共享。
+    会话空闲超过 ttl 秒后过期；会话总数超过 max_sessions 时拒绝新会话。
+    每个 Server-Sent Events 连接占用一个服务线程，所有会话的连接总数超过 max_streams 时拒绝新连接。
+    """
+
+    def __init__(self, build_table, limits=None, max_sessions=1000, ttl=600, table_cache_size=32,
+                 max_streams=4):
+        self.build_table = build_table
+        self.limits = limits
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.table_cache_size = table_cache_size
+        self.max_streams = max_streams
+        self._sessions = {}
+        self._tables = OrderedDict()  # (文法文本, 是否化简, 算法) -> LR0Parser
+        self._streams = set()  # 打开的事件流的订阅队列
+        self._lock = threading.Lock()
+
+    def _parser_for(self, grammar_text, reduce_grammar, algorithm):
+        key = (grammar_text, bool(reduce_grammar), algorithm)
+        with self._lock:
+            parser = self._tables.get(key)
+            if parser is not None:
+                self._tables.move_to_end(key)
+                return parser
+        # 构造可能较慢，不持有锁
+        parser = LR0Parser.from_dict(self.build_table(grammar_text, reduce_grammar, algorithm))
+        with self._lock:
+            self._tables[key] = parser
+            while len(self._tables) > self.table_cache_size:
+                self._tables.popitem(last=False)
+        return parser
+
+    def _expire(self):
+        """删除空闲超时的会话（调用时持有锁）"""
+        now = time.monotonic()
+        expired = [sid for sid, s in self._sessions.items() if now - s.last_used > self.ttl]
+        for sid in expired:
+            self._sessions.pop(sid).close()
+        if expired:
+            logger.debug("过期会话 %d 个", len(expired))
+
+    def create(self, grammar_text, reduce_grammar=False, algorithm="lr0"):
+        with self._lock:
+            self._expire()
+            if len(self._sessions) >= self.max_sessions:
+                raise LiveSessionFull(f"活动会话数已达上限 {self.max_sessions}")
+        parser = self._parser_for(grammar_text, reduce_grammar, algorithm)
+        session = LiveSession(uuid.uuid4().hex, parser, self.limits)
+        with self._lock:
+            # 构造分析表期间可能有其他会话建立，插入前再检查一次
+            if len(self._sessions) >= self.max_sessions:
+                raise LiveSessionFull(f"活动会话数已达上限 {self.max_sessions}")
+            self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            self._expire()
+            return self._sessions.get(session_id)
+
+    def close(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.close()
+        return session is not None
+
+    def count(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def open_stream(self, session):
+        """订阅会话的结果推送，返回队列；连接总数达到 max_streams 时抛出 LiveSessionFull"""
+        with self._lock:
+            if len(self._streams) >= self.max_streams:
+                raise LiveSessionFull(f"事件流连接数已达上限 {self.max_streams}")
+            q = session.subscribe()
+            self._streams.add(q)
+        return q
+
+    def close_stream(self, session, q):
+        """取消订阅；可重复调用"""
+        session.unsubscribe(q)
+        with self._lock:
+            self._streams.discard(q)
+
+
+def sse_stream(manager, session, q, keepalive=15.0):
+    """把 manager.open_stream() 得到的队列转换为 Server-Sent Events 文本流；会话关闭或客户端断开时结束"""
+    try:
+        yield "retry: 2000\n\n"
+        while True:
+            try:
+                item = q.get(timeout=keepalive)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            if item is None:
+                yield "event: closed\ndata: {}\n\n"
+                return
+            yield f"id: {item['version']}\nevent: result\ndata: {json.dumps(item, ensure_ascii=False)}\n\n"
+    finally:
+        manager.close_stream(session, q)
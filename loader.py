@@ -0,0 +1,393 @@
+# src/loader.py
+"""
+文法文件载入：单遍扫描的词法分析器 + 递归下降，按行从文件流式读取，不需要把整个文件读成一个字符串。
+支持两种格式（另有 "text"，即 Web 页面使用的逐行 A -> a B | @ 格式）：
+
+yacc:   %token NUM ID            声明终结符（%left/%right/%nonassoc 同样视为声明，优先级不处理）
+        %start expr
+        %%
+        expr : expr '+' term     多行规则，以 ; 结束（下一条规则开始时可省略）
+             | term ;
+        term : NUM | ID | ;      空候选式即空串
+        %%                       之后的内容忽略；{ ... } 语义动作、%prec、<类型> 均忽略
+
+ebnf:   expr ::= term { ('+' | '-') term } ;    也接受 = : ->
+        term  = NUM | '(' expr ')' | [ '-' ] ID ;
+        X* X+ X? ( ... ) [ ... ] { ... } 展开为新的非终结符（左递归，适合 LR 分析）
+
+两种格式共有：'...' 或 "..." 为终结符；//、# 行注释和 /* */ 块注释；yacc 格式同样接受 * + ? 和括号。
+产生式左部即非终结符，其余标识符为终结符。
+"""
+import os
+import re
+
+from src.grammar import Grammar
+
+FORMATS = ("text", "yacc", "ebnf")
+
+_EXTENSIONS = {
+    ".y": "yacc", ".yy": "yacc", ".yacc": "yacc",
+    ".ebnf": "ebnf", ".bnf": "ebnf",
+}
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+    (?P<end>$)
+  | (?P<comment>//.*|\#.*)
+  | (?P<block>/\*)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<directive>%%|%\{|%[A-Za-z_-]+)
+  | (?P<tag><[A-Za-z_][A-Za-z0-9_]*>)
+  | (?P<op>::=|->|[:=|;()\[\]{}*+?])
+    )""", re.VERBOSE)
+
+_DEFINE = (":", "::=", "=", "->")
+_RESERVED = ("@", "$")
+# yacc 预定义的终结符（错误产生式用），不需要 %token 声明
+_PREDEFINED = ("error",)
+
+
+class GrammarFormatError(ValueError):
+    pass
+
+
+def detect_format(path):
+    """按扩展名判断文件格式，未知扩展名按 text 处理"""
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), "text")
+
+
+def tokenize(lines, fmt="yacc"):
+    """
+    逐行产生 (类别, 值, 行号)。块注释、yacc 的 { ... } 语义动作和 %{ ... %} 可以跨行，在扫描状态中跨行保持。
+    类别: ident / rule（后跟定义符号的标识符，定义符号本身不再产生）/ string / directive / tag / op；
+    字符串已去掉引号并处理转义。
+    """
+    pending = None  # 推迟一个标识符，看其后是否为定义符号
+    for tok in _scan(lines, fmt):
+        if pending is not None:
+            if tok[0] == "op" and tok[1] in _DEFINE:
+                yield "rule", pending[1], pending[2]
+                pending = None
+                continue
+            yield pending
+            pending = None
+        if tok[0] == "ident":
+            pending = tok
+        else:
+            yield tok
+    if pending is not None:
+        yield pending
+
+
+def _scan(lines, fmt):
+    in_comment = False
+    in_prologue = False
+    action_depth = 0
+    for lineno, line in enumerate(lines, 1):
+        pos = 0
+        end = len(line)
+        while pos < end:
+            if in_comment:
+                close = line.find("*/", pos)
+                if close < 0:
+                    break
+                in_comment = False
+                pos = close + 2
+                continue
+            if in_prologue:
+                close = line.find("%}", pos)
+                if close < 0:
+                    break
+                in_prologue = False
+                pos = close + 2
+                continue
+            if action_depth:
+                pos = _skip_action(line, pos, action_depth)
+                if pos < 0:
+                    action_depth = -pos
+                    break
+                action_depth = 0
+                continue
+
+            m = _TOKEN_RE.match(line, pos)
+            if m is None:
+                raise GrammarFormatError(f"第 {lineno} 行: 无法识别的字符 {line[pos]!r}")
+            kind = m.lastgroup
+            value = m.group(kind)
+            pos = m.end()
+            if kind == "end" or kind == "comment":
+                if kind == "end":
+                    break
+                continue
+            if kind == "block":
+                in_comment = True
+            elif kind == "directive" and value == "%{":
+                in_prologue = True
+            elif kind == "op" and value == "{" and fmt == "yacc":
+                action_depth = 1
+            elif kind == "string":
+                yield kind, _unquote(value), lineno
+            else:
+                yield kind, value, lineno
+
+
+def _skip_action(line, pos, depth):
+    """在语义动作内扫描，返回动作结束后的位置；行尾仍未结束时返回 -depth"""
+    quote = None
+    while pos < len(line):
+        ch = line[pos]
+        if quote:
+            if ch == "\\":
+                pos += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    return -depth
+
+
+def _unquote(text):
+    body = text[1:-1]
+    if "\\" in body:
+        body = re.sub(r"\\(.)", lambda m: {"n": "\n", "t": "\t"}.get(m.group(1), m.group(1)), body)
+    return body
+
+
+class _RuleReader:
+    """从记号流读出规则，EBNF 结构展开为新的非终结符"""
+
+    def __init__(self, tokens, fmt):
+        self.tokens = tokens
+        self.tok = next(tokens, None)  # 当前记号（单记号向前看）
+        self.fmt = fmt
+        self.rules = []          # [(左部, [右部符号])]
+        self.lhs = set()
+        self.declared = set()    # %token 等声明的终结符
+        self.quoted = set()      # 带引号的终结符
+        self.used = {}           # 右部出现的标识符 -> 首次出现的行号
+        self.start = None
+        self.errors = []
+        self._desugared = {}     # (运算, 候选式元组) -> 新非终结符
+
+    # ---- 记号流 ----
+    def advance(self):
+        """前进一个记号，返回前进前的当前记号"""
+        tok = self.tok
+        self.tok = next(self.tokens, None)
+        return tok
+
+    def skip_to_rule_end(self):
+        while self.tok is not None and self.tok[0] != "rule":
+            if self.advance()[:2] == ("op", ";"):
+                return
+
+    # ---- 顶层 ----
+    def read(self):
+        sections = 0
+        while self.tok is not None:
+            kind, value, lineno = self.tok
+            if kind == "rule":
+                self.rule()
+            elif kind == "directive":
+                self.advance()
+                if value == "%%":
+                    sections += 1
+                    if sections == 2:
+                        break  # 之后是 yacc 的用户代码段
+                else:
+                    self.directive(value, lineno)
+            elif (kind, value) == ("op", ";"):
+                self.advance()
+            else:
+                self.errors.append(f"第 {lineno} 行: 应为规则定义，遇到 {value!r}")
+                self.advance()
+                self.skip_to_rule_end()
+
+    def directive(self, name, lineno):
+        """声明只占一行：读取同一行内的符号"""
+        args = []
+        while self.tok is not None and self.tok[2] == lineno and self.tok[0] != "directive":
+            kind, value, _ = self.advance()
+            if kind in ("ident", "string", "rule"):
+                args.append(value)
+        if name in ("%token", "%left", "%right", "%nonassoc", "%precedence"):
+            self.declared.update(args)
+        elif name == "%start":
+            if args:
+                self.start = args[0]
+            else:
+                self.errors.append(f"第 {lineno} 行: %start 缺少符号")
+
+    def rule(self):
+        _, lhs, lineno = self.advance()
+        self.lhs.add(lhs)
+        if self.start is None:
+            self.start = lhs
+        try:
+            alternatives = self.alternatives(lhs, ())
+        except GrammarFormatError as e:
+            self.errors.append(str(e))
+            self.skip_to_rule_end()
+            return
+        tok = self.tok
+        if tok is not None and tok[:2] == ("op", ";"):
+            self.advance()
+        elif tok is not None and tok[0] not in ("rule", "directive"):
+            self.errors.append(f"第 {tok[2]} 行: 规则 {lhs} 之后应为 ';'，遇到 {tok[1]!r}")
+            self.skip_to_rule_end()
+        for rhs in alternatives:
+            self.rules.append((lhs, rhs or ['@']))
+
+    # ---- 右部 ----
+    def alternatives(self, lhs, closers):
+        result = [self.sequence(lhs, closers)]
+        while self.tok is not None and self.tok[:2] == ("op", "|"):
+            self.advance()
+            result.append(self.sequence(lhs, closers))
+        return result
+
+    def sequence(self, lhs, closers):
+        symbols = []
+        while self.tok is not None:
+            kind, value, lineno = self.tok
+            if kind == "ident":
+                self.advance()
+                self.used.setdefault(value, lineno)
+                symbol = value
+            elif kind == "string":
+                self.advance()
+                if not value or value in _RESERVED:
+                    raise GrammarFormatError(f"第 {lineno} 行: {value!r} 不能用作终结符")
+                self.quoted.add(value)
+                symbol = value
+            elif kind == "op":
+                if value in (";", "|") or value in closers:
+                    return symbols
+                symbol = self.group(lhs)
+            elif kind == "tag":
+                self.advance()
+                continue
+            elif value == "%prec":
+                self.advance()
+                self.advance()  # %prec 的符号
+                continue
+            else:
+                return symbols  # 下一条规则或声明
+            while self.tok is not None and self.tok[0] == "op" and self.tok[1] in ("*", "+", "?"):
+                symbol = self.desugar(self.advance()[1], ((symbol,),))
+            symbols.append(symbol)
+        return symbols
+
+    def group(self, lhs):
+        _, value, lineno = self.advance()
+        groups = {"(": (")", "()")}
+        if self.fmt == "ebnf":
+            groups.update({"[": ("]", "?"), "{": ("}", "*")})
+        if value not in groups:
+            raise GrammarFormatError(f"第 {lineno} 行: 意外的 {value!r}")
+        closer, op = groups[value]
+        alternatives = self.alternatives(lhs, (closer,))
+        tok = self.advance()
+        if tok is None or tok[:2] != ("op", closer):
+            found = "文件结尾" if tok is None else repr(tok[1])
+            raise GrammarFormatError(f"第 {lineno} 行: {value!r} 缺少匹配的 {closer!r}，遇到 {found}")
+        return self.desugar(op, tuple(tuple(alt) for alt in alternatives), lhs)
+
+    def desugar(self, op, alternatives, lhs=None):
+        """
+        op: "()" 分组, "?" 可选, "*" 零次或多次, "+" 一次或多次。
+        相同结构只展开一次；单个符号 X 的新非终结符命名为 X* / X+ / X?，分组命名为 左部~序号。
+        """
+        key = (op, alternatives)
+        name = self._desugared.get(key)
+        if name is not None:
+            return name
+        if op == "()" and len(alternatives) == 1 and len(alternatives[0]) == 1:
+            return alternatives[0][0]  # (X) 即 X
+
+        if len(alternatives) == 1 and len(alternatives[0]) == 1 and op != "()":
+            name = alternatives[0][0] + op
+        else:
+            group = self._desugared.get(("()", alternatives))
+            if group is None:
+                group = f"{lhs}~{len(self._desugared) + 1}"
+                self._desugared[("()", alternatives)] = group
+                self.lhs.add(group)
+                for alt in alternatives:
+                    self.rules.append((group, list(alt) or ['@']))
+            if op == "()":
+                return group
+            name = group + op
+
+        self._desugared[key] = name
+        self.lhs.add(name)
+        body = alternatives[0][0] if len(alternatives) == 1 and len(alternatives[0]) == 1 else group
+        if op == "?":
+            self.rules.append((name, ['@']))
+            self.rules.append((name, [body]))
+        elif op == "*":
+            self.rules.append((name, ['@']))
+            self.rules.append((name, [name, body]))
+        else:
+            self.rules.append((name, [body]))
+            self.rules.append((name, [name, body]))
+        return name
+
+    def check(self):
+        """读完后检查未定义的符号和名字冲突"""
+        clash = sorted(self.quoted & self.lhs)
+        if clash:
+            self.errors.append("终结符与非终结符同名: " + ", ".join(clash))
+        if self.fmt == "yacc" and self.declared:
+            for sym, lineno in sorted(self.used.items(), key=lambda kv: kv[1]):
+                if sym not in self.lhs and sym not in self.declared and sym not in _PREDEFINED:
+                    self.errors.append(f"第 {lineno} 行: 符号 {sym} 既没有用 %token 声明，也没有产生式")
+        if self.start is not None and self.start not in self.lhs:
+            self.errors.append(f"开始符号 {self.start} 没有产生式")
+
+
+def read_rules(lines, fmt="yacc"):
+    """
+    从行的可迭代对象读出 (规则列表, 开始符号, 声明的终结符, 错误列表)。
+    规则为 [(左部, [右部符号])]，空串用 '@' 表示。
+    """
+    if fmt not in ("yacc", "ebnf"):
+        raise ValueError(f"未知的文法格式: {fmt}")
+    reader = _RuleReader(tokenize(lines, fmt), fmt)
+    try:
+        reader.read()
+    except GrammarFormatError as e:
+        reader.errors.append(str(e))
+    if not reader.rules and not reader.errors:
+        reader.errors.append("文法中没有产生式")
+    reader.check()
+    return reader.rules, reader.start, reader.declared, reader.errors
+
+
+def load_grammar(source, fmt=None):
+    """
+    载入文法并返回 Grammar。
+    source: 文件路径，或按行迭代的对象（打开的文件、字符串列表等）。
+    fmt: "text" / "yacc" / "ebnf"；为 None 时按文件扩展名判断（无法判断时为 text）。
+    格式错误记录在返回的 Grammar.errors 中，与 Grammar(text) 一致。
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if fmt is None:
+            fmt = detect_format(os.fspath(source))
+        with open(source, encoding="utf-8") as f:
+            return load_grammar(f, fmt)
+    fmt = fmt or "text"
+    if fmt == "text":
+        # 逐行格式：跳过空行和 # 注释行
+        lines = (line.strip() for line in source)
+        return Grammar("\n".join(line for line in lines if line and not line.startswith("#")))
+    rules, start, declared, errors = read_rules(source, fmt)
+    return Grammar.from_rules(rules, start, errors=errors)
@@ -0,0 +1,48 @@
+# src/log.py
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+# 所有 src.* 模块的日志都挂在这个名字下
+PACKAGE_LOGGER = "src"
+
+# 库默认不输出任何日志，由应用入口决定是否配置
+logging.getLogger(PACKAGE_LOGGER).addHandler(logging.NullHandler())
+
+
+def configure_logging(level=None, fmt="%(asctime)s %(levelname)s [%(name)s] %(message)s"):
+    """
+    配置 src.* 的日志级别和输出。
+    :param level: 级别名或数值；为 None 时读取环境变量 LR0_LOG_LEVEL，默认 WARNING
+    """
+    if level is None:
+        level = os.environ.get("LR0_LOG_LEVEL", "WARNING")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.WARNING
+
+    logger = logging.getLogger(PACKAGE_LOGGER)
+    logger.setLevel(level)
+    if not any(isinstance(h, logging.StreamHandler) for h in logger.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(fmt))
+        logger.addHandler(handler)
+    return logger
+
+
+@contextmanager
+def span(logger, stage):
+    """
+    调试用的阶段耗时记录：仅在 DEBUG 开启时计时和输出，否则几乎没有开销。
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        yield
+        return
+    start = time.perf_counter()
+    logger.debug("%s 开始", stage)
+    try:
+        yield
+    finally:
+        logger.debug("%s 完成，耗时 %.3f ms", stage, (time.perf_counter() - start) * 1000)
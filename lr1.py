@@ -0,0 +1,249 @@
+# src/lr1.py
+from collections import deque
+import logging
+
+from src.parser import LR0Parser, _encode_grammar
+from src.log import span
+
+logger = logging.getLogger(__name__)
+
+
+def _first_sets(productions, non_terminals):
+    """FIRST 集与可空非终结符集合；'@' 表示空串"""
+    first = {nt: set() for nt in non_terminals}
+    nullable = set()
+    changed = True
+    while changed:
+        changed = False
+        for left, rhs in productions:
+            before = len(first[left])
+            for sym in rhs:
+                if sym == '@':
+                    continue
+                if sym in first:
+                    first[left] |= first[sym]
+                    if sym not in nullable:
+                        break
+                else:
+                    first[left].add(sym)
+                    break
+            else:
+                if left not in nullable:
+                    nullable.add(left)
+                    changed = True
+            if len(first[left]) != before:
+                changed = True
+    return first, nullable
+
+
+def _weakly_compatible(old, new):
+    """
+    Pager 弱相容判定：两组同核心的向前看符号集合合并后不会引入原本没有的规约-规约冲突。
+    对任意 i < j，要求 (old[i]∩new[j] 与 new[i]∩old[j] 均为空) 或 old[i]∩old[j] 非空 或 new[i]∩new[j] 非空。
+    """
+    n = len(old)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if not (old[i] & new[j]) and not (new[i] & old[j]):
+                continue
+            if old[i] & old[j] or new[i] & new[j]:
+                continue
+            return False
+    return True
+
+
+class LR1Parser(LR0Parser):
+    """
+    LR(1) 分析器：构造时按 Pager 弱相容条件合并同核心的状态，
+    对 LALR(1) 文法得到与 LR(0)/LALR 相同规模的分析表，对非 LALR 的 LR(1) 文法只在必要时拆分状态。
+    ACTION/GOTO 表格式与 LR0Parser 相同，AnalysisEngine、压缩表和 Web 页面无需改动；
+    is_lr0 沿用为“分析表无冲突”的标志。
+    """
+
+    algorithm = "lr1"
+
+    def __init__(self, grammar, limits=None):
+        super().__init__(grammar, limits)
+        self.lookaheads = []  # 每个状态的闭包：[(产生式编号, 点的位置, 向前看符号集合)]
+
+    def _suffix_first(self, productions):
+        """每个 (产生式, 位置) 之后剩余符号串的 (FIRST 集, 是否可空)"""
+        first, nullable = _first_sets(productions, set(self.grammar.non_terminals))
+        table = {}
+        for idx, (_left, rhs) in enumerate(productions):
+            acc = set()
+            can_be_empty = True
+            for pos in range(len(rhs), -1, -1):
+                if pos < len(rhs):
+                    sym = rhs[pos]
+                    if sym != '@':
+                        if sym in first:
+                            if sym in nullable:
+                                acc = acc | first[sym]
+                            else:
+                                acc = set(first[sym])
+                                can_be_empty = False
+                        else:
+                            acc = {sym}
+                            can_be_empty = False
+                table[(idx, pos)] = (frozenset(acc), can_be_empty)
+        return table
+
+    def _closure_lr1(self, kernel, productions, by_left, suffix):
+        """kernel: {(产生式编号, 点): 向前看集合}，返回按发现顺序排列的闭包字典"""
+        items = {core: set(la) for core, la in kernel.items()}
+        work = deque(items)
+        while work:
+            core = work.popleft()
+            prod_idx, dot = core
+            rhs = productions[prod_idx][1]
+            if dot < len(rhs) and rhs[dot] in by_left:
+                rest, rest_nullable = suffix[(prod_idx, dot + 1)]
+                la = set(rest)
+                if rest_nullable:
+                    la |= items[core]
+                for idx in by_left[rhs[dot]]:
+                    target = (idx, 0)
+                    current = items.get(target)
+                    if current is None:
+                        items[target] = set(la)
+                        work.append(target)
+                    elif not la <= current:
+                        current |= la
+                        work.append(target)
+        return items
+
+    def _gotos(self, closure, productions):
+        """由闭包得到各符号的后继核心：{符号: {(产生式编号, 点): 向前看集合}}"""
+        kernels = {}
+        for (prod_idx, dot), la in closure.items():
+            rhs = productions[prod_idx][1]
+            if dot < len(rhs) and rhs[dot] != '@':
+                kernel = kernels.setdefault(rhs[dot], {})
+                kernel.setdefault((prod_idx, dot + 1), set()).update(la)
+        return kernels
+
+    def build_canonical_collection(self, workers=None):
+        """
+        构建 LR(1) 项目集族（Pager 合并）。
+        状态以核心项目（按编号排序）标识，同核心且弱相容的状态合并向前看集合；
+        合并使已处理状态的向前看集合变大时，该状态重新入队传播。workers 参数为兼容保留，不使用。
+        """
+        with span(logger, "构建 LR(1) 项目集族 (Pager)"):
+            productions, by_left = _encode_grammar(self.grammar)
+            suffix = self._suffix_first(productions)
+            limits = self.limits
+
+            kernels = []       # 状态 -> (核心元组, [向前看集合，与核心对应])
+            by_core = {}       # 核心元组 -> [状态编号]
+            transitions = {}   # (状态, 符号) -> 状态
+            work = deque()
+            queued = set()
+
+            def add_or_merge(kernel):
+                cores = tuple(sorted(kernel))
+                las = [kernel[c] for c in cores]
+                for t in by_core.get(cores, ()):
+                    old = kernels[t][1]
+                    if _weakly_compatible(old, las):
+                        grown = False
+                        for current, la in zip(old, las):
+                            if not la <= current:
+                                current |= la
+                                grown = True
+                        if grown and t not in queued:
+                            queued.add(t)
+                            work.append(t)
+                        return t
+                t = len(kernels)
+                kernels.append((cores, [set(la) for la in las]))
+                by_core.setdefault(cores, []).append(t)
+                queued.add(t)
+                work.append(t)
+                if limits is not None:
+                    limits.check("max_states", len(kernels))
+                return t
+
+            add_or_merge({(0, 0): {'$'}})
+            while work:
+                s = work.popleft()
+                queued.discard(s)
+                cores, las = kernels[s]
+                closure = self._closure_lr1(dict(zip(cores, las)), productions, by_left, suffix)
+                self.closure_calls += 1
+                for sym, kernel in sorted(self._gotos(closure, productions).items()):
+                    transitions[(s, sym)] = add_or_merge(kernel)
+                    self.closure_calls += 1
+
+            self._renumber(kernels, transitions, productions, by_left, suffix)
+        logger.debug("LR(1) 项目集族: %d 个状态, %d 条转移", len(self.states), len(self.transitions))
+
+    def _renumber(self, kernels, transitions, productions, by_left, suffix):
+        """
+        从状态 0 出发按（状态, 符号）顺序 BFS 重新编号，丢弃重新传播后不可达的状态，
+        并生成与 LR0Parser 相同形式的 states（项目额外带 'lookaheads'）。
+        """
+        out_edges = {}
+        for (src, sym), dest in transitions.items():
+            out_edges.setdefault(src, []).append((sym, dest))
+
+        order = [0]
+        new_id = {0: 0}
+        for s in order:
+            for sym, dest in sorted(out_edges.get(s, [])):
+                if dest not in new_id:
+                    new_id[dest] = len(order)
+                    order.append(dest)
+                self.transitions[(new_id[s], sym)] = new_id[dest]
+
+        grammar_productions = self.grammar.productions
+        total_items = 0
+        for s in order:
+            cores, las = kernels[s]
+            closure = self._closure_lr1(dict(zip(cores, las)), productions, by_left, suffix)
+            self.lookaheads.append([(p, d, frozenset(la)) for (p, d), la in closure.items()])
+            items = []
+            for (prod_idx, dot), la in closure.items():
+                items.append({'left': grammar_productions[prod_idx]['left'],
+                              'right': grammar_productions[prod_idx]['right'],
+                              'dot': dot,
+                              'lookaheads': sorted(la)})
+            self.states.append(items)
+            for hook in self.hooks:
+                hook.on_state_created(len(self.states) - 1, items)
+            total_items += len(items)
+            if self.limits is not None:
+                self.limits.check("max_items", total_items)
+
+    def build_parsing_table(self):
+        """生成 LR(1) 分析表：规约动作只填在向前看符号上"""
+        with span(logger, "生成 LR(1) 分析表"):
+            productions = self.grammar.productions
+            for i in range(len(self.states)):
+                self.action_table[i] = {}
+                self.goto_table[i] = {}
+
+            for (src, sym), dest in sorted(self.transitions.items()):
+                if sym in self.grammar.terminals:
+                    self._add_action(src, sym, f"s{dest}")
+                else:
+                    self.goto_table[src][sym] = dest
+
+            for i, closure in enumerate(self.lookaheads):
+                for prod_idx, dot, la in closure:
+                    rhs = productions[prod_idx]['right']
+                    if dot != len(rhs) and rhs != ['@']:
+                        continue
+                    if prod_idx == 0:
+                        self._add_action(i, '$', "acc")
+                        continue
+                    for term in sorted(la):
+                        self._add_action(i, term, f"r{prod_idx}")
+        if self.conflicts:
+            logger.debug("分析表存在 %d 处冲突", len(self.conflicts))
+
+
+PARSERS = {
+    "lr0": LR0Parser,
+    "lr1": LR1Parser,
+}
@@ -0,0 +1,117 @@
+# src/metrics.py
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Metrics:
+    """单次分析的计时与计数"""
+
+    def __init__(self):
+        self.timings = {}   # 阶段名 -> 秒
+        self.counters = {}  # 计数名 -> 数值
+        self.inputs = []    # 每个输入串的耗时与步数
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    def incr(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        self.counters[name] = value
+
+    def add_input(self, input_string, seconds, steps, success):
+        self.inputs.append({
+            "input": input_string,
+            "seconds": round(seconds, 6),
+            "steps": steps,
+            "success": success
+        })
+
+    def to_dict(self):
+        return {
+            "timings": {k: round(v, 6) for k, v in self.timings.items()},
+            "counters": dict(self.counters),
+            "inputs": list(self.inputs)
+        }
+
+
+# 直方图桶上界（秒）
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRegistry:
+    """
+    进程内的累计指标，供 /metrics 以 Prometheus 文本格式导出。
+    所有方法线程安全（waitress 多线程处理请求）。
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="lr0"):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = {}    # 名称 -> 数值
+        self._histograms = {}  # 阶段名 -> [各桶计数..., 总和, 次数]
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self._observe(stage, seconds)
+
+    def _observe(self, stage, seconds):
+        hist = self._histograms.get(stage)
+        if hist is None:
+            hist = [0] * len(self.buckets) + [0.0, 0]
+            self._histograms[stage] = hist
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[-2] += seconds
+        hist[-1] += 1
+
+    def record(self, metrics):
+        """把一次分析的 Metrics（或其 to_dict() 结果）累加进来"""
+        data = metrics.to_dict() if isinstance(metrics, Metrics) else metrics
+        with self._lock:
+            for stage, seconds in data.get("timings", {}).items():
+                self._observe(stage, seconds)
+            for name, value in data.get("counters", {}).items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self._counters[name] = self._counters.get(name, 0) + value
+            for item in data.get("inputs", []):
+                self._observe("input_parse", item["seconds"])
+
+    def render_prometheus(self):
+        """导出 Prometheus 文本格式"""
+        p = self.prefix
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                metric = f"{p}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {self._counters[name]}")
+
+            if self._histograms:
+                metric = f"{p}_stage_duration_seconds"
+                lines.append(f"# HELP {metric} Duration of each analysis stage.")
+                lines.append(f"# TYPE {metric} histogram")
+                for stage in sorted(self._histograms):
+                    hist = self._histograms[stage]
+                    for i, bound in enumerate(self.buckets):
+                        lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {hist[i]}')
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {hist[-1]}')
+                    lines.append(f'{metric}_sum{{stage="{stage}"}} {hist[-2]}')
+                    lines.append(f'{metric}_count{{stage="{stage}"}} {hist[-1]}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
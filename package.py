@@ -31,7 +31,7 @@ def clean_build():
 
 def check_requirements():
     """检查依赖是否安装"""
-    required = ['flask', 'graphviz', 'pandas', 'pyinstaller', 'waitress']
+    required = ['flask', 'graphviz', 'pyinstaller', 'waitress']
     missing = []
 
     for package in required:
@@ -199,15 +199,33 @@ def main():
             '--hidden-import', 'flask',
             '--hidden-import', 'flask.cli',
             '--hidden-import', 'graphviz',
-            '--hidden-import', 'pandas',
             '--hidden-import', 'waitress',
             '--hidden-import', 'src.engine',
             '--hidden-import', 'src.grammar',
             '--hidden-import', 'src.parser',
             '--hidden-import', 'src.utils',
             '--hidden-import', 'src.visualizer',
+            '--hidden-import', 'src.compress',
+            '--hidden-import', 'src.codegen',
+            '--hidden-import', 'src.tree',
+            '--hidden-import', 'src.glr',
+            '--hidden-import', 'src.metrics',
+            '--hidden-import', 'src.log',
+            '--hidden-import', 'src.profiling',
+            '--hidden-import', 'src.analysis',
+            '--hidden-import', 'src.pool',
+            '--hidden-import', 'src.limits',
+            '--hidden-import', 'src.jobs',
+            '--hidden-import', 'src.cli',
+            '--hidden-import', 'src.lr1',
+            '--hidden-import', 'src.loader',
+            '--hidden-import', 'src.conflicts',
+            '--hidden-import', 'src.live',
+            '--hidden-import', 'src.httpcache',
+            '--hidden-import', 'src.registry',
             '--exclude-module', 'matplotlib',
             '--exclude-module', 'numpy',
+            '--exclude-module', 'pandas',
             '--exclude-module', 'scipy',
             '--exclude-module', 'tkinter',
             '--name', 'LR0_Analyzer',
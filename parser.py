@@ -1,12 +1,80 @@
 # src/parser.py
+import logging
+import multiprocessing
+
 from src.utils import TableRenderer
 from src.grammar import Grammar
+from src.codegen import generate_parser_module
+from src.log import span
+
+logger = logging.getLogger(__name__)
+
+# 并行构造时，每层状态数少于该值就在本进程中计算（进程间传输的开销更大）
+PARALLEL_MIN_FRONTIER = 64
+
+
+def _encode_grammar(grammar):
+    """
+    紧凑编码：产生式为 (左部, 右部元组)，项目为 (产生式编号, 点的位置)。
+    by_left 中左部、右部都相同的重复产生式只保留第一个，与按字典比较项目的去重结果一致。
+    """
+    productions = [(p['left'], tuple(p['right'])) for p in grammar.productions]
+    by_left = {}
+    first = {}
+    for idx, prod in enumerate(productions):
+        if prod not in first:
+            first[prod] = idx
+            by_left.setdefault(prod[0], []).append(idx)
+    return productions, by_left
+
+
+def _closure_encoded(kernel, productions, by_left):
+    """编码项目的闭包：核心项目在前，新项目按发现顺序（产生式编号）追加"""
+    result = list(kernel)
+    seen = set(result)
+    for prod_idx, dot in result:  # 迭代过程中 result 会增长
+        rhs = productions[prod_idx][1]
+        if dot < len(rhs):
+            for idx in by_left.get(rhs[dot], ()):
+                item = (idx, 0)
+                if item not in seen:
+                    seen.add(item)
+                    result.append(item)
+    return result
+
+
+def _expand_state(items, productions, by_left):
+    """对一个状态按符号排序计算全部 GoTo：[(符号, 核心项目数, 闭包)]"""
+    kernels = {}
+    for prod_idx, dot in items:
+        rhs = productions[prod_idx][1]
+        # 跳过 ε 符号（@），不为其创建转移
+        if dot < len(rhs) and rhs[dot] != '@':
+            kernels.setdefault(rhs[dot], []).append((prod_idx, dot + 1))
+    return [(sym, len(kernels[sym]), _closure_encoded(kernels[sym], productions, by_left))
+            for sym in sorted(kernels)]
+
+
+_worker_grammar = None
+
+
+def _init_expand_worker(productions, by_left):
+    global _worker_grammar
+    _worker_grammar = (productions, by_left)
+
+
+def _expand_chunk(states):
+    productions, by_left = _worker_grammar
+    return [_expand_state(items, productions, by_left) for items in states]
 
 
 class LR0Parser:
-    def __init__(self, grammar: Grammar):
+    algorithm = "lr0"
+
+    def __init__(self, grammar: Grammar, limits=None):
 
         self.grammar = grammar
+        self.limits = limits  # 可选：src.limits.Limits，构造过程中超限即终止
         self.states = []  # 状态列表（每个状态是一个项目集）
         self.transitions = {}  # 状态转移表: (state_id, symbol) -> next_state_id
         self.action_table = {}  # ACTION表
@@ -14,9 +82,19 @@ class LR0Parser:
         self.is_lr0 = True  # 标志位
         self.conflicts = []  # 冲突记录
         self.conflict_state_ids = set()  # 冲突状态ID集合
+        self.closure_calls = 0  # 闭包计算次数（性能统计用）
+        self.hooks = []  # 性能分析钩子（src.profiling.ParserHook）
+
+    def add_hook(self, hook):
+        """
+        注册钩子，构造过程中回调 hook.on_closure / hook.on_state_created。
+        未注册时构造过程只多一次列表判空。
+        """
+        self.hooks.append(hook)
+        return hook
 
     def _get_item_str(self, item):
-        """辅助：将项目对象转为字符串，用于去重比较"""
+        """辅助：将项目对象转为字符串，用于显示"""
         rhs = item['right']
         dot = item['dot']
         rhs_str = ""
@@ -28,134 +106,131 @@ class LR0Parser:
             rhs_str += "·"
         return f"{item['left']}->{rhs_str}"
 
-    def _items_equal(self, set1, set2):
-        """判断两个项目集是否相同"""
-        s1 = set([self._get_item_str(i) for i in set1])
-        s2 = set([self._get_item_str(i) for i in set2])
-        return s1 == s2
-
-    def _closure(self, items):
-        """计算闭包 Closure(I)"""
-        closure_set = [item.copy() for item in items]
-        while True:
-            added_new = False
-            for item in closure_set:
-                rhs = item['right']
-                dot = item['dot']
-                if dot < len(rhs):
-                    symbol = rhs[dot]
-                    if symbol in self.grammar.non_terminals:
-                        for prod in self.grammar.productions:
-                            if prod['left'] == symbol:
-                                new_item = {'left': prod['left'], 'right': prod['right'], 'dot': 0}
-                                exists = False
-                                for existing in closure_set:
-                                    if existing == new_item:
-                                        exists = True
-                                        break
-                                if not exists:
-                                    closure_set.append(new_item)
-                                    added_new = True
-            if not added_new:
-                break
-        return closure_set
-
-    def _goto(self, items, symbol):
-        """计算 GoTo(I, X)"""
-        next_items = []
-        for item in items:
-            rhs = item['right']
-            dot = item['dot']
-            if dot < len(rhs) and rhs[dot] == symbol:
-                new_item = item.copy()
-                new_item['dot'] += 1
-                next_items.append(new_item)
-        return self._closure(next_items)
-
-    def build_canonical_collection(self):
-        """构建识别活前缀的DFA"""
-        print("正在构建项目集规范族 (DFA)...")
-        start_prod = self.grammar.productions[0]
-        initial_item = {'left': start_prod['left'], 'right': start_prod['right'], 'dot': 0}
-        initial_state = self._closure([initial_item])
-
-        self.states.append(initial_state)
-        to_process = [0]
-
-        while to_process:
-            current_idx = to_process.pop(0)
-            current_items = self.states[current_idx]
-
-            symbols = set()
-            for item in current_items:
-                if item['dot'] < len(item['right']):
-                    symbol = item['right'][item['dot']]
-                    # 关键修改：跳过 ε 符号（@），不为其创建转移
-                    if symbol != '@':
-                        symbols.add(symbol)
-
-            for sym in sorted(list(symbols)):
-                next_state_items = self._goto(current_items, sym)
-                if not next_state_items:
-                    continue
-
-                existing_idx = -1
-                for idx, state in enumerate(self.states):
-                    if self._items_equal(state, next_state_items):
-                        existing_idx = idx
-                        break
-
-                if existing_idx == -1:
-                    self.states.append(next_state_items)
-                    new_idx = len(self.states) - 1
-                    self.transitions[(current_idx, sym)] = new_idx
-                    to_process.append(new_idx)
-                else:
-                    self.transitions[(current_idx, sym)] = existing_idx
+    def build_canonical_collection(self, workers=None):
+        """
+        构建识别活前缀的DFA。
+        按 BFS 层同步构造：同一层状态的 GoTo 互不依赖，可以并行计算，再按（状态编号, 符号）顺序合并，
+        因此状态编号与逐个处理工作表完全相同。项目在构造期间编码为 (产生式编号, 点的位置)，
+        状态通过项目集合的哈希表查重。
+        :param workers: 大于 1 时用该数量的进程并行计算每层的 GoTo
+        """
+        with span(logger, "构建项目集规范族 (DFA)"):
+            productions, by_left = _encode_grammar(self.grammar)
+            pool = None
+            if workers and workers > 1:
+                pool = multiprocessing.get_context().Pool(
+                    workers, initializer=_init_expand_worker, initargs=(productions, by_left))
+            try:
+                self._build_levels(productions, by_left, pool, workers or 1)
+            finally:
+                if pool is not None:
+                    pool.close()
+                    pool.join()
+        logger.debug("项目集规范族: %d 个状态, %d 条转移", len(self.states), len(self.transitions))
+
+    def _decode_items(self, items):
+        productions = self.grammar.productions
+        return [{'left': productions[idx]['left'], 'right': productions[idx]['right'], 'dot': dot}
+                for idx, dot in items]
+
+    def _build_levels(self, productions, by_left, pool, workers):
+        hooks = self.hooks
+        limits = self.limits
+
+        initial = _closure_encoded([(0, 0)], productions, by_left)
+        self.closure_calls += 1
+        encoded_states = [initial]
+        index = {frozenset(initial): 0}
+        self.states.append(self._decode_items(initial))
+        if hooks:
+            for hook in hooks:
+                hook.on_closure(self._decode_items(initial[:1]), self.states[0])
+                hook.on_state_created(0, self.states[0])
+        total_items = len(initial)
+
+        frontier = [0]
+        while frontier:
+            batch = [encoded_states[i] for i in frontier]
+            if pool is not None and len(batch) >= PARALLEL_MIN_FRONTIER:
+                size = max(1, len(batch) // (workers * 4))
+                chunks = [batch[i:i + size] for i in range(0, len(batch), size)]
+                expansions = [e for part in pool.map(_expand_chunk, chunks) for e in part]
+            else:
+                expansions = [_expand_state(items, productions, by_left) for items in batch]
+
+            # 按（状态编号, 符号）顺序合并，新状态依次编号
+            next_frontier = []
+            for current_idx, expansion in zip(frontier, expansions):
+                for sym, kernel_len, closure in expansion:
+                    self.closure_calls += 1
+                    key = frozenset(closure)
+                    target = index.get(key)
+                    if target is None:
+                        target = len(encoded_states)
+                        index[key] = target
+                        encoded_states.append(closure)
+                        decoded = self._decode_items(closure)
+                        self.states.append(decoded)
+                        next_frontier.append(target)
+                        if hooks:
+                            for hook in hooks:
+                                hook.on_state_created(target, decoded)
+                        if limits is not None:
+                            total_items += len(closure)
+                            limits.check("max_states", len(self.states))
+                            limits.check("max_items", total_items)
+                    if hooks:
+                        for hook in hooks:
+                            hook.on_closure(self._decode_items(closure[:kernel_len]), self.states[target])
+                    self.transitions[(current_idx, sym)] = target
+            frontier = next_frontier
 
     def build_parsing_table(self):
         """生成分析表并检测冲突"""
-        n_states = len(self.states)
-        for i in range(n_states):
-            self.action_table[i] = {}
-            self.goto_table[i] = {}
-
-        for i, state_items in enumerate(self.states):
-            # 1. 移进 (Shift)
-            for (src, sym), dest in self.transitions.items():
-                if src == i and sym in self.grammar.terminals:
-                    # 关键修改：确保 $ 也添加移进动作
-                    self._add_action(i, sym, f"s{dest}")
-
-            # GOTO 表
-            for (src, sym), dest in self.transitions.items():
-                if src == i and sym in self.grammar.non_terminals:
-                    self.goto_table[i][sym] = dest
-
-            # 2. 规约 (Reduce) 和 接受 (Accept)
-            for item in state_items:
-                if item['dot'] == len(item['right']) or (item['right'] == ['@'] and item['dot'] == 0):
-                    # 接受动作：当点在最右端且左部是拓广文法的开始符号
-                    if item['left'] == self.grammar.start_symbol and item['dot'] == len(item['right']):
-                        # 关键修改：确保 acc 动作添加到 $ 上
-                        self._add_action(i, '$', "acc")
-                    else:
-                        # 规约动作
-                        prod_idx = -1
-                        for idx, p in enumerate(self.grammar.productions):
-                            if p['left'] == item['left'] and p['right'] == item['right']:
-                                prod_idx = idx
-                                break
-
-                        if prod_idx >= 0:
-                            action_str = f"r{prod_idx}"
-                            # LR(0) 核心：对所有终结符都进行规约（包括 $）
-                            for term in self.grammar.terminals:
-                                if term != '$':  # $ 可能有接受动作，避免覆盖
-                                    self._add_action(i, term, action_str)
-                            # 额外添加 $ 的规约动作（如果没有接受动作冲突的话）
-                            if '$' not in self.action_table[i] or self.action_table[i]['$'] != 'acc':
-                                self._add_action(i, '$', action_str)
+        with span(logger, "生成分析表"):
+            n_states = len(self.states)
+            for i in range(n_states):
+                self.action_table[i] = {}
+                self.goto_table[i] = {}
+
+            for i, state_items in enumerate(self.states):
+                # 1. 移进 (Shift)
+                for (src, sym), dest in self.transitions.items():
+                    if src == i and sym in self.grammar.terminals:
+                        # 关键修改：确保 $ 也添加移进动作
+                        self._add_action(i, sym, f"s{dest}")
+
+                # GOTO 表
+                for (src, sym), dest in self.transitions.items():
+                    if src == i and sym in self.grammar.non_terminals:
+                        self.goto_table[i][sym] = dest
+
+                # 2. 规约 (Reduce) 和 接受 (Accept)
+                for item in state_items:
+                    if item['dot'] == len(item['right']) or (item['right'] == ['@'] and item['dot'] == 0):
+                        # 接受动作：当点在最右端且左部是拓广文法的开始符号
+                        if item['left'] == self.grammar.start_symbol and item['dot'] == len(item['right']):
+                            # 关键修改：确保 acc 动作添加到 $ 上
+                            self._add_action(i, '$', "acc")
+                        else:
+                            # 规约动作
+                            prod_idx = -1
+                            for idx, p in enumerate(self.grammar.productions):
+                                if p['left'] == item['left'] and p['right'] == item['right']:
+                                    prod_idx = idx
+                                    break
+
+                            if prod_idx >= 0:
+                                action_str = f"r{prod_idx}"
+                                # LR(0) 核心：对所有终结符都进行规约（包括 $）
+                                for term in self.grammar.terminals:
+                                    if term != '$':  # $ 可能有接受动作，避免覆盖
+                                        self._add_action(i, term, action_str)
+                                # 额外添加 $ 的规约动作（如果没有接受动作冲突的话）
+                                if '$' not in self.action_table[i] or self.action_table[i]['$'] != 'acc':
+                                    self._add_action(i, '$', action_str)
+        if self.conflicts:
+            logger.debug("分析表存在 %d 处冲突", len(self.conflicts))
 
     def _add_action(self, state, symbol, action):
         """
@@ -164,7 +239,7 @@ class LR0Parser:
         if symbol in self.action_table[state]:
             existing = self.action_table[state][symbol]
             # 如果动作不一样，说明冲突 (例如 s3 vs r2)
-            if existing != action and action not in existing:
+            if existing != action and action not in existing.split('/'):
                 self.is_lr0 = False
 
                 # [核心修复] 记录冲突状态 ID
@@ -179,6 +254,61 @@ class LR0Parser:
         else:
             self.action_table[state][symbol] = action
 
+    def generate_module(self, path=None):
+        """
+        生成独立的 Python 分析模块（分析表固化为常量），需先调用 build_parsing_table。
+        :param path: 若给出则写入该文件
+        :return: 模块源码
+        """
+        source = generate_parser_module(self)
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+        return source
+
+    # 序列化格式版本，结构变化时递增
+    TABLE_FORMAT = 1
+
+    def to_dict(self):
+        """
+        序列化文法、DFA 和分析表（需先调用 build_parsing_table），可保存为 JSON 后用 from_dict 载入，
+        省去重新构造项目集的开销。项目表示为 [产生式编号, 点的位置]。
+        """
+        prod_index = {}
+        for idx, p in enumerate(self.grammar.productions):
+            prod_index.setdefault((p['left'], tuple(p['right'])), idx)
+        return {
+            "format": self.TABLE_FORMAT,
+            "algorithm": self.algorithm,
+            "grammar": self.grammar.to_dict(),
+            "states": [[[prod_index[(item['left'], tuple(item['right']))], item['dot']] for item in items]
+                       for items in self.states],
+            "transitions": [[src, sym, dest] for (src, sym), dest in self.transitions.items()],
+            "action_table": [self.action_table[i] for i in range(len(self.states))],
+            "goto_table": [self.goto_table[i] for i in range(len(self.states))],
+            "is_lr0": self.is_lr0,
+            "conflicts": list(self.conflicts),
+            "conflict_state_ids": sorted(self.conflict_state_ids)
+        }
+
+    @classmethod
+    def from_dict(cls, data, limits=None):
+        """由 to_dict() 的结果还原已构造好分析表的分析器"""
+        if data.get("format") != cls.TABLE_FORMAT:
+            raise ValueError(f"不支持的分析表格式: {data.get('format')}")
+        parser = cls(Grammar.from_dict(data["grammar"]), limits)
+        productions = parser.grammar.productions
+        parser.states = [[{'left': productions[idx]['left'], 'right': productions[idx]['right'], 'dot': dot}
+                          for idx, dot in items] for items in data["states"]]
+        parser.transitions = {(src, sym): dest for src, sym, dest in data["transitions"]}
+        parser.action_table = {i: dict(row) for i, row in enumerate(data["action_table"])}
+        parser.goto_table = {i: dict(row) for i, row in enumerate(data["goto_table"])}
+        parser.is_lr0 = data["is_lr0"]
+        parser.conflicts = list(data["conflicts"])
+        parser.conflict_state_ids = set(data["conflict_state_ids"])
+        parser.algorithm = data.get("algorithm", cls.algorithm)
+        return parser
+
     def print_dfa(self):
         print("\n[2.1] DFA 状态集信息")
         for i, items in enumerate(self.states):
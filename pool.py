@@ -0,0 +1,163 @@
+# src/pool.py
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PoolBusy(Exception):
+    """在限定时间内没有空闲的工作进程（对应 HTTP 503）"""
+
+
+class TaskTimeout(Exception):
+    """任务超时，工作进程已被终止并重启（对应 HTTP 504）"""
+
+
+class WorkerCrashed(Exception):
+    """工作进程在执行任务时异常退出"""
+
+
+def _worker_main(conn):
+    """
+    工作进程主循环：启动时先导入分析模块和 graphviz，之后每个任务都不再付出导入开销。
+    任务为 (函数名, 位置参数, 关键字参数)，返回 ("ok", 返回值) 或 ("error", 异常)。
+    """
+    from src import analysis
+    try:
+        import src.visualizer  # noqa: F401
+        import graphviz  # noqa: F401  visualizer 中延迟导入，工作进程启动时预先导入
+    except ImportError:
+        pass
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if task is None:
+            break
+        name, args, kwargs = task
+        try:
+            reply = ("ok", getattr(analysis, name)(*args, **kwargs))
+        except Exception as e:
+            reply = ("error", e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # 返回值或异常无法序列化时，改为返回字符串描述
+            conn.send(("error", RuntimeError(str(e))))
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        try:
+            self.conn.close()
+        finally:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join(1)
+
+
+class AnalysisPool:
+    """
+    预热的分析进程池：CPU 密集的 analyze_grammar 在独立进程中执行，不受 GIL 限制。
+    每个工作进程独占一条 Pipe，同一时刻只执行一个任务；
+    任务超时则终止该进程并补充新进程，避免单个巨大文法长期占用 CPU。
+    """
+
+    def __init__(self, workers=None, task_timeout=30.0, acquire_timeout=5.0, start_method="spawn"):
+        self.size = workers or os.cpu_count() or 1
+        self.task_timeout = task_timeout
+        self.acquire_timeout = acquire_timeout
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(self.size):
+            self._idle.put(_Worker(self._ctx))
+        logger.info("分析进程池已启动: %d 个工作进程", self.size)
+
+    def submit(self, name, *args, timeout=None, **kwargs):
+        """
+        在空闲工作进程中执行 src.analysis 中的函数 name(*args, **kwargs) 并等待结果。
+        :param timeout: 本次任务的超时（秒），默认 task_timeout
+        :raises PoolBusy: acquire_timeout 内没有空闲进程
+        :raises TaskTimeout: 任务超时
+        """
+        if self._closed:
+            raise RuntimeError("分析进程池已关闭")
+        try:
+            worker = self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise PoolBusy("服务器繁忙，请稍后重试")
+
+        timeout = self.task_timeout if timeout is None else timeout
+        try:
+            worker.conn.send((name, args, kwargs))
+            if not worker.conn.poll(timeout):
+                worker = self._replace(worker)
+                raise TaskTimeout(f"分析超时（超过 {timeout:g} 秒）")
+            status, value = worker.conn.recv()
+        except (EOFError, OSError, BrokenPipeError):
+            worker = self._replace(worker)
+            raise WorkerCrashed("分析进程异常退出")
+        finally:
+            self._idle.put(worker)
+
+        if status == "error":
+            raise value
+        return value
+
+    def _replace(self, worker):
+        """终止（可能仍在计算的）工作进程并启动一个新的"""
+        logger.warning("终止工作进程 %s 并重启", worker.process.pid)
+        worker.kill()
+        return _Worker(self._ctx)
+
+    def shutdown(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(1)
+            worker.kill()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    按环境变量创建全局进程池（首次调用时启动）：
+    LR0_POOL_WORKERS 工作进程数（0 表示不用进程池，在请求线程中直接执行；默认 CPU 核数），
+    LR0_TASK_TIMEOUT 单个任务超时秒数（默认 30）。
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = int(os.environ.get("LR0_POOL_WORKERS", os.cpu_count() or 1))
+                if workers <= 0:
+                    return None
+                timeout = float(os.environ.get("LR0_TASK_TIMEOUT", 30))
+                _pool = AnalysisPool(workers, task_timeout=timeout)
+    return _pool
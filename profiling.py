@@ -0,0 +1,158 @@
+# src/profiling.py
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+
+
+class ParserHook:
+    """
+    LR0Parser / AnalysisEngine 的钩子接口，按需覆盖其中的方法。
+    未注册任何钩子时，分析器不会调用这些方法。
+    """
+
+    def on_closure(self, items, result):
+        """每次计算闭包后调用：items 为输入项目，result 为闭包结果"""
+
+    def on_state_created(self, state_id, items):
+        """项目集规范族中新建一个状态时调用"""
+
+    def on_step(self, step_info):
+        """AnalysisEngine 每执行一步（记录 trace 之后）调用；parse_compact 中 step_info 为增量记录的列表"""
+
+    def on_reduce(self, prod_idx, state):
+        """AnalysisEngine 每次规约时调用：state 为弹栈后的栈顶状态"""
+
+
+class CountingHook(ParserHook):
+    """内置钩子：统计各事件的次数，以及闭包大小的分布，用于定位病态文法"""
+
+    def __init__(self):
+        self.closures = 0
+        self.closure_items = 0
+        self.max_closure = 0
+        self.states = 0
+        self.steps = 0
+        self.reductions = {}  # 产生式编号 -> 规约次数
+
+    def on_closure(self, items, result):
+        self.closures += 1
+        self.closure_items += len(result)
+        self.max_closure = max(self.max_closure, len(result))
+
+    def on_state_created(self, state_id, items):
+        self.states += 1
+
+    def on_step(self, step_info):
+        self.steps += 1
+
+    def on_reduce(self, prod_idx, state):
+        self.reductions[prod_idx] = self.reductions.get(prod_idx, 0) + 1
+
+    def summary(self):
+        return {
+            "closures": self.closures,
+            "closure_items": self.closure_items,
+            "max_closure": self.max_closure,
+            "states": self.states,
+            "steps": self.steps,
+            "reductions": {str(k): v for k, v in sorted(self.reductions.items())}
+        }
+
+
+def _frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+
+
+class SamplingProfiler:
+    """
+    采样分析器：后台线程按固定间隔抓取目标线程的调用栈，统计各函数出现的次数。
+    开销与被分析代码无关，适合线上临时诊断。
+    """
+
+    def __init__(self, interval=0.001, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = 0
+        self.self_counts = {}
+        self.total_counts = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            leaf = _frame_label(frame.f_code)
+            self.self_counts[leaf] = self.self_counts.get(leaf, 0) + 1
+            seen = set()
+            while frame is not None:
+                label = _frame_label(frame.f_code)
+                if label not in seen:
+                    seen.add(label)
+                    self.total_counts[label] = self.total_counts.get(label, 0) + 1
+                frame = frame.f_back
+
+    def __enter__(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="lr0-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def report(self, top=25):
+        rows = []
+        for label, total in sorted(self.total_counts.items(), key=lambda kv: -kv[1])[:top]:
+            rows.append({
+                "function": label,
+                "samples": total,
+                "self_samples": self.self_counts.get(label, 0),
+                "fraction": round(total / self.samples, 4) if self.samples else 0.0
+            })
+        return {"samples": self.samples, "interval": self.interval, "functions": rows}
+
+
+def _cprofile_report(profile, top=25):
+    stats = pstats.Stats(profile)
+    rows = []
+    entries = sorted(stats.stats.items(), key=lambda kv: -kv[1][3])[:top]
+    for (filename, line, name), (_cc, ncalls, tottime, cumtime, _callers) in entries:
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "calls": ncalls,
+            "total_time": round(tottime, 6),
+            "cumulative_time": round(cumtime, 6)
+        })
+    return {"total_calls": stats.total_calls, "total_time": round(stats.total_tt, 6), "functions": rows}
+
+
+def profile_call(func, mode="cprofile", top=25, interval=0.001):
+    """
+    在分析器下执行 func()，返回 (func 的返回值, 报告字典)。
+    :param mode: "cprofile" 确定性分析（开销较大但精确），"sample" 采样分析
+    """
+    start = time.perf_counter()
+    if mode == "sample":
+        with SamplingProfiler(interval=interval) as sampler:
+            result = func()
+        report = sampler.report(top)
+    else:
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            result = func()
+        finally:
+            profile.disable()
+        report = _cprofile_report(profile, top)
+    report["mode"] = mode
+    report["wall_time"] = round(time.perf_counter() - start, 6)
+    return result, report
@@ -0,0 +1,196 @@
+# src/registry.py
+"""
+预载文法注册表：启动时载入一个目录中的文法并构造分析表，之后按名称直接用构造好的分析表分析输入串。
+
+- 分析表文件（.json，LR0Parser.to_dict() 的结果，可由 `python -m src.cli g.txt --save-table g.json` 生成）直接载入；
+- 其余文件按文法文件处理，格式按扩展名判断（.y/.yy/.yacc、.ebnf/.bnf，其他为逐行格式），启动时构造分析表。
+名称为去掉扩展名的文件名。reload() 按文件修改时间只重建变化的文件并删除已移除的文件；
+修改后的文法有错误时保留旧的分析表并记录错误。watch() 启动后台线程定期 reload()，不重启服务即可更新文法。
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from src.engine import AnalysisEngine
+from src.loader import load_grammar
+from src.lr1 import PARSERS
+from src.parser import LR0Parser
+
+logger = logging.getLogger(__name__)
+
+TABLE_EXT = ".json"
+
+
+class GrammarRegistry:
+    def __init__(self, directory, algorithm="lr0", reduce_grammar=False, limits=None):
+        if algorithm not in PARSERS:
+            raise ValueError(f"未知的算法: {algorithm}，可选: {', '.join(PARSERS)}")
+        self.directory = directory
+        self.algorithm = algorithm
+        self.reduce_grammar = reduce_grammar
+        self.limits = limits  # 只用于限制输入串长度和 GLR 步数；文法由部署方提供，构造不受限制
+        self._entries = {}  # 名称 -> {"path", "mtime", "size", "parser", "split", "error", "build_ms", "loaded_at"}
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    # ---- 载入 ----
+    def _scan(self):
+        """目录中的文件：{名称: (路径, mtime, 大小)}；同名文件取排序在前的一个"""
+        files = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.startswith(".") or filename.endswith("~"):
+                continue
+            path = os.path.join(self.directory, filename)
+            if not os.path.isfile(path):
+                continue
+            name = os.path.splitext(filename)[0]
+            if name in files:
+                logger.warning("文法名称 %s 重复，忽略 %s", name, path)
+                continue
+            st = os.stat(path)
+            files[name] = (path, st.st_mtime_ns, st.st_size)
+        return files
+
+    def _build(self, path):
+        """载入分析表文件或由文法文件构造分析器"""
+        if path.endswith(TABLE_EXT):
+            with open(path, encoding="utf-8") as f:
+                return LR0Parser.from_dict(json.load(f))
+        grammar = load_grammar(path)
+        if grammar.errors:
+            raise ValueError("文法错误: " + "; ".join(grammar.errors))
+        if self.reduce_grammar:
+            grammar.reduce()
+        parser = PARSERS[self.algorithm](grammar)
+        parser.build_canonical_collection()
+        parser.build_parsing_table()
+        return parser
+
+    def reload(self):
+        """
+        重新扫描目录，构造新增或修改过的文法，删除已移除的文法。
+        :return: {"loaded": [...], "failed": [...], "removed": [...]}
+        """
+        with self._reload_lock:
+            files = self._scan()
+            with self._lock:
+                current = dict(self._entries)
+            changes = {"loaded": [], "failed": [], "removed": []}
+
+            for name, (path, mtime, size) in files.items():
+                old = current.get(name)
+                if old is not None and (old["path"], old["mtime"], old["size"]) == (path, mtime, size):
+                    continue
+                begin = time.perf_counter()
+                try:
+                    parser = self._build(path)
+                except Exception as e:
+                    logger.error("文法 %s 载入失败: %s", name, e)
+                    entry = dict(old) if old is not None else {"parser": None, "split": False,
+                                                               "build_ms": None, "loaded_at": None}
+                    entry.update(path=path, mtime=mtime, size=size, error=str(e))
+                    changes["failed"].append(name)
+                else:
+                    entry = {
+                        "path": path, "mtime": mtime, "size": size,
+                        "parser": parser,
+                        # 多字符终结符时输入串按空白切分为记号
+                        "split": any(len(t) > 1 for t in parser.grammar.terminals),
+                        "error": None,
+                        "build_ms": round((time.perf_counter() - begin) * 1000, 3),
+                        "loaded_at": time.time()
+                    }
+                    logger.info("载入文法 %s（%d 个状态，%.1f ms）", name, len(parser.states), entry["build_ms"])
+                    changes["loaded"].append(name)
+                with self._lock:
+                    self._entries[name] = entry
+
+            with self._lock:
+                for name in list(self._entries):
+                    if name not in files:
+                        del self._entries[name]
+                        changes["removed"].append(name)
+            for name in changes["removed"]:
+                logger.info("移除文法 %s", name)
+            return changes
+
+    def watch(self, interval=2.0):
+        """启动后台线程，每 interval 秒检查一次文件修改时间"""
+        if self._watcher is not None:
+            return self._watcher
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload()
+                except OSError as e:
+                    logger.error("扫描文法目录失败: %s", e)
+
+        self._watcher = threading.Thread(target=loop, name="grammar-registry", daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def stop(self):
+        self._stop.set()
+
+    # ---- 查询与分析 ----
+    def get(self, name):
+        with self._lock:
+            return self._entries.get(name)
+
+    def names(self):
+        with self._lock:
+            return sorted(self._entries)
+
+    def describe(self):
+        """可 JSON 化的文法列表"""
+        with self._lock:
+            entries = sorted(self._entries.items())
+        out = []
+        for name, entry in entries:
+            parser = entry["parser"]
+            out.append({
+                "name": name,
+                "file": os.path.basename(entry["path"]),
+                "ready": parser is not None,
+                "algorithm": getattr(parser, "algorithm", None),
+                "is_lr0": parser.is_lr0 if parser is not None else None,
+                "states": len(parser.states) if parser is not None else None,
+                "start_symbol": parser.grammar.start_symbol if parser is not None else None,
+                "build_ms": entry["build_ms"],
+                "loaded_at": entry["loaded_at"],
+                "error": entry["error"]
+            })
+        return out
+
+    def parse(self, name, text, tree=False):
+        """
+        用名为 name 的文法分析 text（不记录 trace）；分析表有冲突时用 GLR（受 limits.max_glr_steps 限制）。
+        :return: {"input", "success", "steps", "error_position"[, "tree" | "ambiguous"]}
+        :raise KeyError: 文法不存在或尚未成功载入
+        """
+        entry = self.get(name)
+        if entry is None or entry["parser"] is None:
+            raise KeyError(name)
+        parser = entry["parser"]
+        tokens = text.split() if entry["split"] else text
+        record = {"input": text}
+        if not parser.is_lr0:
+            from src.glr import GLREngine
+            glr = GLREngine(parser, self.limits)
+            success, forest = glr.parse(tokens)
+            record.update(success=success, steps=glr.stats["gss_nodes"],
+                          error_position=glr.stats["error_position"],
+                          ambiguous=success and forest.is_ambiguous())
+            return record
+
+        engine = AnalysisEngine(parser, limits=self.limits)
+        success, steps, error_position = engine.recognize(tokens)
+        record.update(success=success, steps=steps, error_position=error_position)
+        if tree and success:
+            record["tree"] = engine.parse_tree(tokens)[1].to_dict()
+        return record
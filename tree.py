@@ -0,0 +1,119 @@
+# src/tree.py
+from array import array
+
+KIND_TOKEN = 0  # 叶子：终结符
+KIND_RULE = 1   # 内部结点：由产生式规约得到
+
+
+class ParseTree:
+    """
+    用“竞技场”方式存储的语法分析树：所有结点保存在几个平行数组中，而不是每个结点一个对象。
+
+    - kind[n]        结点类型（KIND_TOKEN / KIND_RULE）
+    - prod[n]        内部结点对应的产生式编号，叶子为 -1
+    - child_start[n] 内部结点：第一个孩子在 children 中的下标；叶子：该记号在输入中的位置
+    - child_count[n] 孩子个数（叶子和空产生式为 0）
+    - children       所有孩子结点编号依次排列
+
+    结点按规约顺序（后序）编号，因此孩子编号总小于父结点编号。
+    """
+
+    def __init__(self, grammar, tokens):
+        self.grammar = grammar
+        self.tokens = tokens
+        self.kind = array('b')
+        self.prod = array('i')
+        self.child_start = array('i')
+        self.child_count = array('i')
+        self.children = array('i')
+        self.root = -1
+        self.value = None  # 语义动作计算出的根结点值
+
+    def __len__(self):
+        return len(self.kind)
+
+    def add_token(self, position):
+        """添加叶子结点，返回结点编号"""
+        self.kind.append(KIND_TOKEN)
+        self.prod.append(-1)
+        self.child_start.append(position)
+        self.child_count.append(0)
+        return len(self.kind) - 1
+
+    def add_rule(self, prod_idx, child_nodes):
+        """添加内部结点，child_nodes 为按从左到右顺序排列的孩子编号"""
+        self.kind.append(KIND_RULE)
+        self.prod.append(prod_idx)
+        self.child_start.append(len(self.children))
+        self.child_count.append(len(child_nodes))
+        self.children.extend(child_nodes)
+        return len(self.kind) - 1
+
+    def symbol(self, node):
+        """结点对应的文法符号"""
+        if self.kind[node] == KIND_TOKEN:
+            return self.tokens[self.child_start[node]]
+        return self.grammar.productions[self.prod[node]]['left']
+
+    def get_children(self, node):
+        if self.kind[node] == KIND_TOKEN:
+            return []
+        start = self.child_start[node]
+        return list(self.children[start:start + self.child_count[node]])
+
+    def to_tuple(self, node=None):
+        """
+        转为嵌套元组 (符号, 孩子...)，叶子为记号字符串。仅用于调试和小规模输出。
+        使用显式栈，避免深层树触发递归深度限制。
+        """
+        if node is None:
+            node = self.root
+        if node < 0:
+            return None
+        built = {}
+        stack = [(node, False)]
+        while stack:
+            n, expanded = stack.pop()
+            if self.kind[n] == KIND_TOKEN:
+                built[n] = self.tokens[self.child_start[n]]
+            elif expanded:
+                built[n] = (self.symbol(n),) + tuple(built.pop(c) for c in self.get_children(n))
+            else:
+                stack.append((n, True))
+                for c in reversed(self.get_children(n)):
+                    stack.append((c, False))
+        return built[node]
+
+    def to_dict(self):
+        """平行数组形式的可序列化结果"""
+        return {
+            "root": self.root,
+            "kind": list(self.kind),
+            "prod": list(self.prod),
+            "child_start": list(self.child_start),
+            "child_count": list(self.child_count),
+            "children": list(self.children)
+        }
+
+    def memory_bytes(self):
+        """平行数组占用的字节数"""
+        arrays = [self.kind, self.prod, self.child_start, self.child_count, self.children]
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+def normalize_actions(grammar, actions):
+    """
+    把语义动作表规范化为 {产生式编号: 函数}。
+    键既可以是产生式编号，也可以是 get_production_str 形式的字符串，如 "E->E+T"。
+    """
+    if not actions:
+        return {}
+    by_str = {grammar.get_production_str(i): i for i in range(len(grammar.productions))}
+    result = {}
+    for key, func in actions.items():
+        if isinstance(key, str):
+            if key.replace(' ', '') not in by_str:
+                raise KeyError(f"未知的产生式: {key}")
+            key = by_str[key.replace(' ', '')]
+        result[key] = func
+    return result
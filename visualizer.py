@@ -1,8 +1,11 @@
 # src/visualizer.py
 import os
 import html
-from graphviz import Digraph
-import pandas as pd
+import logging
+
+from src.log import span
+
+logger = logging.getLogger(__name__)
 
 
 class Visualizer:
@@ -11,10 +14,14 @@ class Visualizer:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-    def render_dfa(self, states, transitions, terminals, conflict_states=None):
+    def render_dfa(self, states, transitions, terminals, conflict_states=None, dpi=300):
         """
         绘制 DFA 状态转换图 (优化版本)
+        :param dpi: 输出 PNG 的分辨率
         """
+        # graphviz 只在真正绘图时导入，不拖慢 Web 服务和命令行的启动
+        from graphviz import Digraph
+
         if conflict_states is None:
             conflict_states = set()
 
@@ -23,7 +30,7 @@ class Visualizer:
         # === 关键优化：调整布局参数 ===
         dot.attr(rankdir='LR')  # 从左到右
         dot.attr('graph',
-                 dpi='300',
+                 dpi=str(dpi),
                  fontname='Arial',
                  nodesep='2.0',  # 增大节点间距
                  ranksep='3.0',  # 增大层级间距
@@ -128,8 +135,9 @@ class Visualizer:
             # 尝试不同的布局引擎
             dot.engine = 'dot'  # 使用dot引擎，更适合层次结构
 
-            dot.render(output_path, view=False, cleanup=True)
-            print(f"   -> [Graphviz] DFA 高清图已生成: {output_path}.png")
+            with span(logger, "Graphviz 渲染"):
+                dot.render(output_path, view=False, cleanup=True)
+            logger.debug("[Graphviz] DFA 高清图已生成: %s.png", output_path)
 
             # 如果第一次效果不好，尝试不同的随机种子
             if len(states) > 15:  # 状态较多时才尝试
@@ -137,18 +145,29 @@ class Visualizer:
                     dot.attr(start=str(attempt + 10))  # 改变随机种子
                     alt_path = os.path.join(self.output_dir, f'dfa_graph_alt{attempt}')
                     dot.render(alt_path, view=False, cleanup=True)
-                    print(f"   -> [Graphviz] 备选布局 {attempt + 1} 已生成")
+                    logger.debug("[Graphviz] 备选布局 %d 已生成", attempt + 1)
 
         except Exception as e:
-            print(f"   -> [Error] Graphviz 渲染失败: {e}")
+            logger.warning("[Graphviz] 渲染失败: %s", e)
             # 尝试使用neato引擎作为备选
             try:
                 dot.engine = 'neato'
                 dot.attr(overlap='scalexy')  # 使用不同的重叠处理
                 dot.render(output_path, view=False, cleanup=True)
-                print(f"   -> [Graphviz] 使用neato引擎生成DFA图")
+                logger.debug("[Graphviz] 使用neato引擎生成DFA图")
             except Exception as e2:
-                print(f"   -> [Error] 备选渲染也失败: {e2}")
+                logger.warning("[Graphviz] 备选渲染也失败: %s", e2)
+
+    @staticmethod
+    def _html_table(headers, rows, classes="", table_id=""):
+        """生成 <table> 片段，单元格内容做 HTML 转义"""
+        parts = [f'<table class="{html.escape(classes)}" id="{html.escape(table_id)}">', '<thead><tr>']
+        parts.extend(f'<th>{html.escape(str(h))}</th>' for h in headers)
+        parts.append('</tr></thead><tbody>')
+        for row in rows:
+            parts.append('<tr>' + ''.join(f'<td>{html.escape(str(x))}</td>' for x in row) + '</tr>')
+        parts.append('</tbody></table>')
+        return '\n'.join(parts)
 
     def render_table_html(self, headers, data, filename="parsing_table.html"):
         """生成带有搜索、排序功能的现代化 HTML 表格"""
@@ -157,7 +176,9 @@ class Visualizer:
             new_row = [str(x) if str(x).strip() != "" else "-" for x in row]
             formatted_data.append(new_row)
 
-        df = pd.DataFrame(formatted_data, columns=headers)
+        table_html = self._html_table(headers, formatted_data,
+                                      classes='table table-striped table-hover table-bordered',
+                                      table_id='parsingTable')
 
         html_content = f"""
         <!DOCTYPE html>
@@ -176,7 +197,7 @@ class Visualizer:
         <body>
             <div class="container">
                 <h2>📊 LR(0) 分析表 (Interactive)</h2>
-                {df.to_html(classes='table table-striped table-hover table-bordered', table_id='parsingTable', index=False)}
+                {table_html}
             </div>
             <script src="https://code.jquery.com/jquery-3.7.0.js"></script>
             <script src="https://cdn.datatables.net/1.13.6/js/jquery.dataTables.min.js"></script>
@@ -280,7 +301,7 @@ class Visualizer:
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(html_content)
 
-        print(f"[可视化] 分析过程已生成: {output_path}")
+        logger.info("[可视化] 分析过程已生成: %s", output_path)
 
     def render_dashboard(self, info_dict, filename="index.html"):
         """
@@ -467,6 +488,6 @@ class Visualizer:
         output_path = os.path.join(self.output_dir, filename)
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(html_content)
-        print(f"[可视化] 仪表盘已生成: {output_path}")
+        logger.info("[可视化] 仪表盘已生成: %s", output_path)
 
 